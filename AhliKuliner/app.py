@@ -1,6 +1,23 @@
 import streamlit as st
 import google.generativeai as genai
 import os
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Normalisasi prompt menjadi kunci lokasi dan pencarian wilayah di data lokal
+from lokasi_kuliner import (
+    baca_daftar_lokasi, bangun_indeks_kuliner, cari_lokasi, kunci_lokasi, saran_lokasi, wilayah_dikenal
+)
+
+# gemini_bersama.py ada di folder induk (dipakai bersama semua chatbot); Streamlit hanya
+# menambahkan folder aplikasi ke sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gemini_bersama import (
+    BATAS_WAKTU_GILIRAN, batalkan_tugas, kirim_tugas, pantau_tugas, tampilkan_riwayat, tampilkan_statistik_gemini
+)
 
 # ==============================================================================
 # KONFIGURASI APLIKASI STREAMLIT
@@ -16,18 +33,26 @@ st.set_page_config(page_title="Ahli Kuliner Gemini", page_icon="🍔")
 # Dapatkan API Key dari Streamlit Secrets (Disimpan aman, tidak di dalam kode)
 # Pastikan Anda sudah membuat file .streamlit/secrets.toml
 # dengan kunci "GEMINI_API_KEY"
+# Tanpa API Key aplikasi tetap berjalan dalam mode offline (hanya data kuliner lokal)
 try:
     API_KEY = st.secrets["GEMINI_API_KEY"]
-except KeyError:
-    st.error("🚨 **Error Konfigurasi:** Kunci `GEMINI_API_KEY` tidak ditemukan di Streamlit Secrets.")
-    st.info("Mohon tambahkan API Key Anda ke `secrets.toml` atau Environment Variables.")
-    st.stop() # Hentikan eksekusi aplikasi jika API Key tidak ada
+except (KeyError, FileNotFoundError): # FileNotFoundError: secrets.toml tidak ada sama sekali
+    API_KEY = None
 
 # Nama model Gemini yang akan digunakan.
 MODEL_NAME = 'gemini-2.5-flash-lite' # Direkomendasikan untuk Streamlit
 TEMPERATURE = 0.4
 MAX_TOKENS = 500
 
+# Endpoint API opsional, misal server tiruan lokal (gemini_tiruan/server.py) untuk uji latensi
+API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")
+
+# Cache rekomendasi per lokasi: umur maksimal jawaban, jumlah lokasi yang disimpan,
+# dan path berkas JSON opsional agar cache bertahan saat aplikasi di-restart
+CACHE_TTL_DETIK = 24 * 60 * 60
+MAKS_CACHE_LOKASI = 500
+CACHE_PATH = os.environ.get("AHLI_KULINER_CACHE_PATH")
+
 # ==============================================================================
 # KONTEKS AWAL CHATBOT (Sama dengan kode Anda)
 # ==============================================================================
@@ -48,31 +73,132 @@ INITIAL_CHATBOT_CONTEXT = [
 # ==============================================================================
 
 # Fungsi untuk inisialisasi API dan Model
-@st.cache_resource # Cache sumber daya untuk menghindari inisialisasi berulang
-def init_gemini_chat():
+@st.cache_resource # Model dibagi semua sesi; riwayat chat TIDAK ikut di-cache di sini
+def init_gemini_model():
     try:
         # Konfigurasi API
-        genai.configure(api_key=API_KEY)
+        if API_ENDPOINT:
+            genai.configure(api_key=API_KEY, transport="rest", client_options={"api_endpoint": API_ENDPOINT})
+        else:
+            genai.configure(api_key=API_KEY)
 
         # Inisialisasi model
-        model = genai.GenerativeModel(
+        return genai.GenerativeModel(
             MODEL_NAME,
             generation_config=genai.types.GenerationConfig(
                 temperature=TEMPERATURE,
                 max_output_tokens=MAX_TOKENS
             )
         )
-
-        # Memulai sesi chat dengan riwayat awal (konteks)
-        chat = model.start_chat(history=INITIAL_CHATBOT_CONTEXT)
-        return chat
     except Exception as e:
         st.error(f"❌ **Gagal Menginisialisasi Gemini!** Detail: {e}")
         st.stop()
-        
-# Inisialisasi chat dan simpan di session state
-if "chat_session" not in st.session_state:
-    st.session_state.chat_session = init_gemini_chat()
+
+def riwayat_untuk_gemini(messages):
+    """Ubah riwayat tampilan menjadi isi permintaan Gemini (tanpa pesan pembuka dan pesan error).
+
+    Riwayat tampilan adalah satu-satunya sumber riwayat chat: setiap giliran dikirim
+    lengkap lewat generate_content, jadi tidak ada ChatSession yang perlu disimpan.
+    """
+    riwayat = list(INITIAL_CHATBOT_CONTEXT)
+    for message in messages[1:]:
+        if message.get("error"):
+            continue
+        peran = "user" if message["role"] == "user" else "model"
+        riwayat.append({"role": peran, "parts": [message["content"]]})
+    return riwayat
+
+# ==============================================================================
+# CACHE REKOMENDASI PER LOKASI
+# ==============================================================================
+
+# Daftar nama wilayah yang dikenal; prompt pendek lain ("yang lain", "terima kasih")
+# tidak pernah dijadikan kunci cache
+PATH_DAFTAR_LOKASI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "daftar_lokasi.txt")
+
+@st.cache_resource # Gazetir dimuat sekali per proses
+def muat_daftar_lokasi():
+    """Himpunan kunci lokasi dari daftar_lokasi.txt."""
+    return baca_daftar_lokasi(PATH_DAFTAR_LOKASI)
+
+def lokasi_dikenal(kunci):
+    """True jika kunci lokasi adalah nama wilayah di gazetir atau di data kuliner lokal."""
+    return wilayah_dikenal(kunci, muat_daftar_lokasi(), muat_indeks_kuliner())
+
+def simpan_cache_ke_berkas(data):
+    """Tulis cache ke CACHE_PATH secara atomik (tulis berkas sementara lalu ganti)."""
+    sementara = CACHE_PATH + ".tmp"
+    with open(sementara, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(sementara, CACHE_PATH)
+
+@st.cache_resource # Satu cache untuk seluruh proses, dibagi semua sesi
+def init_cache_lokasi():
+    data = OrderedDict()
+    if CACHE_PATH and os.path.exists(CACHE_PATH):
+        try:
+            with open(CACHE_PATH, encoding="utf-8") as f:
+                tersimpan = json.load(f)
+            # Urutkan dari yang paling lama agar LRU tetap benar setelah restart
+            for kunci, entri in sorted(tersimpan.items(), key=lambda item: item[1]["waktu"]):
+                data[kunci] = entri
+        except (OSError, ValueError, KeyError, TypeError):
+            data.clear()
+    return {"lock": threading.Lock(), "data": data, "hit": 0, "miss": 0}
+
+def ambil_dari_cache(kunci):
+    """Kembalikan jawaban tersimpan untuk lokasi ini, atau None jika tidak ada/kedaluwarsa."""
+    cache = init_cache_lokasi()
+    with cache["lock"]:
+        entri = cache["data"].get(kunci)
+        if entri is not None and time.time() - entri["waktu"] > CACHE_TTL_DETIK:
+            del cache["data"][kunci]
+            entri = None
+        if entri is None:
+            cache["miss"] += 1
+            return None
+        cache["hit"] += 1
+        cache["data"].move_to_end(kunci)
+        return entri["jawaban"]
+
+def simpan_ke_cache(kunci, jawaban):
+    """Simpan jawaban baru; lokasi yang paling lama tidak dipakai dibuang jika cache penuh."""
+    cache = init_cache_lokasi()
+    with cache["lock"]:
+        cache["data"][kunci] = {"jawaban": jawaban, "waktu": time.time()}
+        cache["data"].move_to_end(kunci)
+        while len(cache["data"]) > MAKS_CACHE_LOKASI:
+            cache["data"].popitem(last=False)
+        if CACHE_PATH:
+            try:
+                simpan_cache_ke_berkas(dict(cache["data"]))
+            except OSError:
+                pass # Cache di memori tetap berjalan walau berkas gagal ditulis
+
+# ==============================================================================
+# INDEKS KULINER LOKAL (TANPA JARINGAN)
+# ==============================================================================
+
+# Data kuliner per wilayah (provinsi -> kota -> kelurahan) di samping app.py
+PATH_KULINER_LOKAL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kuliner_lokal.json")
+
+@st.cache_resource # Indeks dibangun sekali per proses; jawaban sudah diformat saat dimuat
+def muat_indeks_kuliner():
+    """Trie nama wilayah dari kuliner_lokal.json."""
+    return bangun_indeks_kuliner(PATH_KULINER_LOKAL)
+
+def pesan_saran(kunci):
+    """Kalimat saran lokasi yang tersedia offline, berdasarkan huruf awal lokasi yang diminta."""
+    indeks = muat_indeks_kuliner()
+    saran = saran_lokasi(indeks, (kunci or "")[:3]) or saran_lokasi(indeks, "")
+    return f"Lokasi yang tersedia tanpa koneksi, misalnya: {', '.join(saran)}." if saran else ""
+
+# ==============================================================================
+# RIWAYAT CHAT BERHALAMAN
+# ==============================================================================
+
+# Label peran di blok riwayat lama (lihat tampilkan_riwayat di gemini_bersama.py)
+LABEL_PERAN = {"user": "🧑 **Anda**", "assistant": "🍔 **Ahli Kuliner**"}
 
 # Inisialisasi riwayat pesan di Streamlit session state
 if "messages" not in st.session_state:
@@ -88,38 +214,124 @@ if "messages" not in st.session_state:
 st.title("🍔 Ahli Kuliner Gemini")
 st.caption("Chatbot yang akan memberikan 3 rekomendasi makanan dan minuman terbaik di lokasi yang Anda minta.")
 
-# Tampilkan semua riwayat pesan
-for message in st.session_state.messages:
-    with st.chat_message(message["role"]):
-        st.markdown(message["content"])
+if not API_KEY:
+    st.warning(
+        "📴 **Mode offline:** Kunci `GEMINI_API_KEY` tidak ditemukan di Streamlit Secrets. "
+        "Hanya lokasi yang ada di data kuliner lokal yang bisa dijawab."
+    )
+
+def selesaikan_tugas(tugas):
+    """Tampilkan hasil tugas Gemini (sukses, gagal, dibatalkan, atau kehabisan waktu) dan catat ke riwayat."""
+    error_msg = None
+    if tugas["dibatalkan"].is_set():
+        error_msg = "Permintaan dibatalkan."
+    elif tugas["future"].done():
+        try:
+            response = tugas["future"].result()
+            if response and response.text:
+                with st.chat_message("assistant"):
+                    st.markdown(response.text)
+                # Riwayat chat dan cache hanya diubah setelah balasan lengkap diterima
+                st.session_state.messages.append({"role": "assistant", "content": response.text})
+                if tugas["kunci_cache"]:
+                    simpan_ke_cache(tugas["kunci_cache"], response.text)
+            else:
+                error_msg = "Maaf, saya tidak bisa memberikan balasan. Respons API kosong atau tidak valid."
+        except Exception as e:
+            # Misal API sedang down atau kuota habis: arahkan ke lokasi yang tersedia offline
+            error_msg = f"Maaf, terjadi kesalahan saat berkomunikasi dengan Gemini: {e}. {pesan_saran(tugas['lokasi'])}"
+    else:
+        batalkan_tugas(tugas)
+        error_msg = f"Maaf, Gemini tidak menjawab dalam {BATAS_WAKTU_GILIRAN} detik. {pesan_saran(tugas['lokasi'])}"
 
-# Kolom input untuk pengguna
-if prompt := st.chat_input("Tanyakan rekomendasi kuliner (misal: Jakarta Pusat)..."):
+    if error_msg is not None:
+        with st.chat_message("assistant"):
+            st.markdown(error_msg)
+        st.session_state.messages.append({"role": "assistant", "content": error_msg, "error": True})
+
+# Tampilkan riwayat pesan (pesan lama dalam blok yang bisa dibuka)
+tampilkan_riwayat(st.session_state.messages, LABEL_PERAN)
+
+# Panggilan Gemini yang masih berjalan di latar belakang: dicatat jika sudah selesai,
+# dibatalkan, atau melewati batas waktu; jika belum, dipantau tanpa menahan skrip
+if "tugas_gemini" in st.session_state:
+    tugas = st.session_state.tugas_gemini
+    if tugas["dibatalkan"].is_set() or tugas["future"].done() or time.monotonic() > tugas["batas"]:
+        del st.session_state.tugas_gemini
+        selesaikan_tugas(tugas)
+    else:
+        pantau_tugas("Ahli Kuliner sedang mencari rekomendasi...")
+
+# Kolom input untuk pengguna (dikunci selama masih ada panggilan yang berjalan)
+if prompt := st.chat_input(
+    "Tanyakan rekomendasi kuliner (misal: Jakarta Pusat)...",
+    disabled="tugas_gemini" in st.session_state,
+):
     # Tambahkan input pengguna ke riwayat pesan dan tampilkan
     st.session_state.messages.append({"role": "user", "content": prompt})
     with st.chat_message("user"):
         st.markdown(prompt)
 
-    # Dapatkan balasan dari Gemini
-    with st.chat_message("assistant"):
-        with st.spinner("Ahli Kuliner sedang mencari rekomendasi..."):
-            try:
-                # Kirim input pengguna ke model
-                response = st.session_state.chat_session.send_message(
-                    prompt, 
-                    request_options={"timeout": 60}
-                )
+    # Lokasi dijawab dari data lokal lebih dulu, lalu dari cache, baru ke Gemini.
+    # Cache (dibagi semua sesi) hanya dipakai untuk giliran pertama yang berupa nama wilayah
+    # yang dikenal, karena jawaban giliran berikutnya bergantung pada percakapan sebelumnya.
+    kunci = kunci_lokasi(prompt)
+    giliran_pertama = sum(m["role"] == "user" for m in st.session_state.messages) == 1
+    kunci_cache = kunci if kunci and giliran_pertama and lokasi_dikenal(kunci) else None
+    jawaban_instan = None
+    if kunci:
+        mulai = time.perf_counter()
+        lokasi = cari_lokasi(muat_indeks_kuliner(), kunci)
+        if lokasi is not None:
+            jawaban_instan = lokasi["jawaban"]
+            keterangan = f"📚 Dari data lokal ({(time.perf_counter() - mulai) * 1e6:.0f} µs)"
+        elif kunci_cache:
+            jawaban_instan = ambil_dari_cache(kunci_cache)
+            keterangan = f"⚡ Dari cache untuk lokasi: {kunci_cache}"
 
-                if response and response.text:
-                    st.markdown(response.text)
-                    # Tambahkan balasan model ke riwayat pesan
-                    st.session_state.messages.append({"role": "assistant", "content": response.text})
-                else:
-                    error_msg = "Maaf, saya tidak bisa memberikan balasan. Respons API kosong atau tidak valid."
-                    st.markdown(error_msg)
-                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
-
-            except Exception as e:
-                error_msg = f"Maaf, terjadi kesalahan saat berkomunikasi dengan Gemini: {e}"
-                st.markdown(error_msg)
-                st.session_state.messages.append({"role": "assistant", "content": error_msg})
\ No newline at end of file
+    if jawaban_instan is not None:
+        with st.chat_message("assistant"):
+            st.markdown(jawaban_instan)
+            st.caption(keterangan)
+        # Ikut tercatat di riwayat sehingga pertanyaan lanjutan tetap punya konteks
+        st.session_state.messages.append({"role": "assistant", "content": jawaban_instan})
+    elif not API_KEY:
+        error_msg = f"Maaf, Gemini tidak tersedia dan lokasi ini belum ada di data lokal. {pesan_saran(kunci)}"
+        with st.chat_message("assistant"):
+            st.markdown(error_msg)
+        st.session_state.messages.append({"role": "assistant", "content": error_msg, "error": True})
+    else:
+        # Kirim ke Gemini di latar belakang. Isi permintaan dibangun dari riwayat tampilan
+        # (termasuk prompt yang baru saja ditambahkan); balasan baru dicatat setelah diterima,
+        # sehingga pembatalan atau kegagalan tidak meninggalkan giliran setengah jadi.
+        isi = riwayat_untuk_gemini(st.session_state.messages)
+        model = init_gemini_model()
+
+        def panggil(timeout, berhenti):
+            return model.generate_content(isi, request_options={"timeout": timeout})
+
+        # Sesi lain yang sedang menunggu pertanyaan yang sama persis (riwayat + prompt)
+        # ikut memakai panggilan yang sudah berjalan
+        kunci_panggilan = json.dumps(isi)
+        st.session_state.tugas_gemini = kirim_tugas(
+            panggil,
+            token=len(kunci_panggilan) // 4 + MAX_TOKENS,
+            kunci=kunci_panggilan,
+            lokasi=kunci,
+            kunci_cache=kunci_cache,
+        )
+        st.rerun()
+
+# Statistik cache lokasi (dibagi semua pengguna)
+tampilkan_statistik_gemini()
+with st.sidebar:
+    st.subheader("⚡ Cache Lokasi")
+    cache = init_cache_lokasi()
+    total_permintaan = cache["hit"] + cache["miss"]
+    col_hit, col_miss = st.columns(2)
+    col_hit.metric("Hit", cache["hit"])
+    col_miss.metric("Miss", cache["miss"])
+    st.caption(
+        f"Rasio hit: {cache['hit'] / total_permintaan:.0%} · {len(cache['data'])} lokasi tersimpan"
+        if total_permintaan else f"{len(cache['data'])} lokasi tersimpan"
+    )
\ No newline at end of file
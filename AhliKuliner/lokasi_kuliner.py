@@ -0,0 +1,157 @@
+"""Pengenalan lokasi untuk chatbot Ahli Kuliner.
+
+Prompt pendek dinormalisasi menjadi kunci lokasi ("kuliner di Jogja" -> "yogyakarta")
+untuk cache rekomendasi per lokasi, lalu dicocokkan dengan gazetir (daftar_lokasi.txt)
+dan trie nama wilayah dari data kuliner lokal (kuliner_lokal.json).
+"""
+
+import json
+import re
+
+# ==============================================================================
+# KUNCI LOKASI
+# ==============================================================================
+
+# Alias yang sering dipakai pengguna, dipetakan ke nama lokasi baku
+ALIAS_LOKASI = {
+    "jogja": "yogyakarta",
+    "jogjakarta": "yogyakarta",
+    "yogya": "yogyakarta",
+    "diy": "yogyakarta",
+    "jakpus": "jakarta pusat",
+    "jakbar": "jakarta barat",
+    "jaktim": "jakarta timur",
+    "jaksel": "jakarta selatan",
+    "jakut": "jakarta utara",
+    "jkt": "jakarta",
+    "bdg": "bandung",
+    "sby": "surabaya",
+    "smg": "semarang",
+    "solo": "surakarta",
+    "mdn": "medan",
+    "mks": "makassar",
+}
+
+# Kata pengantar yang tidak mengubah lokasi yang diminta
+KATA_PENGANTAR = re.compile(
+    r"^(?:(?:tolong|dong|kak|rekomendasi|rekomendasikan|kuliner|makanan|minuman|dan|enak|khas|"
+    r"yang|ada|apa|saja|di|daerah|kota|kabupaten|kab|sekitar)\s+)+"
+)
+
+# Hanya prompt pendek berupa nama tempat yang di-cache; pertanyaan lanjutan
+# bergantung pada riwayat sehingga tetap dikirim ke Gemini
+MAKS_KATA_LOKASI = 4
+
+def kunci_lokasi(prompt):
+    """Normalisasi prompt menjadi kunci lokasi (huruf kecil, spasi rapi, alias baku).
+
+    Mengembalikan None jika prompt tidak tampak seperti nama lokasi.
+    """
+    teks = re.sub(r"[^\w\s]", " ", prompt.lower())
+    teks = KATA_PENGANTAR.sub("", " ".join(teks.split()) + " ").strip()
+    kata = [ALIAS_LOKASI.get(k, k) for k in teks.split()]
+    if not kata or len(kata) > MAKS_KATA_LOKASI or any(not k.replace(" ", "").isalpha() for k in kata):
+        return None
+    return " ".join(kata)
+
+def baca_daftar_lokasi(path):
+    """Himpunan kunci lokasi dari berkas gazetir (baris kosong dan komentar # dilewati)."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            baris = [b.strip() for b in f]
+    except OSError:
+        return frozenset()
+    return frozenset(filter(None, (kunci_lokasi(b) for b in baris if b and not b.startswith("#"))))
+
+def wilayah_dikenal(kunci, daftar_lokasi, trie):
+    """True jika kunci lokasi sama persis dengan nama wilayah di gazetir atau di trie data kuliner.
+
+    Nama wilayah yang diikuti kata lain ("medan murah meriah") bukan wilayah dikenal, sehingga
+    jawabannya tidak disimpan di bawah kunci cache lokasi yang dipakai bersama.
+    """
+    return kunci in daftar_lokasi or cari_lokasi(trie, kunci) is not None
+
+# ==============================================================================
+# TRIE WILAYAH DATA KULINER
+# ==============================================================================
+
+JUMLAH_REKOMENDASI = 3
+AKHIR = "$" # Penanda akhir nama di trie (tidak pernah muncul di kunci lokasi)
+
+def format_rekomendasi(jalur, daftar_kuliner):
+    """Susun jawaban format "3 rekomendasi" dari data wilayah, paling spesifik lebih dulu.
+
+    Jika satu wilayah punya kurang dari 3 makanan/minuman, sisanya diambil dari wilayah induknya.
+    """
+    baris = [f"Rekomendasi kuliner di **{', '.join(reversed(jalur))}**:"]
+    for jenis in ("makanan", "minuman"):
+        terpilih = {}
+        for kuliner in daftar_kuliner:
+            for item in kuliner.get(jenis, []):
+                if len(terpilih) < JUMLAH_REKOMENDASI:
+                    terpilih.setdefault(item["nama"], item["keterangan"])
+        baris.append(f"\n**{jenis.capitalize()}:**")
+        baris += [f"{i}. **{nama}** — {keterangan}" for i, (nama, keterangan) in enumerate(terpilih.items(), 1)]
+    return "\n".join(baris)
+
+def tambah_ke_trie(trie, kunci, entri):
+    simpul = trie
+    for huruf in kunci:
+        simpul = simpul.setdefault(huruf, {})
+    simpul.setdefault(AKHIR, []).append(entri)
+
+def bangun_indeks_kuliner(path):
+    """Bangun trie atas nama wilayah (beserta alias) dari berkas JSON data kuliner."""
+    trie = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return trie
+
+    def telusuri(wilayah, jalur, daftar_kuliner, tingkat_anak):
+        for tempat in wilayah:
+            jalur_baru = jalur + [tempat["nama"]]
+            kuliner_baru = [tempat.get("kuliner", {})] + daftar_kuliner
+            entri = {"jalur": jalur_baru, "jawaban": format_rekomendasi(jalur_baru, kuliner_baru)}
+            for nama in [tempat["nama"], *tempat.get("alias", [])]:
+                kunci = kunci_lokasi(nama)
+                if kunci:
+                    tambah_ke_trie(trie, kunci, entri)
+            if tingkat_anak:
+                telusuri(tempat.get(tingkat_anak[0], []), jalur_baru, kuliner_baru, tingkat_anak[1:])
+
+    telusuri(data.get("provinsi", []), [], [], ["kota", "kelurahan"])
+    return trie
+
+def cari_lokasi(trie, kunci):
+    """Cari wilayah yang namanya (atau aliasnya) sama persis dengan kunci lokasi.
+
+    Prompt dengan tambahan ("bandung utara", "medan murah meriah") tidak cocok dan diteruskan
+    ke Gemini. Jika satu nama dipakai beberapa tingkat (kota dan provinsi Yogyakarta),
+    wilayah paling spesifik yang dipilih.
+    """
+    simpul = trie
+    for huruf in kunci:
+        simpul = simpul.get(huruf)
+        if simpul is None:
+            return None
+    if AKHIR not in simpul:
+        return None
+    return max(simpul[AKHIR], key=lambda entri: len(entri["jalur"]))
+
+def saran_lokasi(trie, awalan, maks=5):
+    """Daftar nama wilayah di indeks yang diawali `awalan` (untuk saran saat Gemini tidak tersedia)."""
+    simpul = trie
+    for huruf in awalan:
+        simpul = simpul.get(huruf)
+        if simpul is None:
+            return []
+    saran, tumpukan = [], [simpul]
+    while tumpukan and len(saran) < maks:
+        simpul = tumpukan.pop()
+        for entri in simpul.get(AKHIR, []):
+            if entri["jalur"][-1] not in saran:
+                saran.append(entri["jalur"][-1])
+        tumpukan.extend(anak for huruf, anak in sorted(simpul.items(), reverse=True) if huruf != AKHIR)
+    return saran[:maks]
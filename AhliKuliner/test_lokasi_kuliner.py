@@ -0,0 +1,109 @@
+"""Uji kunci lokasi dan trie wilayah (lokasi_kuliner.py): pytest AhliKuliner/test_lokasi_kuliner.py"""
+
+import json
+import os
+
+import pytest
+
+from lokasi_kuliner import (
+    baca_daftar_lokasi, bangun_indeks_kuliner, cari_lokasi, kunci_lokasi, saran_lokasi, wilayah_dikenal
+)
+
+FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope="module")
+def daftar_lokasi():
+    return baca_daftar_lokasi(os.path.join(FOLDER, "daftar_lokasi.txt"))
+
+
+@pytest.fixture(scope="module")
+def trie():
+    return bangun_indeks_kuliner(os.path.join(FOLDER, "kuliner_lokal.json"))
+
+
+@pytest.mark.parametrize("prompt, kunci", [
+    ("Bandung", "bandung"),
+    ("  BANDUNG!! ", "bandung"),
+    ("kuliner di Jogja", "yogyakarta"),
+    ("tolong rekomendasi makanan khas di solo", "surakarta"),
+    ("Kota Medan", "medan"),
+    ("jaksel", "jakarta selatan"),
+])
+def test_kunci_lokasi(prompt, kunci):
+    assert kunci_lokasi(prompt) == kunci
+
+
+@pytest.mark.parametrize("prompt", [
+    "",
+    "???",
+    "di",
+    "apa makanan yang cocok untuk sarapan di bandung pagi ini",
+    "jalan 17 agustus",
+])
+def test_bukan_kunci_lokasi(prompt):
+    assert kunci_lokasi(prompt) is None
+
+
+def test_gazetir_sudah_dinormalisasi(daftar_lokasi):
+    assert daftar_lokasi
+    assert all(kunci_lokasi(kunci) == kunci for kunci in daftar_lokasi)
+
+
+def test_gazetir_tidak_ada(tmp_path):
+    assert baca_daftar_lokasi(tmp_path / "tidak_ada.txt") == frozenset()
+
+
+@pytest.mark.parametrize("prompt", [
+    # Prompt pendek yang lolos kunci_lokasi tetapi bukan nama wilayah: tidak boleh jadi kunci cache
+    "yang lain",
+    "terima kasih",
+    "minumannya apa",
+    "lebih murah",
+    "ok",
+])
+def test_balasan_pendek_bukan_wilayah(prompt, daftar_lokasi, trie):
+    kunci = kunci_lokasi(prompt)
+    assert kunci is None or not wilayah_dikenal(kunci, daftar_lokasi, trie)
+
+
+@pytest.mark.parametrize("prompt", ["Bandung", "kuliner di Jogja", "Bali", "Labuan Bajo", "kabupaten Sleman"])
+def test_wilayah_dikenal(prompt, daftar_lokasi, trie):
+    assert wilayah_dikenal(kunci_lokasi(prompt), daftar_lokasi, trie)
+
+
+@pytest.mark.parametrize("prompt", ["medan murah meriah", "bandung utara", "jakarta tapi yang halal"])
+def test_nama_wilayah_dengan_tambahan_bukan_wilayah_dikenal(prompt, daftar_lokasi, trie):
+    # Jawabannya bukan rekomendasi umum wilayah itu, jadi tidak boleh masuk cache lokasi
+    assert not wilayah_dikenal(kunci_lokasi(prompt), daftar_lokasi, trie)
+
+
+def test_semua_wilayah_data_lokal_ditemukan(trie):
+    with open(os.path.join(FOLDER, "kuliner_lokal.json"), encoding="utf-8") as f:
+        data = json.load(f)
+    for provinsi in data["provinsi"]:
+        for kota in provinsi.get("kota", []):
+            lokasi = cari_lokasi(trie, kunci_lokasi(kota["nama"]))
+            assert lokasi is not None and lokasi["jalur"][-1] == kota["nama"]
+
+
+@pytest.mark.parametrize("prompt", [
+    "bandung utara", "bandungan", "bali untuk vegetarian", "jakarta tapi yang halal", "bandung selain seblak",
+    "medan murah meriah",
+])
+def test_cari_lokasi_dengan_tambahan_diteruskan(prompt, trie):
+    # Permintaan khusus tidak dijawab dengan rekomendasi umum wilayah
+    assert cari_lokasi(trie, kunci_lokasi(prompt)) is None
+
+
+def test_cari_lokasi_persis(trie):
+    assert cari_lokasi(trie, "bandung")["jalur"][-1] == "Bandung"
+    # Nama yang dipakai beberapa tingkat: wilayah paling spesifik dipilih
+    assert len(cari_lokasi(trie, "yogyakarta")["jalur"]) > 1
+    assert cari_lokasi(trie, kunci_lokasi("solo"))["jalur"][-1] == "Surakarta"
+
+
+def test_saran_lokasi(trie):
+    saran = saran_lokasi(trie, "ja", maks=3)
+    assert 0 < len(saran) <= 3
+    assert saran_lokasi(trie, "zzz") == []
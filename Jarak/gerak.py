@@ -0,0 +1,165 @@
+"""Perhitungan gerak kendaraan untuk simulasi Jarak: event menyusul/bertemu dua kendaraan
+secara eksak, bisa di-broadcast ke banyak skenario sekaligus (grid eksplorasi parameter),
+dan sapuan kinetik untuk semua event antar banyak kendaraan.
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+def posisi(t, v, start_time, posisi_awal=0.0, arah=1.0):
+    """Posisi kendaraan pada waktu t (angka atau array): diam sampai berangkat, lalu bergerak lurus."""
+    return posisi_awal + arah * v * np.maximum(0, t - start_time)
+
+def hitung_event(v1, v2, start_time1, start_time2, initial_distance, duration, scenario):
+    """Fungsi untuk menghitung waktu dan posisi event (menyusul/bertemu) secara eksak.
+
+    Kendaraan 1 mulai dari 0; Kendaraan 2 mulai dari initial_distance dan bergerak
+    searah (menyusul) atau berlawanan (bertemu). Selisih posisi P1 - P2 linear di antara
+    titik belok (0, waktu berangkat 1, waktu berangkat 2, durasi), sehingga event cukup
+    dicari pada ruas pertama yang berganti tanda lalu diselesaikan dengan interpolasi
+    linear, yang eksak untuk fungsi linear. Semua argumen angka boleh berupa array
+    (broadcast), jadi fungsi ini juga dipakai untuk menghitung banyak skenario sekaligus.
+    Mengembalikan (waktu_event, posisi_event, titik_belok); NaN jika event tidak terjadi.
+    """
+    arah2 = -1.0 if scenario == "Kendaraan Bertemu" else 1.0
+    v1, v2, start_time1, start_time2, initial_distance, duration = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (v1, v2, start_time1, start_time2, initial_distance, duration))
+    )
+
+    titik = np.sort(np.stack([
+        np.zeros_like(duration),
+        np.clip(start_time1, 0, duration),
+        np.clip(start_time2, 0, duration),
+        duration,
+    ], axis=-1), axis=-1)
+
+    selisih = posisi(titik, v1[..., None], start_time1[..., None]) - \
+        posisi(titik, v2[..., None], start_time2[..., None], initial_distance[..., None], arah2)
+    g0, g1 = selisih[..., :-1], selisih[..., 1:]
+
+    # Menyusul: Kendaraan 1 dari belakang mencapai Kendaraan 2.
+    # Bertemu: posisi keduanya bersilangan dari arah mana pun.
+    berganti = (g0 < 0) & (g1 >= 0)
+    if scenario == "Kendaraan Bertemu":
+        berganti |= (g0 > 0) & (g1 <= 0)
+
+    ruas = np.argmax(berganti, axis=-1)[..., None]
+    ada = berganti.any(axis=-1)
+    ta, tb = np.take_along_axis(titik[..., :-1], ruas, -1)[..., 0], np.take_along_axis(titik[..., 1:], ruas, -1)[..., 0]
+    ga, gb = np.take_along_axis(g0, ruas, -1)[..., 0], np.take_along_axis(g1, ruas, -1)[..., 0]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        waktu_event = np.where(ada, ta - ga * (tb - ta) / (gb - ga), np.nan)
+    posisi_event = np.where(ada, posisi(waktu_event, v1, start_time1), np.nan)
+    return waktu_event, posisi_event, titik
+
+# Sumbu yang bisa dipilih pada mode eksplorasi: pilihan -> (label sumbu x, label sumbu y)
+SUMBU_EKSPLORASI = {
+    "Kecepatan Kendaraan 1 × Kecepatan Kendaraan 2": ("Kecepatan Kendaraan 1 (km/jam)", "Kecepatan Kendaraan 2 (km/jam)"),
+    "Kecepatan Kendaraan 1 × Selisih Waktu Berangkat": ("Kecepatan Kendaraan 1 (km/jam)", "Selisih berangkat (jam, + = Kendaraan 1 belakangan)"),
+    "Kecepatan Kendaraan 1 × Jarak Awal": ("Kecepatan Kendaraan 1 (km/jam)", "Jarak Awal (km)"),
+}
+
+def hitung_grid_event(sumbu, resolusi, batas_x, batas_y, v1, v2, start_time1, start_time2, initial_distance, duration, scenario):
+    """Fungsi untuk menghitung waktu & posisi event di seluruh grid parameter dalam satu kali hitung.
+
+    Dua parameter yang dipilih `sumbu` diganti grid resolusi x resolusi; parameter lain tetap.
+    Mengembalikan (nilai sumbu x, nilai sumbu y, waktu_event, posisi_event).
+    """
+    x = np.linspace(*batas_x, resolusi)
+    y = np.linspace(*batas_y, resolusi)
+    gx, gy = np.meshgrid(x, y)
+
+    if sumbu == "Kecepatan Kendaraan 1 × Kecepatan Kendaraan 2":
+        v1, v2 = gx, gy
+    elif sumbu == "Kecepatan Kendaraan 1 × Selisih Waktu Berangkat":
+        # Selisih positif: Kendaraan 1 berangkat belakangan; negatif: Kendaraan 2 yang belakangan
+        v1, start_time1, start_time2 = gx, np.maximum(gy, 0), np.maximum(-gy, 0)
+    else:
+        v1, initial_distance = gx, gy
+
+    waktu_event, posisi_event, _ = hitung_event(v1, v2, start_time1, start_time2, initial_distance, duration, scenario)
+    return x, y, waktu_event, posisi_event
+
+def sapuan_kinetik(x0, u, t0, horizon, maks_kejadian=100_000):
+    """Fungsi untuk mencari semua event menyusul/berpapasan antar banyak kendaraan.
+
+    Kendaraan diam di x0 sampai waktu berangkat t0, lalu bergerak dengan kecepatan
+    bertanda u (negatif = ke arah titik 0). Urutan posisi kendaraan dijaga sebagai daftar
+    terurut; hanya pasangan yang bersebelahan yang bisa saling melewati, jadi cukup
+    waktu persilangan tiap pasangan tetangga yang dimasukkan ke antrean prioritas.
+    Setiap persilangan menukar dua kendaraan dan memperbarui paling banyak tiga
+    pasangan tetangga, sehingga biayanya O((N + K) log N) untuk K event.
+    Mengembalikan tabel event terurut waktu dan penanda apakah batas event tercapai.
+    """
+    x0 = np.asarray(x0, dtype=float)
+    u = np.asarray(u, dtype=float)
+    t0 = np.asarray(t0, dtype=float)
+    n = len(x0)
+
+    # Kecepatan saat ini: 0 sebelum berangkat.
+    # Urutan awal menurut posisi; posisi sama diurutkan menurut kecepatan awal.
+    kecepatan = np.where(t0 <= 0, u, 0.0)
+    urutan = np.lexsort((kecepatan, x0)).tolist()
+    letak = [0] * n
+    for k, i in enumerate(urutan):
+        letak[i] = k
+    # Loop utama memakai list Python biasa karena akses per elemen jauh lebih cepat daripada array NumPy
+    x0, u, t0, kecepatan = x0.tolist(), u.tolist(), t0.tolist(), kecepatan.tolist()
+    versi = [0] * n  # versi sertifikat pasangan (kendaraan, tetangga kanannya)
+
+    def posisi_pada(i, t):
+        return x0[i] + u[i] * (t - t0[i]) if t > t0[i] else x0[i]
+
+    antrean = [(t0[i], 0, i, -1, 0) for i in range(n) if 0 < t0[i] <= horizon]
+    heapq.heapify(antrean)
+
+    def jadwalkan(k, sekarang):
+        """Jadwalkan persilangan pasangan di letak k dan k+1 (jika ada) mulai waktu sekarang."""
+        if k < 0 or k + 1 >= n:
+            return
+        a, b = urutan[k], urutan[k + 1]
+        versi[a] += 1
+        if kecepatan[a] <= kecepatan[b]:
+            return
+        jarak = posisi_pada(b, sekarang) - posisi_pada(a, sekarang)
+        t_silang = sekarang + max(jarak, 0.0) / (kecepatan[a] - kecepatan[b])
+        if t_silang <= horizon:
+            heapq.heappush(antrean, (t_silang, 1, a, b, versi[a]))
+
+    for k in range(n - 1):
+        jadwalkan(k, 0.0)
+
+    kejadian = []
+    while antrean and len(kejadian) < maks_kejadian:
+        t, jenis, a, b, v = heapq.heappop(antrean)
+        if jenis == 0:
+            # Kendaraan a berangkat: kecepatannya berubah, sertifikat kedua sisinya dihitung ulang
+            kecepatan[a] = u[a]
+            jadwalkan(letak[a] - 1, t)
+            jadwalkan(letak[a], t)
+            continue
+
+        # Abaikan sertifikat yang sudah usang (tetangga berubah sejak dijadwalkan)
+        if v != versi[a] or letak[a] + 1 != letak[b]:
+            continue
+
+        if kecepatan[a] == 0 or kecepatan[b] == 0:
+            keterangan = "Melewati kendaraan diam"
+        elif (kecepatan[a] > 0) == (kecepatan[b] > 0):
+            keterangan = "Menyusul"
+        else:
+            keterangan = "Berpapasan"
+        kejadian.append((t, posisi_pada(a, t), a, b, keterangan))
+
+        k = letak[a]
+        urutan[k], urutan[k + 1] = b, a
+        letak[a], letak[b] = k + 1, k
+        jadwalkan(k - 1, t)
+        jadwalkan(k, t)
+        jadwalkan(k + 1, t)
+
+    tabel = pd.DataFrame(kejadian, columns=["Waktu (jam)", "Posisi (km)", "Kendaraan A", "Kendaraan B", "Jenis"])
+    return tabel, len(kejadian) >= maks_kejadian
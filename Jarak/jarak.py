@@ -1,6 +1,39 @@
+import time
+
 import streamlit as st
 import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
+
+# Posisi, event dua kendaraan, grid eksplorasi, dan sapuan kinetik (tanpa Streamlit, bisa diuji terpisah)
+from gerak import SUMBU_EKSPLORASI, hitung_event, hitung_grid_event, posisi, sapuan_kinetik
+
+# --- Fungsi Perhitungan ---
+@st.cache_data(show_spinner="Mencari semua event...", max_entries=8)
+def hitung_sapuan(kendaraan, duration, maks_kejadian):
+    """Versi ter-cache dari sapuan_kinetik untuk tabel kendaraan dari antarmuka."""
+    mulai = time.perf_counter()
+    tabel, terpotong = sapuan_kinetik(
+        kendaraan["Posisi awal (km)"], kendaraan["Kecepatan (km/jam)"], kendaraan["Berangkat (jam)"],
+        duration, maks_kejadian,
+    )
+    return tabel, terpotong, time.perf_counter() - mulai
+
+def kendaraan_acak(n, panjang_jalan, duration, seed):
+    """Fungsi untuk membuat data kendaraan acak di satu ruas jalan."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Posisi awal (km)": rng.uniform(0, panjang_jalan, n).round(2),
+        "Kecepatan (km/jam)": (rng.uniform(30, 120, n) * rng.choice([1, -1], n, p=[0.7, 0.3])).round(1),
+        "Berangkat (jam)": rng.uniform(0, duration / 2, n).round(2),
+    })
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def grid_event(sumbu, resolusi, batas_x, batas_y, v1, v2, start_time1, start_time2, initial_distance, duration, scenario):
+    """Versi ter-cache dari hitung_grid_event: grid yang pernah dihitung langsung dipakai ulang."""
+    return hitung_grid_event(
+        sumbu, resolusi, batas_x, batas_y, v1, v2, start_time1, start_time2, initial_distance, duration, scenario
+    )
 
 st.set_page_config(layout="wide")
 
@@ -34,136 +67,170 @@ duration = st.sidebar.slider("Durasi Simulasi Maksimal (jam)", value=5, min_valu
 st.sidebar.write("---")
 simulate_button = st.sidebar.button("Mulai Simulasi")
 
-# --- Logika Perhitungan ---
-if simulate_button:
-    st.subheader("Hasil Simulasi")
-
-    time_points = np.linspace(0, duration, 500) # Titik-titik waktu untuk grafik
-
-    # Posisi awal kendaraan
-    # Asumsi kendaraan 1 mulai dari 0
-    pos_veh1_at_t0 = 0.0
-
-    # Kendaraan 2 dimulai dari initial_distance (baik menyusul maupun bertemu)
-    pos_veh2_at_t0 = initial_distance
-
-    positions_veh1 = []
-    positions_veh2 = []
-
-    time_of_event = None # Waktu terjadi penyusulan/pertemuan
-    distance_at_event = None # Jarak saat penyusulan/pertemuan
-
-    # Untuk menyimpan data event secara akurat
-    min_diff = float('inf')
-    best_time_idx = -1
-
-    for i, t in enumerate(time_points):
-        # Penyesuaian waktu efektif berangkat untuk masing-masing kendaraan
-        effective_t1 = max(0, t - start_time1)
-        effective_t2 = max(0, t - start_time2)
-
-        pos1 = pos_veh1_at_t0 + (v1 * effective_t1)
-
-        # Bagian ini yang krusial diperbaiki
-        if scenario == "Kendaraan Bertemu":
-            # Kendaraan 2 bergerak dari initial_distance menuju 0 (mundur)
-            pos2 = pos_veh2_at_t0 - (v2 * effective_t2)
-        else: # Skenario "Kendaraan Menyusul"
-            # Kendaraan 2 bergerak dari initial_distance ke arah yang sama dengan Kendaraan 1 (maju)
-            pos2 = pos_veh2_at_t0 + (v2 * effective_t2)
-
-        positions_veh1.append(pos1)
-        positions_veh2.append(pos2)
-
-        # Deteksi event
-        if scenario == "Kendaraan Menyusul":
-            # Kendaraan 1 menyusul kendaraan 2 jika pos1 >= pos2 dan belum pernah menyusul
-            # Juga pastikan Kendaraan 1 lebih cepat dari Kendaraan 2 untuk skenario ini,
-            # atau setidaknya berangkat duluan sehingga bisa menyusul.
-            if v1 > v2 or start_time1 < start_time2: # Cek kondisi potensial menyusul
-                 if pos1 >= pos2 and time_of_event is None and t > 0:
-                    # Pastikan Kendaraan 1 awalnya di belakang atau sama posisi
-                    # agar ini bukan deteksi yang salah di awal simulasi.
-                    if (pos_veh1_at_t0 + (v1 * max(0, time_points[0] - start_time1))) < \
-                       (pos_veh2_at_t0 + (v2 * max(0, time_points[0] - start_time2))):
-                        time_of_event = t
-                        distance_at_event = pos1
-        elif scenario == "Kendaraan Bertemu":
-            # Kendaraan bertemu jika posisi mereka berpotongan (atau jarak sangat dekat)
-            # Karena mereka bergerak berlawanan, titik perpotongan adalah pertemuan
-            if time_of_event is None: # Hanya deteksi sekali
-                current_diff = abs(pos1 - pos2)
-                # Jika ada persilangan atau jarak sangat kecil
-                if i > 0 and ((positions_veh1[i-1] < positions_veh2[i-1] and pos1 >= pos2) or \
-                              (positions_veh1[i-1] > positions_veh2[i-1] and pos1 <= pos2)):
-                    time_of_event = t
-                    distance_at_event = (pos1 + pos2) / 2 # Ambil rata-rata posisi saat bertemu
-                    
-                # Alternatif: Cari titik terdekat jika tidak ada persilangan sempurna
-                if current_diff < min_diff:
-                    min_diff = current_diff
-                    best_time_idx = i
-                # Jika sudah melewati titik terdekat dan belum terdeteksi pertemuan (misal karena langkah waktu besar)
-                if i > best_time_idx + 10 and time_of_event is None and min_diff < 1.0: # Jika jaraknya sudah sangat dekat
-                    time_of_event = time_points[best_time_idx]
-                    distance_at_event = (positions_veh1[best_time_idx] + positions_veh2[best_time_idx]) / 2
-
-
-    # --- Visualisasi ---
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.plot(time_points, positions_veh1, label=f'Kendaraan 1 (v={v1} km/jam, start={start_time1} jam)', color='blue')
-    ax.plot(time_points, positions_veh2, label=f'Kendaraan 2 (v={v2} km/jam, start={start_time2} jam)', color='red', linestyle='--')
-
-    if time_of_event is not None:
-        ax.axvline(x=time_of_event, color='green', linestyle=':', label=f'Waktu Event: {time_of_event:.2f} jam')
-        ax.plot(time_of_event, distance_at_event, 'go', markersize=8, label=f'Posisi Event: {distance_at_event:.2f} km')
-        st.success(f"**{scenario} terjadi pada waktu:** {time_of_event:.2f} jam")
-        st.success(f"**Pada jarak dari titik awal Kendaraan 1:** {distance_at_event:.2f} km")
-    else:
-        st.warning(f"**{scenario} tidak terjadi dalam durasi simulasi ({duration} jam).** Coba tingkatkan durasi atau ubah parameter.")
-
+tab_simulasi, tab_eksplorasi, tab_banyak = st.tabs(["📈 Simulasi", "🗺️ Eksplorasi Parameter", "🚗 Banyak Kendaraan"])
+
+with tab_simulasi:
+    # --- Logika Perhitungan ---
+    if simulate_button:
+        st.subheader("Hasil Simulasi")
+
+        # Posisi awal kendaraan
+        # Asumsi kendaraan 1 mulai dari 0
+        pos_veh1_at_t0 = 0.0
+
+        # Kendaraan 2 dimulai dari initial_distance (baik menyusul maupun bertemu)
+        pos_veh2_at_t0 = initial_distance
+        arah_veh2 = -1.0 if scenario == "Kendaraan Bertemu" else 1.0
+
+        waktu_event, posisi_event, titik_belok = hitung_event(
+            v1, v2, start_time1, start_time2, initial_distance, duration, scenario
+        )
+        time_of_event = None if np.isnan(waktu_event) else float(waktu_event)  # Waktu terjadi penyusulan/pertemuan
+        distance_at_event = None if np.isnan(posisi_event) else float(posisi_event)  # Jarak saat penyusulan/pertemuan
+
+        # Lintasan linear sepotong-sepotong, jadi cukup digambar dari titik beloknya (+ titik event)
+        time_points = np.unique(np.append(titik_belok, [] if time_of_event is None else [time_of_event]))
+        positions_veh1 = posisi(time_points, v1, start_time1, pos_veh1_at_t0)
+        positions_veh2 = posisi(time_points, v2, start_time2, pos_veh2_at_t0, arah_veh2)
+
+        # --- Visualisasi ---
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.plot(time_points, positions_veh1, label=f'Kendaraan 1 (v={v1} km/jam, start={start_time1} jam)', color='blue')
+        ax.plot(time_points, positions_veh2, label=f'Kendaraan 2 (v={v2} km/jam, start={start_time2} jam)', color='red', linestyle='--')
+
+        if time_of_event is not None:
+            ax.axvline(x=time_of_event, color='green', linestyle=':', label=f'Waktu Event: {time_of_event:.2f} jam')
+            ax.plot(time_of_event, distance_at_event, 'go', markersize=8, label=f'Posisi Event: {distance_at_event:.2f} km')
+            st.success(f"**{scenario} terjadi pada waktu:** {time_of_event:.2f} jam")
+            st.success(f"**Pada jarak dari titik awal Kendaraan 1:** {distance_at_event:.2f} km")
+        else:
+            st.warning(f"**{scenario} tidak terjadi dalam durasi simulasi ({duration} jam).** Coba tingkatkan durasi atau ubah parameter.")
+
+
+        ax.set_xlabel("Waktu (jam)")
+        ax.set_ylabel("Posisi (km)")
+        ax.set_title(f"Grafik Posisi vs Waktu ({scenario})")
+        ax.legend()
+        ax.grid(True)
+        st.pyplot(fig)
+
+        st.markdown("---")
+        st.subheader("Ayo Berpikir!")
+        st.markdown("""
+        Setelah mencoba beberapa kali dengan mengubah-ubah nilai di samping, coba jawab pertanyaan berikut:
+        1.  **Kendaraan Menyusul:** Apa hubungan antara kecepatan kedua kendaraan, jarak awal, dan waktu penyusulan? Bisakah kamu menemukan sebuah rumus yang menghubungkan ketiganya?
+        2.  **Kendaraan Bertemu:** Bagaimana hubungan antara kecepatan, jarak awal, dan waktu pertemuan? Apakah ada rumus yang bisa kamu rumuskan?
+        3.  Apa yang terjadi jika kecepatan kendaraan yang di depan lebih cepat dalam skenario 'menyusul'?
+        4.  Apa yang terjadi jika salah satu kendaraan berangkat lebih dulu?
+        """)
 
-    ax.set_xlabel("Waktu (jam)")
-    ax.set_ylabel("Posisi (km)")
-    ax.set_title(f"Grafik Posisi vs Waktu ({scenario})")
-    ax.legend()
-    ax.grid(True)
-    st.pyplot(fig)
+        st.markdown("---")
+        st.subheader("Rumus yang Mungkin Kamu Temukan (Jangan langsung dibuka ya! Coba cari tahu sendiri dulu!)")
+        with st.expander("Klik untuk melihat petunjuk rumus"):
+            st.markdown(r"""
+            * **Konsep Dasar:** Jarak = Kecepatan $\times$ Waktu.
+            * **Kasus Menyusul:**
+                * Misalkan $t$ adalah waktu saat menyusul (dihitung dari $t=0$).
+                * Posisi Kendaraan 1: $P_1(t) = v_1 \times \max(0, t - \text{start\_time}_1)$
+                * Posisi Kendaraan 2: $P_2(t) = \text{initial\_distance} + (v_2 \times \max(0, t - \text{start\_time}_2))$
+                * Saat menyusul, $P_1(t) = P_2(t)$.
+                * $v_1 \times (t - \text{start\_time}_1) = \text{initial\_distance} + v_2 \times (t - \text{start\_time}_2)$
+                * Coba substitusikan dan selesaikan untuk $t$!
+            * **Kasus Bertemu:**
+                * Misalkan $t$ adalah waktu saat bertemu (dihitung dari $t=0$).
+                * Posisi Kendaraan 1: $P_1(t) = v_1 \times \max(0, t - \text{start\_time}_1)$
+                * Posisi Kendaraan 2: $P_2(t) = \text{initial\_distance} - (v_2 \times \max(0, t - \text{start\_time}_2))$
+                * Saat bertemu, posisi mereka sama: $P_1(t) = P_2(t)$.
+                * $v_1 \times (t - \text{start\_time}_1) = \text{initial\_distance} - v_2 \times (t - \text{start\_time}_2)$
+                * Coba substitusikan dan selesaikan untuk $t$!
+            """)
+
+        st.markdown("---")
+        st.subheader("Contoh Soal Kontekstual")
+        st.markdown("""
+        1.  **Soal Menyusul:** "Andi naik motor dengan kecepatan 60 km/jam. Satu jam kemudian, Budi menyusul dengan mobil berkecepatan 80 km/jam dari tempat yang sama. Kapan dan di mana Budi akan menyusul Andi?"
+        2.  **Soal Bertemu:** "Kota A dan Kota B berjarak 300 km. Sebuah bus berangkat dari Kota A menuju Kota B dengan kecepatan 70 km/jam. Pada saat yang bersamaan, sebuah truk berangkat dari Kota B menuju Kota A dengan kecepatan 50 km/jam. Kapan dan di mana mereka akan bertemu?"
+        """)
 
-    st.markdown("---")
-    st.subheader("Ayo Berpikir!")
+with tab_eksplorasi:
+    st.subheader("Eksplorasi Parameter")
     st.markdown("""
-    Setelah mencoba beberapa kali dengan mengubah-ubah nilai di samping, coba jawab pertanyaan berikut:
-    1.  **Kendaraan Menyusul:** Apa hubungan antara kecepatan kedua kendaraan, jarak awal, dan waktu penyusulan? Bisakah kamu menemukan sebuah rumus yang menghubungkan ketiganya?
-    2.  **Kendaraan Bertemu:** Bagaimana hubungan antara kecepatan, jarak awal, dan waktu pertemuan? Apakah ada rumus yang bisa kamu rumuskan?
-    3.  Apa yang terjadi jika kecepatan kendaraan yang di depan lebih cepat dalam skenario 'menyusul'?
-    4.  Apa yang terjadi jika salah satu kendaraan berangkat lebih dulu?
+    Bagaimana waktu dan posisi event berubah jika parameter diubah sedikit demi sedikit?
+    Setiap titik pada peta di bawah adalah satu simulasi; area abu-abu berarti event **tidak terjadi**
+    dalam durasi simulasi. Parameter yang tidak menjadi sumbu diambil dari pengaturan di samping.
     """)
 
-    st.markdown("---")
-    st.subheader("Rumus yang Mungkin Kamu Temukan (Jangan langsung dibuka ya! Coba cari tahu sendiri dulu!)")
-    with st.expander("Klik untuk melihat petunjuk rumus"):
-        st.markdown(r"""
-        * **Konsep Dasar:** Jarak = Kecepatan $\times$ Waktu.
-        * **Kasus Menyusul:**
-            * Misalkan $t$ adalah waktu saat menyusul (dihitung dari $t=0$).
-            * Posisi Kendaraan 1: $P_1(t) = v_1 \times \max(0, t - \text{start\_time}_1)$
-            * Posisi Kendaraan 2: $P_2(t) = \text{initial\_distance} + (v_2 \times \max(0, t - \text{start\_time}_2))$
-            * Saat menyusul, $P_1(t) = P_2(t)$.
-            * $v_1 \times (t - \text{start\_time}_1) = \text{initial\_distance} + v_2 \times (t - \text{start\_time}_2)$
-            * Coba substitusikan dan selesaikan untuk $t$!
-        * **Kasus Bertemu:**
-            * Misalkan $t$ adalah waktu saat bertemu (dihitung dari $t=0$).
-            * Posisi Kendaraan 1: $P_1(t) = v_1 \times \max(0, t - \text{start\_time}_1)$
-            * Posisi Kendaraan 2: $P_2(t) = \text{initial\_distance} - (v_2 \times \max(0, t - \text{start\_time}_2))$
-            * Saat bertemu, posisi mereka sama: $P_1(t) = P_2(t)$.
-            * $v_1 \times (t - \text{start\_time}_1) = \text{initial\_distance} - v_2 \times (t - \text{start\_time}_2)$
-            * Coba substitusikan dan selesaikan untuk $t$!
-        """)
-
-    st.markdown("---")
-    st.subheader("Contoh Soal Kontekstual")
+    sumbu = st.selectbox("Sumbu peta:", list(SUMBU_EKSPLORASI.keys()))
+    resolusi = st.slider("Resolusi grid (titik per sumbu)", 50, 1000, 500, 50)
+    col_x, col_y = st.columns(2)
+    batas_x = col_x.slider("Rentang kecepatan Kendaraan 1 (km/jam)", 1.0, 300.0, (1.0, 150.0))
+    if sumbu == "Kecepatan Kendaraan 1 × Kecepatan Kendaraan 2":
+        batas_y = col_y.slider("Rentang kecepatan Kendaraan 2 (km/jam)", 1.0, 300.0, (1.0, 150.0))
+    elif sumbu == "Kecepatan Kendaraan 1 × Selisih Waktu Berangkat":
+        batas_y = col_y.slider("Rentang selisih waktu berangkat (jam)", -12.0, 12.0, (-3.0, 3.0), 0.5)
+    else:
+        batas_y = col_y.slider("Rentang jarak awal (km)", 0.0, 1000.0, (0.0, 300.0), 10.0)
+
+    x, y, waktu_grid, posisi_grid = grid_event(
+        sumbu, resolusi, batas_x, batas_y, v1, v2, start_time1, start_time2, initial_distance, duration, scenario
+    )
+    label_x, label_y = SUMBU_EKSPLORASI[sumbu]
+    st.caption(f"{resolusi * resolusi:,} skenario dihitung; event terjadi pada {np.mean(~np.isnan(waktu_grid)):.0%} di antaranya.")
+
+    fig_peta, (ax_waktu, ax_posisi) = plt.subplots(1, 2, figsize=(14, 5.5))
+    for ax, data, judul, satuan in ((ax_waktu, waktu_grid, "Waktu Event", "jam"), (ax_posisi, posisi_grid, "Posisi Event", "km")):
+        cmap = plt.get_cmap("viridis").copy()
+        cmap.set_bad("lightgray")
+        peta = ax.imshow(np.ma.masked_invalid(data), origin="lower", aspect="auto", cmap=cmap,
+                         extent=(x[0], x[-1], y[0], y[-1]))
+        if np.any(~np.isnan(data)):
+            garis = ax.contour(x, y, data, levels=8, colors="white", linewidths=0.7)
+            ax.clabel(garis, fontsize=8, fmt="%.1f")
+        fig_peta.colorbar(peta, ax=ax, label=satuan)
+        ax.set_title(f"{judul} ({scenario})")
+        ax.set_xlabel(label_x)
+        ax.set_ylabel(label_y)
+    st.pyplot(fig_peta)
+
+with tab_banyak:
+    st.subheader("Banyak Kendaraan di Satu Jalan")
     st.markdown("""
-    1.  **Soal Menyusul:** "Andi naik motor dengan kecepatan 60 km/jam. Satu jam kemudian, Budi menyusul dengan mobil berkecepatan 80 km/jam dari tempat yang sama. Kapan dan di mana Budi akan menyusul Andi?"
-    2.  **Soal Bertemu:** "Kota A dan Kota B berjarak 300 km. Sebuah bus berangkat dari Kota A menuju Kota B dengan kecepatan 70 km/jam. Pada saat yang bersamaan, sebuah truk berangkat dari Kota B menuju Kota A dengan kecepatan 50 km/jam. Kapan dan di mana mereka akan bertemu?"
+    Ratusan hingga ribuan kendaraan dengan kecepatan, posisi awal, dan waktu berangkat berbeda.
+    Kecepatan negatif berarti kendaraan bergerak ke arah titik 0. Semua event menyusul dan
+    berpapasan dicari dengan menjaga urutan kendaraan di jalan dan hanya memeriksa tetangga terdekat.
     """)
+
+    col_n, col_jalan, col_batas, col_seed = st.columns(4)
+    jumlah_kendaraan = col_n.number_input("Jumlah kendaraan", 2, 5000, 200)
+    panjang_jalan = col_jalan.number_input("Panjang jalan awal (km)", 1.0, 1000.0, 100.0, 10.0)
+    maks_kejadian = col_batas.number_input("Batas jumlah event", 1000, 2_000_000, 200_000, 1000)
+    seed = col_seed.number_input("Seed acak", 0, 10_000, 0)
+
+    kendaraan = kendaraan_acak(jumlah_kendaraan, panjang_jalan, duration, seed)
+    if jumlah_kendaraan <= 30:
+        kendaraan = st.data_editor(kendaraan, key=f"kendaraan_{jumlah_kendaraan}_{panjang_jalan}_{seed}")
+
+    tabel_kejadian, terpotong, lama = hitung_sapuan(kendaraan, duration, maks_kejadian)
+
+    col_a, col_b, col_c = st.columns(3)
+    col_a.metric("Jumlah event", f"{len(tabel_kejadian):,}")
+    col_b.metric("Menyusul", f"{(tabel_kejadian['Jenis'] == 'Menyusul').sum():,}")
+    col_c.metric("Waktu komputasi", f"{lama * 1000:.0f} ms")
+    if terpotong:
+        st.warning(f"Batas {maks_kejadian:,} event tercapai; event setelah {tabel_kejadian['Waktu (jam)'].iloc[-1]:.3f} jam tidak dihitung.")
+
+    st.dataframe(tabel_kejadian.head(1000), use_container_width=True)
+
+    if jumlah_kendaraan <= 50:
+        fig_banyak, ax = plt.subplots(figsize=(10, 6))
+        for i, baris in kendaraan.iterrows():
+            t_lintasan = np.unique(np.clip([0.0, baris["Berangkat (jam)"], duration], 0, duration))
+            ax.plot(t_lintasan, posisi(t_lintasan, baris["Kecepatan (km/jam)"], baris["Berangkat (jam)"], baris["Posisi awal (km)"]),
+                    linewidth=1)
+        ax.scatter(tabel_kejadian["Waktu (jam)"], tabel_kejadian["Posisi (km)"], s=10, color="black", zorder=3, label="Event")
+        ax.set_xlabel("Waktu (jam)")
+        ax.set_ylabel("Posisi (km)")
+        ax.set_title("Grafik Posisi vs Waktu (Banyak Kendaraan)")
+        ax.legend()
+        ax.grid(True)
+        st.pyplot(fig_banyak)
@@ -0,0 +1,164 @@
+"""Uji event dua kendaraan, grid eksplorasi, dan sapuan kinetik (gerak.py): pytest Jarak/test_gerak.py"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from gerak import SUMBU_EKSPLORASI, hitung_event, hitung_grid_event, posisi, sapuan_kinetik
+
+MENYUSUL = "Kendaraan Menyusul"
+BERTEMU = "Kendaraan Bertemu"
+
+
+@pytest.mark.parametrize("argumen, scenario, waktu, jarak", [
+    # (v1, v2, berangkat1, berangkat2, jarak_awal, durasi)
+    ((60, 40, 0, 0, 100, 10), MENYUSUL, 5.0, 300.0),
+    ((60, 40, 0, 0, 100, 10), BERTEMU, 1.0, 60.0),
+    ((60, 40, 0, 1, 100, 10), BERTEMU, 1.4, 84.0),
+    ((60, 40, 2, 0, 100, 10), MENYUSUL, 11.0, 540.0),
+])
+def test_event_eksak(argumen, scenario, waktu, jarak):
+    durasi = max(argumen[5], waktu + 1)
+    t, p, _ = hitung_event(*argumen[:5], durasi, scenario)
+    assert float(t) == pytest.approx(waktu)
+    assert float(p) == pytest.approx(jarak)
+
+
+@pytest.mark.parametrize("argumen, scenario", [
+    ((40, 60, 0, 0, 100, 10), MENYUSUL), # Kendaraan 1 lebih lambat
+    ((60, 40, 0, 0, 100, 4), MENYUSUL), # Baru menyusul pada jam ke-5
+    ((60, 40, 5, 5, 100, 4), BERTEMU), # Belum ada yang berangkat
+])
+def test_tidak_ada_event(argumen, scenario):
+    t, p, _ = hitung_event(*argumen, scenario)
+    assert np.isnan(t) and np.isnan(p)
+
+
+def event_naif(v1, v2, t1, t2, jarak, durasi, scenario, langkah=1e-4):
+    """Event pertama dicari dengan mencoba waktu berjarak `langkah` (tanpa titik belok).
+
+    Dengan jarak awal positif, Kendaraan 1 mulai di belakang; event pada kedua skenario
+    adalah saat pertama selisih posisinya tidak lagi negatif.
+    """
+    arah2 = -1.0 if scenario == BERTEMU else 1.0
+    t = np.arange(0, durasi + langkah, langkah)
+    lewat = posisi(t, v1, t1) - posisi(t, v2, t2, jarak, arah2) >= 0
+    return t[np.argmax(lewat)] if lewat.any() else np.nan
+
+
+@pytest.mark.parametrize("scenario", [MENYUSUL, BERTEMU])
+def test_broadcast_sama_dengan_pencarian_naif(scenario):
+    rng = np.random.default_rng(0)
+    n = 200
+    v1, v2 = rng.uniform(10, 120, n), rng.uniform(10, 120, n)
+    t1, t2 = rng.uniform(0, 3, n), rng.uniform(0, 3, n)
+    jarak = rng.uniform(1, 300, n)
+    waktu, _, _ = hitung_event(v1, v2, t1, t2, jarak, 8.0, scenario)
+    for i in range(n):
+        harapan = event_naif(v1[i], v2[i], t1[i], t2[i], jarak[i], 8.0, scenario)
+        if np.isnan(harapan):
+            assert np.isnan(waktu[i]) or waktu[i] > 8.0 - 1e-3
+        else:
+            assert waktu[i] == pytest.approx(harapan, abs=2e-4)
+
+
+def test_broadcast_sama_dengan_skalar():
+    v1 = np.linspace(20, 120, 7)[:, None]
+    jarak = np.linspace(0, 200, 5)[None, :]
+    waktu, posisi_event, _ = hitung_event(v1, 50, 0.5, 0, jarak, 10, MENYUSUL)
+    assert waktu.shape == (7, 5)
+    for i, j in itertools.product(range(7), range(5)):
+        t, p, _ = hitung_event(v1[i, 0], 50, 0.5, 0, jarak[0, j], 10, MENYUSUL)
+        np.testing.assert_equal([waktu[i, j], posisi_event[i, j]], [t, p])
+
+
+def parameter_sel(sumbu, x, y, dasar):
+    """Parameter satu sel grid menurut pilihan sumbu (pembanding hitung_grid_event)."""
+    v1, v2, t1, t2, jarak = dasar
+    if sumbu == "Kecepatan Kendaraan 1 × Kecepatan Kendaraan 2":
+        return x, y, t1, t2, jarak
+    if sumbu == "Kecepatan Kendaraan 1 × Selisih Waktu Berangkat":
+        return x, v2, max(y, 0), max(-y, 0), jarak
+    return x, v2, t1, t2, y
+
+
+@pytest.mark.parametrize("scenario", [MENYUSUL, BERTEMU])
+@pytest.mark.parametrize("sumbu, batas_y", [
+    ("Kecepatan Kendaraan 1 × Kecepatan Kendaraan 2", (10, 120)),
+    ("Kecepatan Kendaraan 1 × Selisih Waktu Berangkat", (-3, 3)),
+    ("Kecepatan Kendaraan 1 × Jarak Awal", (0, 300)),
+])
+def test_grid_sama_dengan_per_sel(sumbu, batas_y, scenario):
+    assert sumbu in SUMBU_EKSPLORASI
+    dasar = (60.0, 40.0, 0.5, 0.0, 100.0)
+    x, y, waktu, posisi_event = hitung_grid_event(sumbu, 17, (10, 120), batas_y, *dasar, 10, scenario)
+    assert waktu.shape == posisi_event.shape == (len(y), len(x)) == (17, 17)
+    for i, j in itertools.product(range(len(y)), range(len(x))):
+        t, p, _ = hitung_event(*parameter_sel(sumbu, x[j], y[i], dasar), 10, scenario)
+        np.testing.assert_equal([waktu[i, j], posisi_event[i, j]], [t, p])
+    assert (~np.isnan(waktu)).any()
+
+
+def sapuan_naif(x0, u, t0, horizon):
+    """Semua persilangan tiap pasangan kendaraan, dicari per ruas linear tanpa antrean.
+
+    Selisih posisi dua kendaraan linear di antara waktu berangkat keduanya, jadi setiap ruas
+    yang berganti tanda berisi tepat satu persilangan. Mengembalikan daftar (waktu, {a, b}).
+    """
+    hasil = []
+    for a, b in itertools.combinations(range(len(x0)), 2):
+        titik = np.unique(np.clip([0, t0[a], t0[b], horizon], 0, horizon))
+
+        def selisih(t):
+            return posisi(t, u[a], t0[a], x0[a]) - posisi(t, u[b], t0[b], x0[b])
+
+        for ta, tb in zip(titik[:-1], titik[1:]):
+            ga, gb = selisih(ta), selisih(tb)
+            if ga * gb < 0:
+                hasil.append((ta - ga * (tb - ta) / (gb - ga), frozenset((a, b))))
+    return sorted(hasil, key=lambda e: e[0])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_sapuan_sama_dengan_semua_pasangan(seed):
+    rng = np.random.default_rng(seed)
+    n, horizon = 40, 5.0
+    x0 = rng.uniform(0, 200, n)
+    u = rng.uniform(30, 120, n) * rng.choice([1, -1], n, p=[0.7, 0.3])
+    t0 = rng.uniform(0, horizon / 2, n)
+
+    tabel, terpotong = sapuan_kinetik(x0, u, t0, horizon)
+    harapan = sapuan_naif(x0, u, t0, horizon)
+
+    assert not terpotong
+    assert len(tabel) == len(harapan) > 0
+    assert tabel["Waktu (jam)"].is_monotonic_increasing
+    didapat = sorted(
+        (t, frozenset((a, b))) for t, a, b in zip(tabel["Waktu (jam)"], tabel["Kendaraan A"], tabel["Kendaraan B"])
+    )
+    for (t, pasangan), (t_harapan, pasangan_harapan) in zip(didapat, harapan):
+        assert pasangan == pasangan_harapan
+        assert t == pytest.approx(t_harapan, abs=1e-9)
+    # Posisi event adalah posisi kedua kendaraan pada waktu itu
+    for _, baris in tabel.iterrows():
+        a, b, t = int(baris["Kendaraan A"]), int(baris["Kendaraan B"]), baris["Waktu (jam)"]
+        assert baris["Posisi (km)"] == pytest.approx(posisi(t, u[a], t0[a], x0[a]), abs=1e-6)
+        assert baris["Posisi (km)"] == pytest.approx(posisi(t, u[b], t0[b], x0[b]), abs=1e-6)
+
+
+def test_jenis_event():
+    # 0 menyusul 1 (searah), 2 berpapasan dengan keduanya, 3 diam dan dilewati
+    tabel, _ = sapuan_kinetik([0, 10, 100, 50], [60, 30, -40, 30], [0, 0, 0, 99], 3)
+    jenis = {frozenset((a, b)): j for a, b, j in zip(tabel["Kendaraan A"], tabel["Kendaraan B"], tabel["Jenis"])}
+    assert jenis[frozenset((0, 1))] == "Menyusul"
+    assert jenis[frozenset((1, 2))] == "Berpapasan"
+    assert jenis[frozenset((1, 3))] == "Melewati kendaraan diam"
+
+
+def test_batas_kejadian():
+    rng = np.random.default_rng(9)
+    n = 60
+    tabel, terpotong = sapuan_kinetik(rng.uniform(0, 100, n), rng.uniform(-100, 100, n), np.zeros(n), 10, maks_kejadian=25)
+    assert terpotong and len(tabel) == 25
+    assert tabel["Waktu (jam)"].is_monotonic_increasing
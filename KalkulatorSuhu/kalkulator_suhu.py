@@ -7,77 +7,175 @@ Original file is located at
     https://colab.research.google.com/drive/1_IY2Bvh5XsYER2rYbTys1OkFZbCiTONP
 """
 
-import streamlit as st
-
-# Fungsi konversi suhu
-def celsius_to_fahrenheit(celsius):
-    return (celsius * 9/5) + 32
-
-def celsius_to_kelvin(celsius):
-    return celsius + 273.15
-
-def fahrenheit_to_celsius(fahrenheit):
-    return (fahrenheit - 32) * 5/9
+import os
+import tempfile
 
-def fahrenheit_to_kelvin(fahrenheit):
-    return (fahrenheit - 32) * 5/9 + 273.15
+import numpy as np
+import pandas as pd
+import streamlit as st
 
-def kelvin_to_celsius(kelvin):
-    return kelvin - 273.15
+# Registri satuan, konversi, dan konversi batch (tanpa Streamlit, bisa diuji terpisah)
+from suhu import (
+    SATUAN_BAWAAN, daftar_berkas_data, hitung_tabel_konversi, konversi_berkas_biner, konversi_berkas_csv,
+    konversi_suhu, path_berkas_data,
+)
 
-def kelvin_to_fahrenheit(kelvin):
-    return (kelvin - 273.15) * 9/5 + 32
+# Direktori di server yang boleh dibaca langsung dengan memmap. Tanpa variabel ini tab batch
+# hanya menerima unggahan; path bebas dari pengguna tidak pernah dibuka.
+DIREKTORI_DATA = os.getenv("KALKULATOR_SUHU_DIREKTORI_DATA")
+
+@st.cache_data(show_spinner=False)
+def tabel_konversi(satuan):
+    """Versi ter-cache dari hitung_tabel_konversi untuk registri satuan sesi ini."""
+    return hitung_tabel_konversi(satuan)
+
+def konversi_ke_berkas(konversi, *args):
+    """Jalankan konversi batch ke berkas sementara; mengembalikan (path_berkas, pratinjau).
+
+    Hasil ditulis per potongan ke disk, jadi yang disimpan di session_state hanya path dan
+    pratinjaunya. Berkas dihapus lagi jika konversi gagal.
+    """
+    keluaran = tempfile.NamedTemporaryFile(prefix="kalkulator_suhu_", delete=False)
+    try:
+        with keluaran:
+            return keluaran.name, konversi(*args, keluaran)
+    except BaseException:
+        os.remove(keluaran.name)
+        raise
+
+def isi_berkas(path):
+    """Isi berkas hasil; dibaca baru saat tombol unduh ditekan."""
+    with open(path, "rb") as f:
+        return f.read()
 
 # Judul aplikasi Streamlit
 st.title("🌡️ Kalkulator Konverter Suhu")
 
-# Pilihan konversi
-conversion_options = {
-    "Celsius ke Fahrenheit": "C_to_F",
-    "Celsius ke Kelvin": "C_to_K",
-    "Fahrenheit ke Celsius": "F_to_C",
-    "Fahrenheit ke Kelvin": "F_to_K",
-    "Kelvin ke Celsius": "K_to_C",
-    "Kelvin ke Fahrenheit": "K_to_F",
-}
-
-# Dropdown untuk memilih jenis konversi
-selected_conversion_text = st.selectbox(
-    "Pilih jenis konversi:",
-    list(conversion_options.keys())
-)
-
-selected_conversion_code = conversion_options[selected_conversion_text]
-
-# Input suhu dari pengguna
-temperature = st.number_input(f"Masukkan suhu dalam {selected_conversion_text.split(' ')[0]}:", value=0.0)
-
-# Tombol untuk melakukan konversi
-if st.button("Konversi"):
-    result = None
-    unit_result = ""
-    unit_input = selected_conversion_text.split(' ')[0] # Ambil unit input (misal: Celsius, Fahrenheit, Kelvin)
-
-    if selected_conversion_code == "C_to_F":
-        result = celsius_to_fahrenheit(temperature)
-        unit_result = "°F"
-    elif selected_conversion_code == "C_to_K":
-        result = celsius_to_kelvin(temperature)
-        unit_result = "K"
-    elif selected_conversion_code == "F_to_C":
-        result = fahrenheit_to_celsius(temperature)
-        unit_result = "°C"
-    elif selected_conversion_code == "F_to_K":
-        result = fahrenheit_to_kelvin(temperature)
-        unit_result = "K"
-    elif selected_conversion_code == "K_to_C":
-        result = kelvin_to_celsius(temperature)
-        unit_result = "°C"
-    elif selected_conversion_code == "K_to_F":
-        result = kelvin_to_fahrenheit(temperature)
-        unit_result = "°F"
-
-    if result is not None:
-        st.success(f"Hasil konversi: {temperature:.2f} {unit_input} = **{result:.2f} {unit_result}**")
+# Satuan buatan pengguna disimpan per sesi
+if "satuan_kustom" not in st.session_state:
+    st.session_state.satuan_kustom = {}
+
+daftar_satuan = {**SATUAN_BAWAAN, **st.session_state.satuan_kustom}
+tabel = tabel_konversi(tuple((n, d["skala"], d["offset"]) for n, d in daftar_satuan.items()))
+
+with st.expander("➕ Tambah satuan sendiri"):
+    st.write("Definisikan satuan baru terhadap Celsius: **°C = a × nilai + b**.")
+    col_nama, col_simbol = st.columns(2)
+    nama_baru = col_nama.text_input("Nama satuan", placeholder="misal: Delisle")
+    simbol_baru = col_simbol.text_input("Simbol", placeholder="misal: °De")
+    col_a, col_b = st.columns(2)
+    a_baru = col_a.number_input("a (skala)", value=1.0, format="%.6f")
+    b_baru = col_b.number_input("b (offset, °C)", value=0.0, format="%.6f")
+
+    if st.button("Tambah Satuan"):
+        if not nama_baru.strip():
+            st.error("Nama satuan tidak boleh kosong.")
+        elif nama_baru.strip() in daftar_satuan:
+            st.error(f"Satuan **{nama_baru.strip()}** sudah ada.")
+        elif a_baru == 0:
+            st.error("Skala a tidak boleh nol.")
+        else:
+            # °C = a*x + b  =>  K = a*x + (b + 273.15)
+            st.session_state.satuan_kustom[nama_baru.strip()] = {
+                "simbol": simbol_baru.strip() or nama_baru.strip(),
+                "skala": a_baru,
+                "offset": b_baru + SATUAN_BAWAAN["Celsius"]["offset"],
+            }
+            st.rerun()
+
+# Dropdown untuk memilih satuan asal dan tujuan
+col_dari, col_ke = st.columns(2)
+satuan_dari = col_dari.selectbox("Dari satuan:", list(daftar_satuan.keys()), index=0)
+satuan_ke = col_ke.selectbox("Ke satuan:", list(daftar_satuan.keys()), index=1)
+simbol_dari = daftar_satuan[satuan_dari]["simbol"]
+simbol_ke = daftar_satuan[satuan_ke]["simbol"]
+
+tab_satuan, tab_batch = st.tabs(["Satu Nilai", "Batch (Log Sensor)"])
+
+with tab_satuan:
+    # Input suhu dari pengguna
+    temperature = st.number_input(f"Masukkan suhu dalam {satuan_dari}:", value=0.0)
+
+    # Tombol untuk melakukan konversi
+    if st.button("Konversi"):
+        result = konversi_suhu(temperature, satuan_dari, satuan_ke, tabel)
+        st.success(f"Hasil konversi: {temperature:.2f} {simbol_dari} = **{result:.2f} {simbol_ke}**")
+
+with tab_batch:
+    st.write(
+        "Konversi jutaan pembacaan sekaligus dari berkas CSV atau berkas biner mentah "
+        "(float32/float64). Berkas biner dibaca langsung dari memori/memmap tanpa disalin."
+    )
+
+    pilihan_sumber = ["Unggah berkas"] + (["Berkas di direktori data server"] if DIREKTORI_DATA else [])
+    sumber = st.radio("Sumber data:", pilihan_sumber, horizontal=True)
+    tipe_data = st.selectbox("Tipe data berkas biner:", ["float32", "float64"])
+
+    def fungsi(nilai):
+        return konversi_suhu(nilai, satuan_dari, satuan_ke, tabel)
+
+    kunci = None
+    hasil_batch = None
+
+    if sumber == "Unggah berkas":
+        berkas = st.file_uploader("Berkas log sensor", type=["csv", "bin", "raw", "f32", "f64"])
+        berkas_csv = berkas is not None and berkas.name.lower().endswith(".csv")
+        kolom_csv = []
+        if berkas_csv:
+            try:
+                kolom_csv = list(pd.read_csv(berkas, nrows=0).columns)
+            except Exception as e:
+                st.error(f"Gagal membaca berkas CSV: {e}")
+        if kolom_csv:
+            kolom = st.selectbox("Kolom suhu:", kolom_csv)
+            kunci = (berkas.file_id, kolom, satuan_dari, satuan_ke)
+            if st.button("Konversi Batch"):
+                with st.spinner("Mengonversi..."):
+                    try:
+                        hasil_batch = konversi_ke_berkas(konversi_berkas_csv, berkas, kolom, fungsi, f"{kolom}_{simbol_ke}")
+                    except Exception as e:
+                        st.error(f"Gagal membaca berkas CSV: {e}")
+                nama_unduhan, mime = berkas.name.rsplit(".", 1)[0] + "_konversi.csv", "text/csv"
+        elif berkas is not None and not berkas_csv:
+            kunci = (berkas.file_id, tipe_data, satuan_dari, satuan_ke)
+            if st.button("Konversi Batch"):
+                with st.spinner("Mengonversi..."):
+                    try:
+                        # frombuffer membuat view langsung atas isi unggahan, tanpa salinan
+                        data = np.frombuffer(berkas.getbuffer(), dtype=tipe_data)
+                        hasil_batch = konversi_ke_berkas(konversi_berkas_biner, data, fungsi)
+                    except ValueError as e:
+                        st.error(f"Ukuran berkas tidak sesuai tipe {tipe_data}: {e}")
+                nama_unduhan, mime = berkas.name.rsplit(".", 1)[0] + f"_konversi.{tipe_data}", "application/octet-stream"
+    else:
+        nama_berkas = st.selectbox("Berkas biner di server:", daftar_berkas_data(DIREKTORI_DATA), index=None)
+        if nama_berkas:
+            kunci = (nama_berkas, tipe_data, satuan_dari, satuan_ke)
+            if st.button("Konversi Batch"):
+                path = path_berkas_data(DIREKTORI_DATA, nama_berkas)
+                if path is None:
+                    st.error("Berkas tidak ditemukan di direktori data.")
+                else:
+                    with st.spinner("Mengonversi..."):
+                        try:
+                            # memmap: data dibaca dari disk per potongan, tidak dimuat seluruhnya
+                            data = np.memmap(path, dtype=tipe_data, mode="r")
+                            hasil_batch = konversi_ke_berkas(konversi_berkas_biner, data, fungsi)
+                        except ValueError as e:
+                            st.error(f"Ukuran berkas tidak sesuai tipe {tipe_data}: {e}")
+                    nama_unduhan, mime = nama_berkas + f"_konversi.{tipe_data}", "application/octet-stream"
+
+    # Simpan path berkas hasil dan pratinjau agar rerun (misal saat tombol unduh ditekan) tidak
+    # mengonversi ulang; berkas hasil sebelumnya di sesi ini tidak dipakai lagi
+    if hasil_batch is not None:
+        if "hasil_batch" in st.session_state and os.path.exists(st.session_state.hasil_batch[1][0]):
+            os.remove(st.session_state.hasil_batch[1][0])
+        st.session_state.hasil_batch = (kunci, hasil_batch, nama_unduhan, mime, simbol_ke)
+
+    if "hasil_batch" in st.session_state and st.session_state.hasil_batch[0] == kunci:
+        _, (path_hasil, (indeks, nilai, jumlah)), nama_unduhan, mime, unit_hasil = st.session_state.hasil_batch
+        st.success(f"**{jumlah:,}** pembacaan berhasil dikonversi ke {unit_hasil}.")
+        st.line_chart(pd.DataFrame({f"Suhu ({unit_hasil})": nilai}, index=pd.Index(indeks, name="Pembacaan ke-")))
+        st.download_button("⬇️ Unduh Hasil", data=lambda: isi_berkas(path_hasil), file_name=nama_unduhan, mime=mime)
 
 st.markdown("---")
@@ -0,0 +1,135 @@
+"""Konversi suhu untuk Kalkulator Suhu: registri satuan, konversi afin, dan konversi batch.
+
+Setiap pasangan satuan menjadi y = a * x + b yang dihitung sekali per registri, sehingga
+satu nilai maupun jutaan pembacaan (array NumPy, memmap, CSV per potongan) dikonversi
+dengan satu perkalian dan satu penjumlahan.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# REGISTRI SATUAN SUHU
+# ==============================================================================
+
+# Setiap satuan didefinisikan sebagai peta afin ke satuan dasar Kelvin:
+#   K = skala * x + offset
+# Menambah satuan cukup dengan menambah satu entri; semua pasangan konversi
+# dihitung otomatis oleh hitung_tabel_konversi.
+SATUAN_BAWAAN = {
+    "Celsius": {"simbol": "°C", "skala": 1.0, "offset": 273.15},
+    "Fahrenheit": {"simbol": "°F", "skala": 5 / 9, "offset": 273.15 - 32 * 5 / 9},
+    "Kelvin": {"simbol": "K", "skala": 1.0, "offset": 0.0},
+    "Réaumur": {"simbol": "°Ré", "skala": 5 / 4, "offset": 273.15},
+    "Rankine": {"simbol": "°R", "skala": 5 / 9, "offset": 0.0},
+}
+
+def hitung_tabel_konversi(satuan):
+    """Fungsi untuk menghitung (a, b) setiap pasangan satuan berurutan sekaligus.
+
+    `satuan` berupa tuple (nama, skala, offset) agar bisa di-cache. Konversi
+    dari i ke j menjadi y = a * x + b dengan a = s_i / s_j dan b = (o_i - o_j) / s_j,
+    sehingga setiap konversi hanya satu perkalian dan satu penjumlahan.
+    """
+    nama = [n for n, _, _ in satuan]
+    skala = np.array([s for _, s, _ in satuan], dtype=float)
+    offset = np.array([o for _, _, o in satuan], dtype=float)
+
+    a = skala[:, None] / skala[None, :]
+    b = (offset[:, None] - offset[None, :]) / skala[None, :]
+    return {(dari, ke): (float(a[i, j]), float(b[i, j])) for i, dari in enumerate(nama) for j, ke in enumerate(nama)}
+
+def konversi_suhu(nilai, dari, ke, tabel):
+    """Fungsi untuk mengonversi suhu (angka atau array NumPy) dari satu satuan ke satuan lain."""
+    a, b = tabel[(dari, ke)]
+    return a * nilai + b
+
+# ==============================================================================
+# KONVERSI BATCH
+# ==============================================================================
+
+# Jumlah pembacaan yang dikonversi per potongan dan jumlah titik pratinjau grafik
+UKURAN_CHUNK = 1_000_000
+MAKS_PRATINJAU = 2_000
+
+# Berkas biner yang ditawarkan dari direktori data server (lihat KALKULATOR_SUHU_DIREKTORI_DATA)
+EKSTENSI_BINER = (".bin", ".raw", ".f32", ".f64")
+
+def path_berkas_data(direktori, nama):
+    """Path asli berkas `nama` jika benar-benar berada di dalam direktori data, selain itu None.
+
+    Path diselesaikan dulu (realpath) sehingga "..", path absolut, maupun symlink yang
+    menunjuk ke luar direktori ikut ditolak.
+    """
+    dasar = os.path.realpath(direktori)
+    path = os.path.realpath(os.path.join(dasar, nama))
+    if os.path.commonpath([dasar, path]) != dasar or not os.path.isfile(path):
+        return None
+    return path
+
+def daftar_berkas_data(direktori):
+    """Nama berkas biner langsung di dalam direktori data (tanpa subdirektori)."""
+    return sorted(
+        nama for nama in os.listdir(direktori)
+        if nama.lower().endswith(EKSTENSI_BINER) and path_berkas_data(direktori, nama) is not None
+    )
+
+def potongan_biner(data):
+    """Generator potongan (view, tanpa salinan) dari array biner/memmap."""
+    for awal in range(0, len(data), UKURAN_CHUNK):
+        yield data[awal:awal + UKURAN_CHUNK], None
+
+def konversi_batch(potongan, fungsi, tulis):
+    """Fungsi untuk mengonversi data per potongan dengan satu operasi array per potongan.
+
+    `potongan` menghasilkan pasangan (array_suhu, konteks); `tulis(hasil, konteks)`
+    dipanggil untuk setiap potongan agar keluaran bisa langsung ditulis. Pratinjau
+    diambil dengan langkah tetap yang digandakan setiap kali titiknya melebihi batas,
+    sehingga ukurannya tidak bergantung panjang data.
+    Mengembalikan (indeks_pratinjau, nilai_pratinjau, jumlah_pembacaan).
+    """
+    indeks_pratinjau = np.empty(0, dtype=np.int64)
+    nilai_pratinjau = np.empty(0)
+    langkah = 1
+    jumlah = 0
+
+    for nilai, konteks in potongan:
+        hasil = fungsi(nilai)
+        tulis(hasil, konteks)
+
+        # Ambil sampel dengan indeks global kelipatan `langkah`
+        awal = (-jumlah) % langkah
+        indeks_pratinjau = np.concatenate([indeks_pratinjau, np.arange(jumlah + awal, jumlah + len(hasil), langkah)])
+        nilai_pratinjau = np.concatenate([nilai_pratinjau, hasil[awal::langkah]])
+        while len(nilai_pratinjau) > MAKS_PRATINJAU:
+            indeks_pratinjau, nilai_pratinjau = indeks_pratinjau[::2], nilai_pratinjau[::2]
+            langkah *= 2
+        jumlah += len(hasil)
+
+    return indeks_pratinjau, nilai_pratinjau, jumlah
+
+def konversi_berkas_biner(data, fungsi, keluaran):
+    """Konversi array float32/float64 (hasil frombuffer/memmap) ke berkas biner `keluaran` bertipe sama.
+
+    Keluaran ditulis per potongan sehingga hasil tidak pernah ditampung utuh di memori.
+    Mengembalikan pratinjau seperti konversi_batch.
+    """
+    return konversi_batch(
+        potongan_biner(data), fungsi, lambda hasil, _: keluaran.write(hasil.astype(data.dtype, copy=False).tobytes())
+    )
+
+def konversi_berkas_csv(berkas, kolom, fungsi, nama_kolom_hasil, keluaran):
+    """Konversi satu kolom CSV per potongan ke berkas `keluaran`: CSV asli ditambah kolom hasil."""
+    def tulis(hasil, chunk):
+        chunk[nama_kolom_hasil] = hasil
+        chunk.to_csv(keluaran, index=False, header=keluaran.tell() == 0, encoding="utf-8")
+
+    berkas.seek(0)
+    # Kolom diubah ke array float; baris bukan angka menjadi NaN
+    potongan = (
+        (pd.to_numeric(chunk[kolom], errors="coerce").to_numpy(dtype=float), chunk)
+        for chunk in pd.read_csv(berkas, chunksize=UKURAN_CHUNK)
+    )
+    return konversi_batch(potongan, fungsi, tulis)
@@ -0,0 +1,114 @@
+"""Uji konversi suhu dan konversi batch (suhu.py): pytest KalkulatorSuhu/test_suhu.py"""
+
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import suhu
+from suhu import (
+    SATUAN_BAWAAN, daftar_berkas_data, hitung_tabel_konversi, konversi_batch, konversi_berkas_biner,
+    konversi_berkas_csv, konversi_suhu, path_berkas_data,
+)
+
+TABEL = hitung_tabel_konversi(tuple((n, d["skala"], d["offset"]) for n, d in SATUAN_BAWAAN.items()))
+
+
+def lewat_kelvin(nilai, dari, ke):
+    """Konversi dua langkah (ke Kelvin lalu ke satuan tujuan) sebagai pembanding tabel."""
+    kelvin = SATUAN_BAWAAN[dari]["skala"] * nilai + SATUAN_BAWAAN[dari]["offset"]
+    return (kelvin - SATUAN_BAWAAN[ke]["offset"]) / SATUAN_BAWAAN[ke]["skala"]
+
+
+@pytest.mark.parametrize("celsius, harapan", [
+    (0, {"Fahrenheit": 32, "Kelvin": 273.15, "Réaumur": 0, "Rankine": 491.67}),
+    (100, {"Fahrenheit": 212, "Kelvin": 373.15, "Réaumur": 80, "Rankine": 671.67}),
+    (-40, {"Fahrenheit": -40, "Kelvin": 233.15, "Réaumur": -32, "Rankine": 419.67}),
+])
+def test_titik_acuan(celsius, harapan):
+    for ke, nilai in harapan.items():
+        assert konversi_suhu(celsius, "Celsius", ke, TABEL) == pytest.approx(nilai)
+        assert konversi_suhu(nilai, ke, "Celsius", TABEL) == pytest.approx(celsius, abs=1e-9)
+
+
+def test_semua_pasangan_sama_dengan_lewat_kelvin():
+    nilai = np.linspace(-500, 5000, 101)
+    for dari in SATUAN_BAWAAN:
+        for ke in SATUAN_BAWAAN:
+            np.testing.assert_allclose(konversi_suhu(nilai, dari, ke, TABEL), lewat_kelvin(nilai, dari, ke), rtol=1e-12, atol=1e-9)
+            # Bolak-balik kembali ke nilai awal
+            balik = konversi_suhu(konversi_suhu(nilai, dari, ke, TABEL), ke, dari, TABEL)
+            np.testing.assert_allclose(balik, nilai, rtol=1e-12, atol=1e-9)
+
+
+def test_satuan_kustom():
+    # Delisle: °C = -2/3 x + 100 (lihat formulir "Tambah satuan sendiri")
+    satuan = tuple((n, d["skala"], d["offset"]) for n, d in SATUAN_BAWAAN.items()) + (("Delisle", -2 / 3, 100 + 273.15),)
+    tabel = hitung_tabel_konversi(satuan)
+    assert konversi_suhu(0, "Delisle", "Celsius", tabel) == pytest.approx(100)
+    assert konversi_suhu(0, "Celsius", "Delisle", tabel) == pytest.approx(150)
+
+
+def test_konversi_batch_pratinjau_terbatas_dan_indeks_benar():
+    data = np.arange(10_007, dtype=float)
+    potongan = ((data[i:i + 997], None) for i in range(0, len(data), 997))
+    tertulis = []
+    indeks, nilai, jumlah = konversi_batch(potongan, lambda x: 2 * x, lambda hasil, _: tertulis.append(hasil))
+    assert jumlah == len(data)
+    np.testing.assert_array_equal(np.concatenate(tertulis), 2 * data)
+    assert 0 < len(nilai) <= suhu.MAKS_PRATINJAU
+    np.testing.assert_array_equal(nilai, 2 * data[indeks])
+    # Langkah tetap: titik pratinjau tersebar merata sejak awal data
+    assert indeks[0] == 0 and len(set(np.diff(indeks))) == 1
+
+
+@pytest.mark.parametrize("tipe", [np.float32, np.float64])
+def test_konversi_berkas_biner(monkeypatch, tmp_path, tipe):
+    monkeypatch.setattr(suhu, "UKURAN_CHUNK", 1000)
+    data = np.random.default_rng(0).uniform(-50, 50, 4321).astype(tipe)
+    with open(tmp_path / "hasil.bin", "wb") as keluaran:
+        _, _, jumlah = konversi_berkas_biner(data, lambda x: x + 273.15, keluaran)
+    hasil = np.fromfile(tmp_path / "hasil.bin", dtype=tipe)
+    assert jumlah == len(data)
+    np.testing.assert_allclose(hasil, data.astype(float) + 273.15, rtol=1e-6)
+
+
+def test_konversi_berkas_csv(monkeypatch, tmp_path):
+    monkeypatch.setattr(suhu, "UKURAN_CHUNK", 3)
+    berkas = io.BytesIO(b"waktu,suhu\n1,0\n2,100\n3,abc\n4,-40\n5,37\n")
+    with open(tmp_path / "hasil.csv", "wb") as keluaran:
+        _, _, jumlah = konversi_berkas_csv(berkas, "suhu", lambda x: x * 9 / 5 + 32, "suhu_F", keluaran)
+    hasil = pd.read_csv(tmp_path / "hasil.csv")
+    assert jumlah == 5
+    assert list(hasil.columns) == ["waktu", "suhu", "suhu_F"]
+    assert hasil["waktu"].tolist() == [1, 2, 3, 4, 5]
+    np.testing.assert_allclose(hasil["suhu_F"], [32, 212, np.nan, -40, 98.6])
+
+
+@pytest.fixture
+def direktori_data(tmp_path):
+    data = tmp_path / "data"
+    (data / "sub").mkdir(parents=True)
+    (data / "sensor.f32").write_bytes(b"\0" * 8)
+    (data / "catatan.txt").write_text("bukan biner")
+    (data / "sub" / "lain.bin").write_bytes(b"\0" * 8)
+    (tmp_path / "rahasia.bin").write_bytes(b"\0" * 8)
+    os.symlink(tmp_path / "rahasia.bin", data / "tautan.bin")
+    return data
+
+
+def test_path_berkas_data_di_dalam_direktori(direktori_data):
+    assert path_berkas_data(direktori_data, "sensor.f32") == os.path.realpath(direktori_data / "sensor.f32")
+    assert path_berkas_data(direktori_data, "sub/lain.bin") is not None
+
+
+@pytest.mark.parametrize("nama", ["../rahasia.bin", "sub/../../rahasia.bin", "tautan.bin", "/etc/passwd", "tidak_ada.bin", "sub"])
+def test_path_berkas_data_menolak_luar_direktori(direktori_data, nama):
+    assert path_berkas_data(direktori_data, nama) is None
+
+
+def test_daftar_berkas_data(direktori_data):
+    # Hanya berkas biner langsung di direktori; symlink ke luar dan subdirektori tidak ditawarkan
+    assert daftar_berkas_data(direktori_data) == ["sensor.f32"]
@@ -9,80 +9,255 @@ Original file is located at
 
 import streamlit as st
 import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
 import time
 
+# Pertemuan antar N pelancong dan profil kecepatan (tanpa Streamlit, bisa diuji terpisah)
+from pelancong import (
+    TOLERANSI_WAKTU, integrasi_profil, jarak_tempuh, pelancong_acak, pertemuan_banyak_pelancong, waktu_bertemu_profil,
+)
+
+# Batas jumlah frame animasi; seluruh frame dikirim sekali ke browser
+MAKS_FRAME = 120
+DURASI_ANIMASI_MS = 6000
+
+def buat_animasi(kecepatan_a, kecepatan_b, jarak_total, jumlah_frame=MAKS_FRAME):
+    """Fungsi untuk membuat animasi Plotly perjalanan Si A dan Si B sampai bertemu.
+
+    Waktu bertemu dihitung langsung (jarak / jumlah kecepatan) dan posisi di setiap
+    frame dihitung sebagai array, jadi jumlah frame tetap berapa pun jarak dan kecepatannya.
+    """
+    waktu_bertemu = jarak_total / (kecepatan_a + kecepatan_b)
+    waktu = np.linspace(0, waktu_bertemu, jumlah_frame)
+    posisi_a = kecepatan_a * waktu
+    posisi_b = jarak_total - kecepatan_b * waktu
+    sisa_jarak = np.maximum(posisi_b - posisi_a, 0)
+
+    def penanda(x, teks):
+        return go.Scatter(x=[x], y=[0], mode="text", text=[teks], textfont=dict(size=32), showlegend=False)
+
+    def judul(i):
+        return f"⏱️ {waktu[i] * 60:.0f} menit — Sisa jarak antar mereka: {sisa_jarak[i]:.2f} km"
+
+    fig = go.Figure(
+        data=[
+            go.Scatter(x=[0, jarak_total], y=[0, 0], mode="lines+text", line=dict(color="gray", width=6),
+                       text=["Kota A", "Kota B"], textposition="bottom center", showlegend=False),
+            penanda(posisi_a[0], "🚗"),
+            penanda(posisi_b[0], "🏍️"),
+        ],
+        frames=[
+            go.Frame(
+                name=str(i),
+                data=[penanda(posisi_a[i], "🚗" if i < jumlah_frame - 1 else "🎯"),
+                      penanda(posisi_b[i], "🏍️" if i < jumlah_frame - 1 else "")],
+                traces=[1, 2],
+                layout=go.Layout(title_text=judul(i)),
+            )
+            for i in range(jumlah_frame)
+        ],
+    )
+
+    durasi_frame = DURASI_ANIMASI_MS // jumlah_frame
+    fig.update_layout(
+        title_text=judul(0),
+        height=300,
+        xaxis=dict(range=[-0.05 * jarak_total, 1.05 * jarak_total], title="Posisi dari Kota A (km)"),
+        yaxis=dict(range=[-1, 1], visible=False),
+        updatemenus=[dict(
+            type="buttons", showactive=False, x=0, y=-0.35, xanchor="left",
+            buttons=[
+                dict(label="▶️ Putar", method="animate",
+                     args=[None, dict(frame=dict(duration=durasi_frame, redraw=True), fromcurrent=True,
+                                      transition=dict(duration=0))]),
+                dict(label="⏸️ Jeda", method="animate",
+                     args=[[None], dict(frame=dict(duration=0, redraw=False), mode="immediate")]),
+            ],
+        )],
+        sliders=[dict(
+            x=0.2, y=-0.3, len=0.8, currentvalue=dict(visible=False),
+            steps=[dict(method="animate", label="", args=[[str(i)], dict(mode="immediate",
+                        frame=dict(duration=0, redraw=True), transition=dict(duration=0))])
+                   for i in range(jumlah_frame)],
+        )],
+    )
+    return fig, waktu_bertemu, kecepatan_a * waktu_bertemu
+
+def format_jam(jam):
+    """Fungsi untuk menampilkan waktu dalam jam sebagai jj:mm:dd."""
+    detik = int(round(jam * 3600))
+    return f"{detik // 3600:02d}:{detik % 3600 // 60:02d}:{detik % 60:02d}"
+
+# Contoh profil: (durasi menit, kecepatan akhir km/jam)
+PROFIL_CONTOH_A = pd.DataFrame({
+    "Durasi (menit)": [6.0, 30.0, 3.0, 10.0, 5.0],
+    "Kecepatan akhir (km/jam)": [60.0, 60.0, 0.0, 0.0, 50.0],
+    "Keterangan": ["percepat", "konstan", "berhenti", "istirahat", "percepat"],
+})
+PROFIL_CONTOH_B = pd.DataFrame({
+    "Durasi (menit)": [4.0, 20.0, 2.0, 15.0, 8.0],
+    "Kecepatan akhir (km/jam)": [40.0, 40.0, 0.0, 0.0, 70.0],
+    "Keterangan": ["percepat", "konstan", "berhenti", "lampu merah", "percepat"],
+})
+
+# Heatmap matriks hanya digambar sampai N ini; tabel kejadian ditampilkan per halaman
+MAKS_N_MATRIKS = 300
+BARIS_PER_HALAMAN = 1000
+
+@st.cache_data(show_spinner='Menghitung pertemuan...', max_entries=2)
+def hitung_pertemuan(pelancong, horizon):
+    """Versi ter-cache dari pertemuan_banyak_pelancong untuk tabel pelancong dari antarmuka."""
+    mulai_hitung = time.perf_counter()
+    matriks, tabel = pertemuan_banyak_pelancong(
+        pelancong['Posisi awal (km)'], np.sign(pelancong['Arah']), pelancong['Kecepatan (km/jam)'],
+        pelancong['Berangkat (jam)'], horizon, hitung_matriks=len(pelancong) <= MAKS_N_MATRIKS,
+    )
+    lama_hitung = time.perf_counter() - mulai_hitung
+    return matriks, tabel, lama_hitung
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def csv_pertemuan(pelancong, horizon):
+    """CSV semua pertemuan; baru dibuat saat tombol unduh ditekan (bisa puluhan detik untuk jutaan baris)."""
+    _, tabel, _ = hitung_pertemuan(pelancong, horizon)
+    return tabel.to_csv(index=False).encode('utf-8')
+
 st.set_page_config(page_title="Simulasi Kecepatan dan Waktu", layout="wide")
 
 st.title('🚗🏍️ Simulasi Jarak, Kecepatan, dan Waktu')
-st.subheader('Dua orang dari kota berbeda berjalan dan bertemu di tengah jalan')
+tab_dua, tab_banyak, tab_profil = st.tabs(['👫 Dua Orang', '👥 Banyak Pelancong', '📈 Profil Kecepatan'])
 
-# Layout dua kolom
-col1, col2 = st.columns(2)
+with tab_dua:
+    st.subheader('Dua orang dari kota berbeda berjalan dan bertemu di tengah jalan')
 
-# Kolom 1: Konfigurasi
-with col1:
-    st.header('⚙️ Konfigurasi')
+    # Layout dua kolom
+    col1, col2 = st.columns(2)
 
-    kecepatan_a = st.slider('🔵 Kecepatan Si A (km/jam)', 1, 100, 40)
-    kecepatan_b = st.slider('🟠 Kecepatan Si B (km/jam)', 1, 100, 50)
-    jarak_total = st.slider('📏 Jarak Kota A ke Kota B (km)', 10, 200, 100)
+    # Kolom 1: Konfigurasi
+    with col1:
+        st.header('⚙️ Konfigurasi')
 
-    if 'mulai' not in st.session_state:
-        st.session_state.mulai = False
+        kecepatan_a = st.slider('🔵 Kecepatan Si A (km/jam)', 1, 100, 40)
+        kecepatan_b = st.slider('🟠 Kecepatan Si B (km/jam)', 1, 100, 50)
+        jarak_total = st.slider('📏 Jarak Kota A ke Kota B (km)', 10, 200, 100)
 
-    if st.button('🚀 Mulai Simulasi'):
-        st.session_state.mulai = True
+        if 'mulai' not in st.session_state:
+            st.session_state.mulai = False
 
-# Kolom 2: Simulasi
-with col2:
-    st.header('🚦 Simulasi Perjalanan')
+        if st.button('🚀 Mulai Simulasi'):
+            st.session_state.mulai = True
 
-    if st.session_state.mulai:
-        waktu_bertemu = jarak_total / (kecepatan_a + kecepatan_b)
-        st.success(f'🕒 Mereka akan bertemu setelah **{waktu_bertemu:.2f} jam**.')
+    # Kolom 2: Simulasi
+    with col2:
+        st.header('🚦 Simulasi Perjalanan')
 
-        jalan_area = st.empty()
-        info_area = st.empty()
+        if st.session_state.mulai:
+            fig, waktu_bertemu, titik_bertemu = buat_animasi(kecepatan_a, kecepatan_b, jarak_total)
+            st.success(f'🕒 Mereka akan bertemu setelah **{waktu_bertemu:.2f} jam**.')
 
-        panjang_lintasan = 50
-        tengah_lintasan = panjang_lintasan // 2
+            # Animasi berjalan di browser; klik "Putar" untuk memulai
+            st.plotly_chart(fig, use_container_width=True)
 
-        waktu = 0
-        interval_menit = 1
-        interval_jam = interval_menit / 60
+            st.success(f'🎯 Mereka bertemu di tengah jalan, **{titik_bertemu:.2f} km** dari Kota A!')
 
-        while True:
-            posisi_a = kecepatan_a * waktu
-            posisi_b = kecepatan_b * waktu
-            total_tempuh = posisi_a + posisi_b
-            sisa_jarak = max(jarak_total - total_tempuh, 0)
+with tab_banyak:
+    st.subheader('Banyak pelancong di satu jalan lurus: kapan dan di mana mereka saling bertemu?')
+    st.caption('Arah 1 = menuju Kota B (posisi bertambah), -1 = menuju Kota A. Jalan dianggap lurus tanpa ujung.')
 
-            persentase_a = min(posisi_a / (jarak_total / 2), 1.0)
-            persentase_b = min(posisi_b / (jarak_total / 2), 1.0)
+    col_n, col_jalan, col_horizon, col_seed = st.columns(4)
+    jumlah_pelancong = col_n.number_input('Jumlah pelancong (N)', 2, 5000, 20)
+    panjang_jalan = col_jalan.number_input('Panjang jalan (km)', 10, 1000, 200)
+    horizon = col_horizon.number_input('Durasi pengamatan (jam)', 0.5, 48.0, 5.0, 0.5)
+    seed = col_seed.number_input('Seed acak', 0, 10_000, 0)
 
-            idx_a = min(int(persentase_a * (panjang_lintasan / 2)), panjang_lintasan - 1)
-            idx_b = min(int(panjang_lintasan - (persentase_b * (panjang_lintasan / 2))), panjang_lintasan - 1)
+    pelancong = pelancong_acak(jumlah_pelancong, panjang_jalan, seed)
+    if jumlah_pelancong <= 50:
+        pelancong = st.data_editor(pelancong, use_container_width=True, key=f'editor_{jumlah_pelancong}_{panjang_jalan}_{seed}')
 
-            jalan = ['🛣️'] * panjang_lintasan
+    matriks, tabel_kejadian, lama_hitung = hitung_pertemuan(pelancong, horizon)
 
-            if sisa_jarak < 0.1:
-                jalan[tengah_lintasan] = '🎯'
-            else:
-                jalan[idx_a] = '🚗'
-                jalan[idx_b] = '🏍️'
+    col_a, col_b = st.columns(2)
+    col_a.metric('Jumlah pertemuan', f'{len(tabel_kejadian):,}')
+    col_b.metric('Waktu komputasi', f'{lama_hitung * 1000:.1f} ms')
 
-            jalan_area.markdown(
-                f"<h3 style='text-align: center;'>{''.join(jalan)}</h3>",
-                unsafe_allow_html=True
-            )
+    jumlah_halaman = max(1, -(-len(tabel_kejadian) // BARIS_PER_HALAMAN))
+    st.markdown(f'**Pertemuan terurut menurut waktu** ({BARIS_PER_HALAMAN:,} baris per halaman)')
+    halaman = st.number_input(f'Halaman (dari {jumlah_halaman:,})', 1, jumlah_halaman, 1,
+                              key=f'halaman_{jumlah_pelancong}_{panjang_jalan}_{horizon}_{seed}')
+    awal_halaman = (halaman - 1) * BARIS_PER_HALAMAN
+    st.dataframe(tabel_kejadian.iloc[awal_halaman:awal_halaman + BARIS_PER_HALAMAN], use_container_width=True)
+    # CSV dibuat lewat callable: hanya saat diunduh, di thread terpisah, tanpa rerun skrip
+    st.download_button('⬇️ Unduh Semua Pertemuan (CSV)', lambda: csv_pertemuan(pelancong, horizon),
+                       file_name='pertemuan_pelancong.csv', mime='text/csv', on_click='ignore')
+
+    if jumlah_pelancong <= 100:
+        # Grafik posisi-waktu: setiap lintasan cukup digambar dari titik belok (0, berangkat, akhir)
+        fig_lintasan = go.Figure()
+        for k, baris in pelancong.iterrows():
+            t_lintasan = np.array([0.0, min(baris['Berangkat (jam)'], horizon), horizon])
+            x_lintasan = baris['Posisi awal (km)'] + np.sign(baris['Arah']) * baris['Kecepatan (km/jam)'] * \
+                (t_lintasan - baris['Berangkat (jam)']).clip(min=0)
+            fig_lintasan.add_trace(go.Scatter(x=t_lintasan, y=x_lintasan, mode='lines', name=f'Pelancong {k}'))
+        fig_lintasan.add_trace(go.Scatter(
+            x=tabel_kejadian['Waktu (jam)'], y=tabel_kejadian['Posisi (km)'], mode='markers',
+            marker=dict(color='black', size=5), name='Pertemuan',
+        ))
+        fig_lintasan.update_layout(xaxis_title='Waktu (jam)', yaxis_title='Posisi (km)', showlegend=False, height=450)
+        st.plotly_chart(fig_lintasan, use_container_width=True)
+
+    if matriks is not None:
+        fig_matriks = go.Figure(go.Heatmap(z=matriks, colorbar=dict(title='jam')))
+        fig_matriks.update_layout(title='Matriks waktu pertemuan pertama', xaxis_title='Pelancong', yaxis_title='Pelancong', height=450)
+        st.plotly_chart(fig_matriks, use_container_width=True)
+
+with tab_profil:
+    st.subheader('Kecepatan tidak selalu tetap: ada saat mempercepat, melaju konstan, dan berhenti')
+    st.caption('Setiap baris adalah satu segmen: kecepatan berubah merata dari kecepatan segmen sebelumnya '
+               'ke kecepatan akhir. Setelah segmen terakhir, kecepatan terakhir dipertahankan.')
+
+    jarak_profil = st.slider('📏 Jarak Kota A ke Kota B (km)', 1, 300, 60, key='jarak_profil')
+    col_pa, col_pb = st.columns(2)
+    with col_pa:
+        st.markdown('**🔵 Si A (dari Kota A)**')
+        berangkat_a = st.number_input('Berangkat pada menit ke-', 0.0, 600.0, 0.0, key='berangkat_a')
+        profil_tabel_a = st.data_editor(PROFIL_CONTOH_A, num_rows='dynamic', key='profil_a', column_config={
+            'Durasi (menit)': st.column_config.NumberColumn(min_value=0.0),
+            'Kecepatan akhir (km/jam)': st.column_config.NumberColumn(min_value=0.0),
+        })
+    with col_pb:
+        st.markdown('**🟠 Si B (dari Kota B)**')
+        berangkat_b = st.number_input('Berangkat pada menit ke-', 0.0, 600.0, 5.0, key='berangkat_b')
+        profil_tabel_b = st.data_editor(PROFIL_CONTOH_B, num_rows='dynamic', key='profil_b', column_config={
+            'Durasi (menit)': st.column_config.NumberColumn(min_value=0.0),
+            'Kecepatan akhir (km/jam)': st.column_config.NumberColumn(min_value=0.0),
+        })
 
-            info_area.info(f"🚶‍♂️🚶‍♀️ Sisa jarak antar mereka: **{sisa_jarak:.2f} km**")
+    def ke_segmen(tabel):
+        tabel = tabel[['Durasi (menit)', 'Kecepatan akhir (km/jam)']].dropna()
+        return np.column_stack([tabel['Durasi (menit)'] / 60, tabel['Kecepatan akhir (km/jam)']])
 
-            if sisa_jarak < 0.1:
-                break
+    profil_a = integrasi_profil(ke_segmen(profil_tabel_a), berangkat_a / 60)
+    profil_b = integrasi_profil(ke_segmen(profil_tabel_b), berangkat_b / 60)
+    hasil_profil = waktu_bertemu_profil(profil_a, profil_b, jarak_profil)
 
-            time.sleep(0.05)
-            waktu += interval_jam
+    if hasil_profil is None:
+        st.warning('Mereka **tidak pernah bertemu**: keduanya berhenti sebelum jarak habis.')
+        t_akhir_grafik = max(profil_a['t'][-1], profil_b['t'][-1]) * 1.2
+    else:
+        waktu_temu, posisi_temu, iterasi = hasil_profil
+        st.success(f'🎯 Mereka bertemu pada **{format_jam(waktu_temu)}** ({waktu_temu:.4f} jam) '
+                   f'di **{posisi_temu:.3f} km** dari Kota A.')
+        st.caption(f'Akar ditemukan dengan {iterasi} iterasi bisection (toleransi {TOLERANSI_WAKTU * 3600:.4f} detik).')
+        t_akhir_grafik = waktu_temu
 
-        st.balloons()
-        st.success('🎯 Mereka sudah bertemu di tengah jalan!')
+    # Grafik hanya untuk tampilan; titik pertemuan tidak bergantung pada jumlah sampel ini
+    t_grafik = np.linspace(0, t_akhir_grafik, 400)
+    fig_profil = go.Figure()
+    fig_profil.add_trace(go.Scatter(x=t_grafik * 60, y=jarak_tempuh(profil_a, t_grafik), name='Si A', line=dict(color='blue')))
+    fig_profil.add_trace(go.Scatter(x=t_grafik * 60, y=jarak_profil - jarak_tempuh(profil_b, t_grafik), name='Si B',
+                                    line=dict(color='orange')))
+    if hasil_profil is not None:
+        fig_profil.add_trace(go.Scatter(x=[waktu_temu * 60], y=[posisi_temu], mode='markers', name='Bertemu',
+                                        marker=dict(color='green', size=12)))
+    fig_profil.update_layout(xaxis_title='Waktu (menit)', yaxis_title='Posisi dari Kota A (km)', height=400)
+    st.plotly_chart(fig_profil, use_container_width=True)
@@ -0,0 +1,169 @@
+"""Pertemuan pelancong untuk simulasi Kecepatan: banyak pelancong berkecepatan tetap
+dan dua pelancong dengan profil kecepatan.
+
+Lintasan pelancong berkecepatan tetap linear sepotong-sepotong (diam sampai berangkat,
+lalu bergerak lurus), sehingga waktu pertemuan setiap pasangan dihitung langsung dengan
+broadcasting NumPy per blok baris. Untuk profil kecepatan, akar sisa jarak dikurung di
+antara titik belok profil lalu dipersempit dengan bisection.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Jumlah baris matriks yang diproses sekaligus, agar memori tetap O(blok x N)
+UKURAN_BLOK_PASANGAN = 256
+
+def _pertemuan_blok(x0, u, t0, baris, horizon):
+    """Hitung kandidat waktu & posisi pertemuan baris `baris` terhadap semua pelancong.
+
+    Lintasan tiap pelancong linear sepotong-sepotong: diam di x0 sampai t0, lalu
+    bergerak dengan kecepatan bertanda u. Untuk pasangan (i, j) ada dua fase:
+      1. hanya yang berangkat lebih dulu yang bergerak (selang [t_awal, t_akhir]),
+      2. keduanya bergerak (t >= t_akhir).
+    Mengembalikan (t1, x1, t2, x2) berukuran (len(baris), N), NaN jika tidak valid.
+    """
+    xi, ui, ti = x0[baris, None], u[baris, None], t0[baris, None]
+    xj, uj, tj = x0[None, :], u[None, :], t0[None, :]
+
+    i_duluan = ti <= tj
+    t_awal = np.minimum(ti, tj)
+    t_akhir = np.maximum(ti, tj)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Fase 1: pelancong yang duluan bergerak menuju/menjauhi yang masih diam
+        x_gerak = np.where(i_duluan, xi, xj)
+        u_gerak = np.where(i_duluan, ui, uj)
+        x_diam = np.where(i_duluan, xj, xi)
+        t1 = t_awal + (x_diam - x_gerak) / u_gerak
+        valid1 = (t_akhir > t_awal) & (t1 >= t_awal) & (t1 <= t_akhir) & (t1 <= horizon)
+        t1 = np.where(valid1, t1, np.nan)
+        x1 = np.where(valid1, x_diam, np.nan)
+
+        # Fase 2: keduanya bergerak; posisi dihitung dari t_akhir
+        posisi_i = xi + ui * (t_akhir - ti).clip(min=0)
+        posisi_j = xj + uj * (t_akhir - tj).clip(min=0)
+        t2 = t_akhir + (posisi_j - posisi_i) / (ui - uj)
+        # Pertemuan tepat di t_akhir sudah tercatat di fase 1
+        valid2 = ((t2 > t_akhir) | ((t2 == t_akhir) & ~valid1)) & (t2 <= horizon)
+        t2 = np.where(valid2, t2, np.nan)
+        x2 = np.where(valid2, posisi_i + ui * (t2 - t_akhir), np.nan)
+
+    return t1, x1, t2, x2
+
+def pertemuan_banyak_pelancong(x0, arah, kecepatan, t0, horizon, hitung_matriks=True):
+    """Fungsi untuk menghitung semua pertemuan antar N pelancong dengan broadcasting NumPy.
+
+    Mengembalikan matriks waktu pertemuan pertama (N x N, NaN jika tidak bertemu;
+    None jika `hitung_matriks` False) dan tabel kejadian pertemuan yang terurut menurut waktu.
+    """
+    x0 = np.asarray(x0, dtype=float)
+    u = np.asarray(arah, dtype=float) * np.asarray(kecepatan, dtype=float)
+    t0 = np.asarray(t0, dtype=float)
+    n = len(x0)
+
+    # Matriks N x N float32 butuh 100 MB pada N=5000, jadi hanya dibuat jika memang ditampilkan
+    matriks = np.full((n, n), np.nan, dtype=np.float32) if hitung_matriks else None
+    kejadian = {"waktu": [], "posisi": [], "i": [], "j": []}
+
+    for awal in range(0, n, UKURAN_BLOK_PASANGAN):
+        baris = np.arange(awal, min(awal + UKURAN_BLOK_PASANGAN, n))
+        t1, x1, t2, x2 = _pertemuan_blok(x0, u, t0, baris, horizon)
+        if hitung_matriks:
+            matriks[baris] = np.fmin(t1, t2)
+
+        # Kejadian hanya diambil dari segitiga atas (j > i) agar tidak dobel
+        atas = np.arange(n)[None, :] > baris[:, None]
+        for t, x in ((t1, x1), (t2, x2)):
+            bi, kj = np.nonzero(atas & ~np.isnan(t))
+            kejadian["waktu"].append(t[bi, kj])
+            kejadian["posisi"].append(x[bi, kj])
+            kejadian["i"].append(baris[bi])
+            kejadian["j"].append(kj)
+
+    kejadian = {kolom: np.concatenate(nilai) for kolom, nilai in kejadian.items()}
+    urutan = np.argsort(kejadian["waktu"], kind="stable")
+    tabel = pd.DataFrame({
+        "Waktu (jam)": kejadian["waktu"][urutan],
+        "Posisi (km)": kejadian["posisi"][urutan],
+        "Pelancong 1": kejadian["i"][urutan],
+        "Pelancong 2": kejadian["j"][urutan],
+    })
+    return matriks, tabel
+
+def pelancong_acak(n, panjang_jalan, seed):
+    """Fungsi untuk membuat data N pelancong acak (posisi, arah, kecepatan, waktu berangkat)."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Posisi awal (km)": rng.uniform(0, panjang_jalan, n).round(1),
+        "Arah": rng.choice([1, -1], n),
+        "Kecepatan (km/jam)": rng.uniform(5, 100, n).round(1),
+        "Berangkat (jam)": rng.uniform(0, 2, n).round(2),
+    })
+
+# Toleransi pencarian akar (jam); 1e-6 jam = 0,0036 detik
+TOLERANSI_WAKTU = 1e-6
+
+def integrasi_profil(segmen, waktu_berangkat=0.0):
+    """Fungsi untuk mengintegrasikan profil kecepatan sepotong-sepotong.
+
+    `segmen` berisi baris (durasi_jam, kecepatan_akhir); di dalam satu segmen kecepatan
+    berubah linear dari kecepatan akhir segmen sebelumnya (awal = 0, diam). Titik belok
+    waktu, kecepatan, dan jarak tempuh dihitung sekaligus dengan cumsum.
+    """
+    segmen = np.asarray(segmen, dtype=float).reshape(-1, 2)
+    durasi, kecepatan_akhir = segmen[:, 0], segmen[:, 1]
+    t = waktu_berangkat + np.concatenate([[0.0], np.cumsum(durasi)])
+    v = np.concatenate([[0.0], kecepatan_akhir])
+    # Jarak tiap segmen = luas trapesium di bawah grafik kecepatan
+    x = np.concatenate([[0.0], np.cumsum((v[:-1] + v[1:]) / 2 * durasi)])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a = np.where(durasi > 0, np.diff(v) / durasi, 0.0)
+    # Setelah segmen terakhir, pelancong melaju dengan kecepatan terakhir (percepatan 0)
+    return {"t": t, "v": v, "x": x, "a": np.append(a, 0.0)}
+
+def jarak_tempuh(profil, waktu):
+    """Fungsi untuk menghitung jarak tempuh pada waktu tertentu (angka atau array)."""
+    waktu = np.asarray(waktu, dtype=float)
+    k = np.searchsorted(profil["t"], waktu, side="right") - 1
+    sebelum_berangkat = k < 0
+    k = np.clip(k, 0, len(profil["t"]) - 1)
+    dt = waktu - profil["t"][k]
+    jarak = profil["x"][k] + profil["v"][k] * dt + 0.5 * profil["a"][k] * dt ** 2
+    return np.where(sebelum_berangkat, 0.0, jarak)
+
+def waktu_bertemu_profil(profil_a, profil_b, jarak_total):
+    """Fungsi untuk mencari waktu bertemu dua pelancong berprofil kecepatan.
+
+    Si A berangkat dari 0 menuju Kota B, Si B dari `jarak_total` menuju Kota A.
+    Fungsi sisa jarak g(t) = jarak_total - sA(t) - sB(t) tidak pernah naik, jadi akar
+    cukup dikurung di antara titik belok kedua profil lalu dipersempit dengan bisection.
+    Mengembalikan (waktu, posisi dari Kota A, jumlah iterasi) atau None jika tidak bertemu.
+    """
+    def sisa(t):
+        return jarak_total - jarak_tempuh(profil_a, t) - jarak_tempuh(profil_b, t)
+
+    titik = np.union1d(profil_a["t"], profil_b["t"])
+    # Tambahkan satu titik setelah profil berakhir jika keduanya masih melaju
+    kecepatan_akhir = profil_a["v"][-1] + profil_b["v"][-1]
+    sisa_akhir = sisa(titik[-1])
+    if sisa_akhir > 0 and kecepatan_akhir > 0:
+        titik = np.append(titik, titik[-1] + sisa_akhir / kecepatan_akhir + 1.0)
+
+    nilai = sisa(titik)
+    kurung = np.nonzero(nilai <= 0)[0]
+    if len(kurung) == 0:
+        return None
+    k = kurung[0]
+    if k == 0:
+        return titik[0], float(jarak_tempuh(profil_a, titik[0])), 0
+
+    kiri, kanan = titik[k - 1], titik[k]
+    iterasi = 0
+    while kanan - kiri > TOLERANSI_WAKTU:
+        tengah = (kiri + kanan) / 2
+        if sisa(tengah) > 0:
+            kiri = tengah
+        else:
+            kanan = tengah
+        iterasi += 1
+    return kanan, float(jarak_tempuh(profil_a, kanan)), iterasi
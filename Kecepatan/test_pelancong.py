@@ -0,0 +1,165 @@
+"""Uji pertemuan banyak pelancong dan profil kecepatan (pelancong.py): pytest Kecepatan/test_pelancong.py"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+import pelancong
+from pelancong import (
+    TOLERANSI_WAKTU, integrasi_profil, jarak_tempuh, pelancong_acak, pertemuan_banyak_pelancong, waktu_bertemu_profil,
+)
+
+
+def lintasan(t, x0, u, t0):
+    """Posisi pelancong pada waktu t: diam di x0 sampai t0, lalu bergerak dengan kecepatan bertanda u."""
+    return x0 + u * max(0.0, t - t0)
+
+
+def pertemuan_naif(x0, u, t0, horizon):
+    """Semua pertemuan tiap pasangan, dicari per ruas linear tanpa broadcasting.
+
+    Selisih posisi dua pelancong linear di antara waktu berangkat keduanya, jadi setiap
+    ruas yang berganti tanda berisi tepat satu pertemuan. Mengembalikan daftar (waktu, i, j).
+    """
+    hasil = []
+    for i, j in itertools.combinations(range(len(x0)), 2):
+        titik = np.unique(np.clip([t0[i], t0[j], horizon], 0, horizon))
+
+        def selisih(t):
+            return lintasan(t, x0[i], u[i], t0[i]) - lintasan(t, x0[j], u[j], t0[j])
+
+        for ta, tb in zip(titik[:-1], titik[1:]):
+            ga, gb = selisih(ta), selisih(tb)
+            if ga * gb < 0:
+                hasil.append((ta - ga * (tb - ta) / (gb - ga), i, j))
+    return sorted(hasil)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_sama_dengan_semua_pasangan(monkeypatch, seed):
+    # Blok kecil agar batas antar blok baris ikut teruji
+    monkeypatch.setattr(pelancong, "UKURAN_BLOK_PASANGAN", 7)
+    # Tanpa pembulatan agar tidak ada dua pelancong yang kebetulan diam di titik yang sama
+    rng = np.random.default_rng(seed)
+    n, horizon = 50, 3.0
+    x0, arah = rng.uniform(0, 100, n), rng.choice([1, -1], n)
+    v, t0 = rng.uniform(5, 100, n), rng.uniform(0, 2, n)
+
+    matriks, tabel = pertemuan_banyak_pelancong(x0, arah, v, t0, horizon)
+    harapan = pertemuan_naif(x0, arah * v, t0, horizon)
+
+    assert len(tabel) == len(harapan) > 0
+    assert tabel["Waktu (jam)"].is_monotonic_increasing
+    didapat = sorted(zip(tabel["Waktu (jam)"], tabel["Pelancong 1"], tabel["Pelancong 2"]))
+    for (t, i, j), (t_harapan, i_harapan, j_harapan) in zip(didapat, harapan):
+        assert (i, j) == (i_harapan, j_harapan)
+        assert t == pytest.approx(t_harapan, abs=1e-9)
+
+    # Matriks berisi pertemuan pertama tiap pasangan, simetris, NaN jika tidak pernah bertemu
+    pertama = {}
+    for t, i, j in harapan:
+        pertama.setdefault((i, j), t) # `harapan` terurut menurut waktu
+    for i, j in itertools.combinations(range(len(x0)), 2):
+        if (i, j) in pertama:
+            assert matriks[i, j] == pytest.approx(pertama[(i, j)], rel=1e-6)
+        else:
+            assert np.isnan(matriks[i, j])
+        np.testing.assert_equal(matriks[i, j], matriks[j, i])
+
+
+def test_pelancong_acak():
+    data = pelancong_acak(200, 80, 1)
+    assert len(data) == 200
+    assert data["Posisi awal (km)"].between(0, 80).all()
+    assert set(data["Arah"]) <= {1, -1}
+    assert data.equals(pelancong_acak(200, 80, 1))
+
+
+def test_posisi_pertemuan_sama_untuk_kedua_pelancong():
+    data = pelancong_acak(40, 100, 7)
+    x0, u = data["Posisi awal (km)"].to_numpy(), (data["Arah"] * data["Kecepatan (km/jam)"]).to_numpy()
+    t0 = data["Berangkat (jam)"].to_numpy()
+    _, tabel = pertemuan_banyak_pelancong(x0, data["Arah"], data["Kecepatan (km/jam)"], t0, 3.0)
+    for t, x, i, j in tabel.itertuples(index=False):
+        assert x == pytest.approx(lintasan(t, x0[i], u[i], t0[i]), abs=1e-6)
+        assert x == pytest.approx(lintasan(t, x0[j], u[j], t0[j]), abs=1e-6)
+
+
+def test_dua_pelancong_berhadapan():
+    # A dari 0 ke kanan 40 km/jam, B dari 100 ke kiri 60 km/jam berangkat 30 menit kemudian
+    matriks, tabel = pertemuan_banyak_pelancong([0, 100], [1, -1], [40, 60], [0, 0.5], 5)
+    assert len(tabel) == 1
+    assert tabel["Waktu (jam)"][0] == pytest.approx(1.3)
+    assert tabel["Posisi (km)"][0] == pytest.approx(52)
+    assert matriks[0, 1] == matriks[1, 0] == pytest.approx(1.3)
+
+
+def test_dilewati_saat_masih_diam():
+    # A sudah melaju dan melewati B yang baru berangkat satu jam kemudian (fase 1)
+    _, tabel = pertemuan_banyak_pelancong([0, 30], [1, 1], [60, 10], [0, 1], 2)
+    assert tabel["Waktu (jam)"].tolist() == pytest.approx([0.5])
+    assert tabel["Posisi (km)"].tolist() == pytest.approx([30])
+
+
+def test_tanpa_matriks():
+    data = pelancong_acak(30, 100, 3)
+    args = (data["Posisi awal (km)"], data["Arah"], data["Kecepatan (km/jam)"], data["Berangkat (jam)"], 2.0)
+    matriks, tabel = pertemuan_banyak_pelancong(*args, hitung_matriks=False)
+    assert matriks is None
+    assert tabel.equals(pertemuan_banyak_pelancong(*args)[1])
+
+
+# Profil contoh aplikasi: (durasi jam, kecepatan akhir km/jam)
+SEGMEN_A = [(6 / 60, 60), (30 / 60, 60), (3 / 60, 0), (10 / 60, 0), (5 / 60, 50)]
+SEGMEN_B = [(4 / 60, 40), (20 / 60, 40), (2 / 60, 0), (15 / 60, 0), (8 / 60, 70)]
+
+
+def jarak_naif(segmen, waktu_berangkat, waktu, langkah=1e-5):
+    """Jarak tempuh dengan integrasi trapesium halus atas kecepatan yang diinterpolasi linear."""
+    t_belok = waktu_berangkat + np.concatenate([[0.0], np.cumsum([d for d, _ in segmen])])
+    v_belok = np.concatenate([[0.0], [v for _, v in segmen]])
+    t = np.arange(waktu_berangkat, waktu + langkah, langkah)
+    v = np.interp(t, t_belok, v_belok) # Setelah profil berakhir kecepatan tetap
+    return float(np.sum((v[1:] + v[:-1]) / 2 * np.diff(t)))
+
+
+@pytest.mark.parametrize("segmen, berangkat", [(SEGMEN_A, 0.0), (SEGMEN_B, 0.25)])
+def test_jarak_tempuh_sama_dengan_integrasi_naif(segmen, berangkat):
+    profil = integrasi_profil(segmen, berangkat)
+    for waktu in [0.1, 0.3, 0.62, 0.8, 1.2, 2.0]:
+        assert jarak_tempuh(profil, waktu) == pytest.approx(jarak_naif(segmen, berangkat, waktu), abs=1e-6)
+    # Belum berangkat: belum menempuh jarak
+    assert jarak_tempuh(profil, berangkat - 0.1) == 0.0
+
+
+def test_jarak_tempuh_array_sama_dengan_skalar():
+    profil = integrasi_profil(SEGMEN_A)
+    waktu = np.linspace(-0.5, 3, 200)
+    np.testing.assert_allclose(jarak_tempuh(profil, waktu), [jarak_tempuh(profil, t) for t in waktu])
+
+
+@pytest.mark.parametrize("jarak_total, berangkat_b", [(30, 0.0), (60, 0.0), (60, 0.5), (90, 0.2), (200, 0.0)])
+def test_waktu_bertemu_sama_dengan_pencarian_naif(jarak_total, berangkat_b):
+    profil_a, profil_b = integrasi_profil(SEGMEN_A), integrasi_profil(SEGMEN_B, berangkat_b)
+    waktu, posisi, _ = waktu_bertemu_profil(profil_a, profil_b, jarak_total)
+    # Waktu pertama sisa jarak habis, dicari pada grid halus
+    t = np.arange(0, 10, 1e-5)
+    sisa = jarak_total - jarak_tempuh(profil_a, t) - jarak_tempuh(profil_b, t)
+    assert waktu == pytest.approx(t[np.argmax(sisa <= 0)], abs=1e-5 + TOLERANSI_WAKTU)
+    assert posisi == pytest.approx(jarak_tempuh(profil_a, waktu))
+    assert posisi + jarak_tempuh(profil_b, waktu) == pytest.approx(jarak_total, abs=1e-3)
+
+
+def test_kecepatan_tetap_sama_dengan_rumus():
+    # Segmen berdurasi 0 langsung mengubah kecepatan: 40 dan 60 km/jam sejak awal
+    waktu, posisi, iterasi = waktu_bertemu_profil(integrasi_profil([(0, 40)]), integrasi_profil([(0, 60)]), 100)
+    assert waktu == pytest.approx(1.0, abs=TOLERANSI_WAKTU)
+    assert posisi == pytest.approx(40, abs=1e-3)
+    assert iterasi > 0
+
+
+def test_berhenti_sebelum_bertemu():
+    # Keduanya berhenti setelah 1 jam pada 10 km/jam: sisa 80 km tidak pernah habis
+    berhenti = integrasi_profil([(0, 10), (1, 10), (0, 0)])
+    assert waktu_bertemu_profil(berhenti, berhenti, 100) is None
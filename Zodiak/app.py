@@ -1,6 +1,23 @@
 import streamlit as st
 import google.generativeai as genai
+import json
 import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+# Tanggal lahir atau nama zodiak dikenali tanpa API
+from zodiak_lokal import ZODIAK, kenali_zodiak, menyebut_zodiak, rentang_zodiak
+
+# gemini_bersama.py ada di folder induk (dipakai bersama semua chatbot); Streamlit hanya
+# menambahkan folder aplikasi ke sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gemini_bersama import (
+    BATAS_WAKTU_GILIRAN, batalkan_tugas, kirim_tugas, pantau_tugas, tampilkan_riwayat, tampilkan_statistik_gemini
+)
 
 # ==============================================================================
 # KONFIGURASI API KEY & MODEL
@@ -15,24 +32,36 @@ if not api_key:
     st.error("API Key Gemini tidak ditemukan. Harap atur 'GOOGLE_API_KEY' di Streamlit Secrets atau Environment Variable Anda.")
     st.stop()
 
-try:
-    genai.configure(api_key=api_key)
-except Exception as e:
-    st.error(f"Kesalahan saat mengkonfigurasi API Key: {e}. Pastikan API Key valid.")
-    st.stop()
+# Endpoint API opsional, misal server tiruan lokal (gemini_tiruan/server.py) untuk uji latensi
+API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")
 
 MODEL_NAME = 'gemini-1.5-flash' # Rekomendasi: 'gemini-1.5-flash' atau 'gemini-2.5-flash-lite'
+MAX_TOKENS = 500
 
-try:
-    model = genai.GenerativeModel(
+@st.cache_resource # Klien dan model dibagi semua sesi dan thread ramalan; tidak dibuat ulang tiap rerun
+def init_gemini_model():
+    """Konfigurasi API dan buat model sekali per proses.
+
+    genai.configure mengganti klien global, jadi tidak boleh dipanggil di setiap rerun selagi
+    thread latar belakang masih memakai model. Exception tidak di-cache dan dicoba lagi
+    pada rerun berikutnya.
+    """
+    if API_ENDPOINT:
+        genai.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": API_ENDPOINT})
+    else:
+        genai.configure(api_key=api_key)
+    return genai.GenerativeModel(
         MODEL_NAME,
         generation_config=genai.types.GenerationConfig(
             temperature=0.4, # Kontrol kreativitas (0.0=faktual, 1.0=kreatif)
-            max_output_tokens=500 # Batas maksimal panjang jawaban dalam token
+            max_output_tokens=MAX_TOKENS # Batas maksimal panjang jawaban dalam token
         )
     )
+
+try:
+    model = init_gemini_model()
 except Exception as e:
-    st.error(f"Kesalahan saat inisialisasi model '{MODEL_NAME}': {e}. Pastikan nama model benar.")
+    st.error(f"Kesalahan saat inisialisasi model '{MODEL_NAME}': {e}. Pastikan API Key valid dan nama model benar.")
     st.stop()
 
 # ==============================================================================
@@ -58,6 +87,133 @@ INITIAL_CHATBOT_CONTEXT = [
     }
 ]
 
+# ==============================================================================
+# CACHE RAMALAN HARIAN (DIBAGI SEMUA SESI)
+# ==============================================================================
+
+ZONA_WAKTU = ZoneInfo("Asia/Jakarta") # "Hari ini" mengikuti WIB, bukan zona waktu server
+
+@st.cache_resource # Satu cache per proses: paling banyak 12 panggilan model per hari
+def init_cache_ramalan():
+    return {"lock": threading.Lock(), "kunci": {}, "data": {}}
+
+def ramalan_tersimpan(zodiak):
+    """Ramalan hari ini yang sudah ada di cache, atau None; tidak menunggu lock zodiak."""
+    return init_cache_ramalan()["data"].get((zodiak, datetime.now(ZONA_WAKTU).date().isoformat()))
+
+def ramalan_harian(zodiak, timeout=60):
+    """Ramalan hari ini untuk satu zodiak, dibuat sekali per (zodiak, tanggal) lalu dipakai bersama.
+
+    Setiap zodiak punya lock sendiri sehingga permintaan serentak untuk zodiak yang sama
+    menunggu satu panggilan model saja. Mengembalikan (ramalan, dari_cache).
+    """
+    hari_ini = datetime.now(ZONA_WAKTU).date().isoformat()
+    cache = init_cache_ramalan()
+    with cache["lock"]:
+        # Ramalan hari sebelumnya sudah tidak berlaku
+        for kunci in [k for k in cache["data"] if k[1] != hari_ini]:
+            del cache["data"][kunci]
+        kunci_lock = cache["kunci"].setdefault(zodiak, threading.Lock())
+
+    with kunci_lock:
+        ramalan = cache["data"].get((zodiak, hari_ini))
+        if ramalan is not None:
+            return ramalan, True
+        response = model.generate_content(
+            [
+                INITIAL_CHATBOT_CONTEXT[0],
+                INITIAL_CHATBOT_CONTEXT[1],
+                {"role": "user", "parts": [f"Zodiak saya {zodiak}. Berikan ramalan untuk hari ini ({hari_ini})."]},
+            ],
+            request_options={"timeout": timeout},
+        )
+        ramalan = response.text # Error diteruskan ke pemanggil dan tidak di-cache
+        if ramalan:
+            with cache["lock"]:
+                cache["data"][(zodiak, hari_ini)] = ramalan
+        return ramalan, False
+
+# ==============================================================================
+# PENGELOLA KONTEKS (ANGGARAN TOKEN)
+# ==============================================================================
+
+# Riwayat yang dikirim ke Gemini dibatasi agar ukuran prompt tidak terus tumbuh:
+# instruksi sistem selalu ikut, K giliran terakhir dikirim utuh, dan giliran yang
+# lebih lama dipadatkan menjadi ringkasan bergulir.
+BATAS_TOKEN_KONTEKS = 1500 # Anggaran token untuk seluruh riwayat (tanpa pesan baru)
+JUMLAH_GILIRAN_UTUH = 4 # K: jumlah giliran (pesan user + balasan) terakhir yang dikirim utuh
+MAKS_TOKEN_RINGKASAN = 300 # Ringkasan dibatasi; baris tertua dibuang jika melebihi
+MAKS_KATA_RINGKASAN = 25 # Panjang maksimal satu baris ringkasan
+
+def perkiraan_token(teks):
+    """Perkiraan jumlah token secara lokal (sekitar 4 karakter per token), tanpa memanggil API."""
+    return len(teks) // 4 + 1
+
+TOKEN_KONTEKS_AWAL = sum(perkiraan_token(bagian) for pesan in INITIAL_CHATBOT_CONTEXT for bagian in pesan["parts"])
+
+def pesan_baru(role, content):
+    """Buat pesan untuk session_state; jumlah tokennya dihitung sekali saat pesan dibuat."""
+    return {"role": role, "content": content, "token": perkiraan_token(content)}
+
+def ringkas_pesan(msg):
+    """Ringkasan ekstraktif satu pesan: kalimat pertamanya, maksimal MAKS_KATA_RINGKASAN kata."""
+    kalimat = re.split(r"(?<=[.!?])\s", msg["content"].strip(), maxsplit=1)[0]
+    kata = kalimat.split()
+    teks = " ".join(kata[:MAKS_KATA_RINGKASAN]) + (" ..." if len(kata) > MAKS_KATA_RINGKASAN else "")
+    return f"{'Pengguna' if msg['role'] == 'user' else 'Peramal'}: {teks}"
+
+def perbarui_ringkasan(ringkasan, messages, sampai):
+    """Tambahkan pesan messages[ringkasan['sampai']:sampai] ke ringkasan bergulir."""
+    for msg in messages[ringkasan["sampai"]:sampai]:
+        baris = ringkas_pesan(msg)
+        ringkasan["baris"].append((baris, perkiraan_token(baris)))
+        ringkasan["token"] += ringkasan["baris"][-1][1]
+    ringkasan["sampai"] = max(ringkasan["sampai"], sampai)
+    while ringkasan["token"] > MAKS_TOKEN_RINGKASAN:
+        _, token = ringkasan["baris"].pop(0)
+        ringkasan["token"] -= token
+
+def bangun_konteks(messages, ringkasan):
+    """Susun riwayat Gemini dari messages (tanpa pesan baru) dengan anggaran token.
+
+    Hanya token pesan di jendela yang dijumlahkan (tersimpan di tiap pesan), sehingga
+    biayanya tidak bergantung panjang sesi. Mengembalikan (riwayat, total_token).
+    """
+    anggaran = BATAS_TOKEN_KONTEKS - TOKEN_KONTEKS_AWAL - MAKS_TOKEN_RINGKASAN
+    # Mundur dari pesan terbaru; indeks 0 adalah pesan pembuka (sudah ada di INITIAL_CHATBOT_CONTEXT)
+    awal, token_jendela, giliran = len(messages), 0, 0
+    while awal > max(1, ringkasan["sampai"]) and giliran < JUMLAH_GILIRAN_UTUH:
+        msg = messages[awal - 1]
+        if token_jendela + msg["token"] > anggaran:
+            break
+        token_jendela += msg["token"]
+        awal -= 1
+        if msg["role"] == "user":
+            giliran += 1
+    # Jendela selalu dimulai dari pesan user agar urutan user/model tetap berselang
+    while awal < len(messages) and messages[awal]["role"] != "user":
+        token_jendela -= messages[awal]["token"]
+        awal += 1
+
+    perbarui_ringkasan(ringkasan, messages, awal)
+
+    instruksi = INITIAL_CHATBOT_CONTEXT[0]
+    if ringkasan["baris"]:
+        teks_ringkasan = "\n".join(baris for baris, _ in ringkasan["baris"])
+        instruksi = {"role": "user", "parts": [f"{instruksi['parts'][0]}\n\nRingkasan percakapan sebelumnya:\n{teks_ringkasan}"]}
+
+    riwayat = [instruksi, INITIAL_CHATBOT_CONTEXT[1]]
+    for msg in messages[awal:]:
+        riwayat.append({"role": "user" if msg["role"] == "user" else "model", "parts": [msg["content"]]})
+    return riwayat, TOKEN_KONTEKS_AWAL + ringkasan["token"] + token_jendela
+
+# ==============================================================================
+# RIWAYAT CHAT BERHALAMAN
+# ==============================================================================
+
+# Label peran di blok riwayat lama (lihat tampilkan_riwayat di gemini_bersama.py)
+LABEL_PERAN = {"user": "🧑 **Anda**", "assistant": "🔮 **Peramal**"}
+
 # ==============================================================================
 # ANTEMUKA STREAMLIT
 # ==============================================================================
@@ -70,62 +226,138 @@ if "messages" not in st.session_state:
     st.session_state.messages = []
     # HANYA tambahkan balasan pertama dari MODEL sebagai pesan pembuka di chat UI
     # Bagian instruksi "user" (role: user) dari INITIAL_CHATBOT_CONTEXT tidak ditampilkan
-    st.session_state.messages.append({"role": "assistant", "content": INITIAL_CHATBOT_CONTEXT[1]["parts"][0]})
-
-# Tampilkan riwayat chat ke antarmuka Streamlit
-for message in st.session_state.messages:
-    if message["role"] == "user":
-        with st.chat_message("user"):
-            st.markdown(message["content"]) # Menggunakan "content" untuk input user
-    elif message["role"] == "assistant":
-        with st.chat_message("assistant"):
-            st.markdown(message["content"]) # Menggunakan "content" untuk output assistant
+    st.session_state.messages.append(pesan_baru("assistant", INITIAL_CHATBOT_CONTEXT[1]["parts"][0]))
+
+# Ringkasan bergulir untuk giliran yang sudah keluar dari jendela konteks
+if "ringkasan" not in st.session_state:
+    st.session_state.ringkasan = {"baris": [], "token": 0, "sampai": 1}
+
+def selesaikan_tugas(tugas):
+    """Tampilkan hasil tugas Gemini (ramalan harian atau pertanyaan lanjutan) dan catat ke riwayat."""
+    with st.chat_message("assistant"):
+        if tugas["dibatalkan"].is_set():
+            st.markdown("Permintaan dibatalkan.")
+            return
+        if not tugas["future"].done():
+            batalkan_tugas(tugas)
+            st.markdown(f"Maaf, Gemini tidak menjawab dalam {BATAS_WAKTU_GILIRAN} detik. Silakan coba lagi.")
+            return
+        try:
+            if tugas["zodiak"] is not None:
+                ramalan, dari_cache = tugas["future"].result()
+                zodiak = tugas["zodiak"]
+                balasan = f"{ZODIAK[zodiak]['simbol']} **{zodiak}** ({rentang_zodiak(zodiak)})\n\n{ramalan}" if ramalan else None
+            else:
+                response = tugas["future"].result()
+                balasan, dari_cache = response.text if response else None, False
+
+            if balasan:
+                st.markdown(balasan)
+                if dari_cache:
+                    st.caption(f"⚡ Ramalan {zodiak} hari ini diambil dari cache.")
+                # Simpan respons ke session_state dengan format "content"
+                st.session_state.messages.append(pesan_baru("assistant", balasan))
+            else:
+                st.markdown("Maaf, saya tidak bisa memberikan balasan. Respons API kosong atau tidak valid.")
+        except Exception as e:
+            st.markdown(f"Maaf, terjadi kesalahan saat berkomunikasi dengan Gemini: {e}")
+            st.markdown("Kemungkinan penyebab: Masalah koneksi, API Key tidak valid/kuota habis, atau masalah internal server.")
+
+# Tampilkan riwayat chat ke antarmuka Streamlit (pesan lama dalam blok yang bisa dibuka)
+tampilkan_riwayat(st.session_state.messages, LABEL_PERAN)
+
+# Panggilan Gemini yang masih berjalan di latar belakang: dicatat jika sudah selesai,
+# dibatalkan, atau melewati batas waktu; jika belum, dipantau tanpa menahan skrip
+if "tugas_gemini" in st.session_state:
+    tugas = st.session_state.tugas_gemini
+    if tugas["dibatalkan"].is_set() or tugas["future"].done() or time.monotonic() > tugas["batas"]:
+        del st.session_state.tugas_gemini
+        selesaikan_tugas(tugas)
+    else:
+        pantau_tugas(f"Membaca bintang {tugas['zodiak']}..." if tugas["zodiak"] else "Peramal sedang berpikir...")
 
 # --- PERUBAHAN DI SINI ---
 user_input_placeholder = "Silakan masukkan tgl lahir (DD/MM) atau zodiak Anda" # <--- Pesan placeholder yang lebih ringkas
-user_input = st.chat_input(user_input_placeholder)
+# Input dikunci selama masih ada panggilan yang berjalan
+user_input = st.chat_input(user_input_placeholder, disabled="tugas_gemini" in st.session_state)
 
 if user_input:
     # Tambahkan pesan pengguna ke riwayat dan tampilkan
     # Ubah format menjadi "content" untuk konsistensi di st.session_state.messages
-    st.session_state.messages.append({"role": "user", "content": user_input.lower()})
+    st.session_state.messages.append(pesan_baru("user", user_input.lower()))
     with st.chat_message("user"):
         st.markdown(user_input)
 
-    # Kirim pesan ke Gemini dan dapatkan respons
-    try:
-        # Bangun riwayat chat LENGKAP untuk dikirim ke Gemini:
-        # 1. Mulai dengan instruksi sistem (INITIAL_CHATBOT_CONTEXT[0])
-        # 2. Tambahkan balasan awal model (INITIAL_CHATBOT_CONTEXT[1])
-        # 3. Tambahkan semua interaksi selanjutnya dari st.session_state.messages
-        
-        # Perhatikan: Kita perlu mengubah format "content" menjadi "parts" saat mengirim ke Gemini
-        full_chat_history_for_gemini = [
-            INITIAL_CHATBOT_CONTEXT[0], # Instruksi sistem untuk model
-            INITIAL_CHATBOT_CONTEXT[1]  # Balasan awal dari model
-        ]
-        
-        # Tambahkan semua pesan dari st.session_state.messages (mulai dari pesan kedua, yaitu user input pertama)
-        # Kita perlu memformat ulang dari {"role": "user", "content": "..."} menjadi {"role": "user", "parts": ["..."]}
-        for msg in st.session_state.messages[1:]: # Mulai dari indeks 1 karena indeks 0 adalah balasan awal bot
-            if msg["role"] == "user":
-                full_chat_history_for_gemini.append({"role": "user", "parts": [msg["content"]]})
-            elif msg["role"] == "assistant":
-                full_chat_history_for_gemini.append({"role": "model", "parts": [msg["content"]]}) # Role model di API
-
-        chat_session = model.start_chat(history=full_chat_history_for_gemini)
-        response = chat_session.send_message(user_input.lower(), request_options={"timeout": 60})
-
-        if response and response.text:
+    # Pesan yang hanya berisi tanggal lahir / nama zodiak dikenali secara lokal dan tanggal tidak
+    # valid ditolak tanpa API. Pesan lain diteruskan ke Gemini, kecuali zodiak belum diketahui dan
+    # pesannya sama sekali tidak menyebut zodiak maupun tanggal.
+    zodiak, error_zodiak = kenali_zodiak(user_input)
+    if (
+        error_zodiak is None and zodiak is None
+        and "zodiak" not in st.session_state and not menyebut_zodiak(user_input)
+    ):
+        error_zodiak = (
+            "Saya belum tahu zodiak Anda. Silakan masukkan tanggal lahir (DD/MM) "
+            "atau nama zodiak Anda, misalnya **17/08** atau **Leo**."
+        )
+
+    if error_zodiak:
+        with st.chat_message("assistant"):
+            st.markdown(error_zodiak)
+        st.session_state.messages.append(pesan_baru("assistant", error_zodiak))
+
+    elif zodiak is not None:
+        # Ramalan harian per zodiak dibagi semua pengguna (paling banyak 12 panggilan per hari)
+        st.session_state.zodiak = zodiak
+        ramalan = ramalan_tersimpan(zodiak)
+        if ramalan is not None:
+            # Sudah ada di cache: dijawab langsung tanpa antre kuota
+            balasan = f"{ZODIAK[zodiak]['simbol']} **{zodiak}** ({rentang_zodiak(zodiak)})\n\n{ramalan}"
             with st.chat_message("assistant"):
-                st.markdown(response.text)
-            # Simpan respons ke session_state dengan format "content"
-            st.session_state.messages.append({"role": "assistant", "content": response.text})
+                st.markdown(balasan)
+                st.caption(f"⚡ Ramalan {zodiak} hari ini diambil dari cache.")
+            st.session_state.messages.append(pesan_baru("assistant", balasan))
         else:
-            with st.chat_message("assistant"):
-                st.markdown("Maaf, saya tidak bisa memberikan balasan. Respons API kosong atau tidak valid.")
+            st.session_state.tugas_gemini = kirim_tugas(
+                lambda timeout, berhenti: ramalan_harian(zodiak, timeout),
+                token=TOKEN_KONTEKS_AWAL + MAX_TOKENS,
+                kunci=f"ramalan:{zodiak}", # Pengguna lain dengan zodiak sama ikut panggilan ini
+                hedge=False, # Hedge hanya akan menunggu lock zodiak yang sama
+                zodiak=zodiak,
+            )
+            st.rerun()
 
-    except Exception as e:
-        with st.chat_message("assistant"):
-            st.markdown(f"Maaf, terjadi kesalahan saat berkomunikasi dengan Gemini: {e}")
-            st.markdown("Kemungkinan penyebab: Masalah koneksi, API Key tidak valid/kuota habis, atau masalah internal server.")
+    else:
+        # Pertanyaan lanjutan tetap dijawab Gemini dengan konteks percakapan.
+        # Bangun riwayat chat dengan anggaran token:
+        # instruksi sistem (+ ringkasan giliran lama), balasan awal model, lalu K giliran terakhir,
+        # diakhiri pesan user yang baru saja ditambahkan.
+        full_chat_history_for_gemini, token_konteks = bangun_konteks(
+            st.session_state.messages[:-1], st.session_state.ringkasan
+        )
+        st.session_state.token_konteks = token_konteks
+        isi = full_chat_history_for_gemini + [{"role": "user", "parts": [user_input.lower()]}]
+
+        def panggil(timeout, berhenti):
+            return model.generate_content(isi, request_options={"timeout": timeout})
+
+        # Sesi lain dengan konteks dan pertanyaan yang sama persis ikut memakai panggilan ini
+        st.session_state.tugas_gemini = kirim_tugas(
+            panggil,
+            token=token_konteks + perkiraan_token(user_input) + MAX_TOKENS,
+            kunci=json.dumps(isi),
+            zodiak=None,
+        )
+        st.rerun()
+
+# Info ukuran konteks yang dikirim pada permintaan terakhir
+if "token_konteks" in st.session_state:
+    st.sidebar.caption(
+        f"🧮 Konteks terakhir: ±{st.session_state.token_konteks} token "
+        f"(ringkasan {st.session_state.ringkasan['token']} token, maks {BATAS_TOKEN_KONTEKS})"
+    )
+
+tampilkan_statistik_gemini()
+
+# Jumlah ramalan hari ini yang sudah tersimpan di cache bersama
+st.sidebar.caption(f"🔮 Ramalan tersimpan hari ini: {len(init_cache_ramalan()['data'])}/{len(ZODIAK)} zodiak")
\ No newline at end of file
@@ -0,0 +1,71 @@
+"""Uji pengenalan zodiak lokal (zodiak_lokal.py): pytest Zodiak/test_zodiak.py"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from zodiak_lokal import TABEL_ZODIAK, ZODIAK, kenali_zodiak, menyebut_zodiak, rentang_zodiak
+
+
+def zodiak_naif(bulan, hari):
+    """Zodiak dari tanggal mulai di ZODIAK, dicari ulang tanpa tabel."""
+    mulai = [(z["mulai"], nama) for nama, z in ZODIAK.items() if z["mulai"] <= (bulan, hari)]
+    return max(mulai)[1] if mulai else "Capricorn"
+
+
+def test_tabel_sama_dengan_perhitungan_naif():
+    tanggal = date(2000, 1, 1)
+    for n in range(366):
+        hari = tanggal + timedelta(days=n)
+        assert TABEL_ZODIAK[n] == zodiak_naif(hari.month, hari.day), hari
+
+
+@pytest.mark.parametrize("teks, zodiak", [
+    ("17/08", "Leo"),
+    ("17-08-1995", "Leo"),
+    ("saya lahir 17 agustus 1995", "Leo"),
+    ("tanggal lahir saya 1 jan", "Capricorn"),
+    ("31/12", "Capricorn"),
+    ("29/02", "Pisces"),
+    ("21/03", "Aries"),
+    ("20/03", "Pisces"),
+    ("leo", "Leo"),
+    ("Zodiak saya Sagittarius dong", "Sagitarius"),
+    ("ramalan kanser hari ini", "Cancer"),
+])
+def test_pesan_zodiak_dikenali(teks, zodiak):
+    assert kenali_zodiak(teks) == (zodiak, None)
+
+
+@pytest.mark.parametrize("teks", ["32/13", "30/02", "31 april"])
+def test_tanggal_tidak_valid(teks):
+    zodiak, error = kenali_zodiak(teks)
+    assert zodiak is None and "tidak valid" in error
+
+
+@pytest.mark.parametrize("teks", [
+    # Pertanyaan lanjutan yang dulu salah ditangkap sebagai tanggal atau nama zodiak
+    "apakah leo cocok dengan aries?",
+    "bagaimana ramalan 2-3 hari ke depan?",
+    "jam 10.30 nanti hoki?",
+    "Apakah kamu memakai gemini?",
+    "leo atau virgo?",
+    "bagaimana karier saya minggu ini",
+    "",
+])
+def test_pertanyaan_lanjutan_diteruskan_ke_model(teks):
+    assert kenali_zodiak(teks) == (None, None)
+
+
+def test_menyebut_zodiak():
+    assert menyebut_zodiak("apakah leo cocok dengan aries?")
+    assert menyebut_zodiak("bagaimana ramalan 2-3 hari ke depan?")
+    assert not menyebut_zodiak("bagaimana karier saya minggu ini")
+    # "leopard" bukan "leo"
+    assert not menyebut_zodiak("saya suka leopard")
+
+
+def test_rentang_zodiak():
+    assert rentang_zodiak("Leo") == "23/07 – 22/08"
+    # Capricorn melewati akhir tahun
+    assert rentang_zodiak("Capricorn") == "22/12 – 19/01"
@@ -0,0 +1,126 @@
+"""Pengenalan zodiak lokal untuk chatbot Zodiak.
+
+Tanggal lahir (17/08, 17-08-1995, 17 Agustus) atau nama zodiak dikenali tanpa
+memanggil Gemini, lewat tabel 366 hari. Hanya pesan yang memang berisi tanggal atau
+satu nama zodiak (ditemani kata pengisi) yang dikenali; pertanyaan lain diteruskan
+ke model walaupun menyebut nama zodiak.
+"""
+
+import re
+from datetime import date
+
+# ==============================================================================
+# TABEL ZODIAK
+# ==============================================================================
+
+# Tanggal mulai setiap zodiak (bulan, hari), simbol, dan nama lain yang sering ditulis pengguna
+ZODIAK = {
+    "Capricorn": {"mulai": (12, 22), "simbol": "♑", "alias": ["kaprikornus", "capricornus"]},
+    "Aquarius": {"mulai": (1, 20), "simbol": "♒", "alias": ["akuarius"]},
+    "Pisces": {"mulai": (2, 19), "simbol": "♓", "alias": []},
+    "Aries": {"mulai": (3, 21), "simbol": "♈", "alias": []},
+    "Taurus": {"mulai": (4, 20), "simbol": "♉", "alias": []},
+    "Gemini": {"mulai": (5, 21), "simbol": "♊", "alias": []},
+    "Cancer": {"mulai": (6, 21), "simbol": "♋", "alias": ["kanser", "kanker"]},
+    "Leo": {"mulai": (7, 23), "simbol": "♌", "alias": []},
+    "Virgo": {"mulai": (8, 23), "simbol": "♍", "alias": []},
+    "Libra": {"mulai": (9, 23), "simbol": "♎", "alias": []},
+    "Scorpio": {"mulai": (10, 23), "simbol": "♏", "alias": ["skorpio", "scorpion", "scorpius"]},
+    "Sagitarius": {"mulai": (11, 22), "simbol": "♐", "alias": ["sagittarius"]},
+}
+
+NAMA_BULAN = {
+    "januari": 1, "jan": 1, "februari": 2, "feb": 2, "maret": 3, "mar": 3, "april": 4, "apr": 4,
+    "mei": 5, "juni": 6, "jun": 6, "juli": 7, "jul": 7, "agustus": 8, "agu": 8, "agt": 8,
+    "september": 9, "sep": 9, "oktober": 10, "okt": 10, "november": 11, "nov": 11,
+    "desember": 12, "des": 12,
+}
+
+# Tabel 366 entri: hari ke-n dalam tahun kabisat -> nama zodiak (29/02 ikut dihitung)
+TABEL_ZODIAK = []
+for _n in range(366):
+    _tanggal = date.fromordinal(date(2000, 1, 1).toordinal() + _n)
+    TABEL_ZODIAK.append(max(
+        (nama for nama, z in ZODIAK.items() if z["mulai"] <= (_tanggal.month, _tanggal.day)),
+        key=lambda nama: ZODIAK[nama]["mulai"],
+        default="Capricorn",
+    ))
+
+# Nama zodiak dan aliasnya (huruf kecil) -> nama baku
+KATA_ZODIAK = {kata: nama for nama, z in ZODIAK.items() for kata in [nama.lower(), *z["alias"]]}
+
+POLA_TANGGAL = re.compile(r"\b(\d{1,2})\s*[/\-.]\s*(\d{1,2})(?:\s*[/\-.]\s*\d{2,4})?\b")
+POLA_TANGGAL_TEKS = re.compile(
+    r"\b(\d{1,2})\s+(" + "|".join(sorted(NAMA_BULAN, key=len, reverse=True)) + r")\b(?:\s+\d{4}\b)?"
+)
+
+# ==============================================================================
+# PENGENALAN PESAN
+# ==============================================================================
+
+# Kata yang boleh menyertai tanggal/nama zodiak agar pesan tetap dianggap "hanya zodiak".
+# Pesan dengan kata lain ("cocok dengan", "ke depan", "jam", "memakai") adalah pertanyaan
+# untuk model, walaupun menyebut nama zodiak atau angka yang mirip tanggal.
+KATA_PENGISI = {
+    "saya", "aku", "gue", "ku", "zodiak", "zodiakku", "bintang", "bintangku", "lahir", "kelahiran",
+    "tanggal", "tgl", "tanggalku", "adalah", "yaitu", "ini", "itu", "hari", "ramalan", "ramal", "ramalkan",
+    "ramalannya", "untuk", "buat", "tolong", "minta", "dong", "ya", "nih", "sih", "kak", "halo", "hai",
+    "bagaimana", "gimana", "cek", "lihat", "coba", "sekarang",
+}
+
+def format_hari_ke(n):
+    """Hari ke-n (0..365) dalam tahun kabisat sebagai DD/MM."""
+    return date.fromordinal(date(2000, 1, 1).toordinal() + n).strftime("%d/%m")
+
+def rentang_zodiak(nama):
+    """Rentang tanggal zodiak dalam format DD/MM – DD/MM, dibaca dari TABEL_ZODIAK."""
+    hari = [n for n, z in enumerate(TABEL_ZODIAK) if z == nama]
+    # Capricorn melewati akhir tahun, jadi awalnya dicari dari hari setelah celah
+    awal = next((n for n in hari if (n - 1) % 366 not in hari), hari[0])
+    akhir = next((n for n in hari if (n + 1) % 366 not in hari), hari[-1])
+    return f"{format_hari_ke(awal)} – {format_hari_ke(akhir)}"
+
+def hanya_pengisi(teks):
+    """True jika teks tidak berisi kata selain KATA_PENGISI."""
+    return all(kata in KATA_PENGISI for kata in re.findall(r"[a-z0-9]+", teks))
+
+def kenali_zodiak(teks):
+    """Kenali zodiak dari tanggal lahir (DD/MM, DD-MM, 12 Maret) atau nama zodiak, tanpa API.
+
+    Hanya pesan yang isinya memang tanggal atau satu nama zodiak (boleh ditemani kata
+    pengisi seperti "zodiak saya", "lahir tanggal") yang dikenali; pesan lain dianggap
+    pertanyaan lanjutan. Mengembalikan (zodiak, None) jika dikenali, (None, pesan_error)
+    jika tanggal tidak valid, atau (None, None) untuk pesan lainnya.
+    """
+    teks = teks.lower()
+    cocok = POLA_TANGGAL.search(teks)
+    if cocok:
+        hari, bulan = int(cocok.group(1)), int(cocok.group(2))
+    else:
+        cocok = POLA_TANGGAL_TEKS.search(teks)
+        if cocok:
+            hari, bulan = int(cocok.group(1)), NAMA_BULAN[cocok.group(2)]
+
+    if cocok:
+        if not hanya_pengisi(teks[:cocok.start()] + " " + teks[cocok.end():]):
+            return None, None
+        try:
+            # Tahun kabisat agar 29/02 tetap valid
+            hari_ke = date(2000, bulan, hari).timetuple().tm_yday - 1
+        except ValueError:
+            return None, f"Tanggal **{cocok.group(0)}** tidak valid. Masukkan tanggal lahir dengan format DD/MM, misalnya 17/08."
+        return TABEL_ZODIAK[hari_ke], None
+
+    kata = re.findall(r"[a-z0-9]+", teks)
+    zodiak = {KATA_ZODIAK[k] for k in kata if k in KATA_ZODIAK}
+    if len(zodiak) == 1 and all(k in KATA_ZODIAK or k in KATA_PENGISI for k in kata):
+        return zodiak.pop(), None
+    return None, None
+
+def menyebut_zodiak(teks):
+    """True jika teks menyebut nama zodiak atau angka yang mirip tanggal di mana pun."""
+    teks = teks.lower()
+    return bool(
+        POLA_TANGGAL.search(teks) or POLA_TANGGAL_TEKS.search(teks)
+        or any(kata in KATA_ZODIAK for kata in re.findall(r"[a-z]+", teks))
+    )
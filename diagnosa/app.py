@@ -1,6 +1,22 @@
 import google.generativeai as genai
+import json
 import os
 import streamlit as st
+import sys
+import threading
+import time
+from concurrent.futures import CancelledError
+from google.api_core import exceptions as google_exceptions
+
+import cache_semantik
+from filter_topik import PESAN_TOLAK, di_luar_topik
+
+# gemini_bersama.py ada di folder induk (dipakai bersama semua chatbot); Streamlit hanya
+# menambahkan folder aplikasi ke sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gemini_bersama import (
+    BATAS_WAKTU_GILIRAN, batalkan_tugas, kirim_tugas, pantau_tugas, tampilkan_riwayat, tampilkan_statistik_gemini
+)
 
 # ==============================================================================
 # PENGATURAN API KEY DAN MODEL
@@ -14,6 +30,24 @@ API_KEY = os.getenv("GEMINI_API_KEY")
 
 # Nama model Gemini yang akan digunakan.
 MODEL_NAME = 'gemini-1.5-flash'
+MAX_TOKENS = 500
+
+# Setelah sekian kegagalan beruntun, model dan klien dianggap tidak sehat dan dibuat ulang.
+# Hanya kegagalan klien/koneksi yang dihitung; penolakan lokal (antrean kuota ramai, batas
+# waktu giliran) tidak berarti kliennya rusak.
+BATAS_GAGAL_BERUNTUN = 3
+ERROR_KLIEN = (google_exceptions.GoogleAPIError, ConnectionError)
+
+# Cache semantik: pertanyaan yang mirip (kemiripan kosinus TF-IDF >= ambang, dengan kata penentu
+# seperti "hamil"/"bayi"/"tidak" yang sama persis) memakai jawaban yang sudah ada. Ambang divalidasi
+# dengan `python cache_semantik.py --evaluasi contoh_prompt_mirip.jsonl` sebelum diubah.
+# Bisa diatur lewat variabel lingkungan; kebijakan eviksi "lru" atau "fifo".
+AMBANG_KEMIRIPAN = float(os.getenv("DIAGNOSA_AMBANG_KEMIRIPAN", "0.9"))
+MAKS_CACHE_SEMANTIK = int(os.getenv("DIAGNOSA_MAKS_CACHE", "10000"))
+KEBIJAKAN_CACHE = os.getenv("DIAGNOSA_KEBIJAKAN_CACHE", "lru")
+
+# Endpoint API opsional, misal server tiruan lokal (gemini_tiruan/server.py) untuk uji latensi
+API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")
 
 # ==============================================================================
 # KONTEKS AWAL CHATBOT
@@ -31,6 +65,106 @@ INITIAL_CHATBOT_CONTEXT = [
     }
 ]
 
+# ==============================================================================
+# KLIEN DAN MODEL GEMINI (SATU PER PROSES)
+# ==============================================================================
+
+def gemini_sehat(gemini):
+    """Cek kesehatan murah (tanpa panggilan jaringan) yang dijalankan setiap kali cache dipakai."""
+    return gemini["gagal_beruntun"] < BATAS_GAGAL_BERUNTUN
+
+@st.cache_resource(validate=gemini_sehat, show_spinner=False)
+def init_gemini():
+    """Konfigurasi API dan buat model sekali per proses, saat pertama kali dibutuhkan.
+
+    genai.configure mengganti klien (dan koneksi) global, jadi tidak boleh dipanggil
+    di setiap rerun. Jika inisialisasi gagal, exception tidak di-cache dan akan
+    dicoba lagi pada rerun berikutnya.
+    """
+    if API_ENDPOINT:
+        genai.configure(api_key=API_KEY, transport="rest", client_options={"api_endpoint": API_ENDPOINT})
+    else:
+        genai.configure(api_key=API_KEY)
+    model = genai.GenerativeModel(
+        MODEL_NAME,
+        generation_config=genai.types.GenerationConfig(
+            temperature=0.4,
+            max_output_tokens=MAX_TOKENS
+        )
+    )
+    return {"model": model, "gagal_beruntun": 0}
+
+@st.cache_resource # Satu cache jawaban untuk semua sesi
+def init_cache_semantik():
+    return cache_semantik.cache_baru(MAKS_CACHE_SEMANTIK, AMBANG_KEMIRIPAN, KEBIJAKAN_CACHE)
+
+def tampilkan_statistik_cache():
+    """Rasio hit dan latensi pencarian cache semantik di sidebar."""
+    statistik = cache_semantik.statistik(init_cache_semantik())
+    with st.sidebar:
+        st.subheader("♻️ Cache Jawaban")
+        col_hit, col_entri = st.columns(2)
+        col_hit.metric("Rasio hit", f"{statistik['rasio_hit']:.0%}")
+        col_entri.metric("Entri", statistik["entri"])
+        st.caption(
+            f"Hit {statistik['hit']} · Miss {statistik['miss']} · Pencarian p50 "
+            f"{statistik['latensi_p50_ms']:.2f} ms, p95 {statistik['latensi_p95_ms']:.2f} ms"
+        )
+
+# ==============================================================================
+# RIWAYAT CHAT BERHALAMAN
+# ==============================================================================
+
+# Label peran di blok riwayat lama (lihat tampilkan_riwayat di gemini_bersama.py)
+LABEL_PERAN = {"user": "🧑 **Anda**", "model": "💊 **Asisten**"}
+
+# ==============================================================================
+# HASIL PANGGILAN GEMINI
+# ==============================================================================
+
+def selesaikan_tugas(tugas):
+    """Tampilkan hasil tugas Gemini; riwayat chat dan cache hanya diubah jika balasan lengkap diterima."""
+    gemini = tugas["gemini"]
+    with st.chat_message("assistant"):
+        try:
+            if tugas["dibatalkan"].is_set():
+                st.markdown("Permintaan dibatalkan.")
+            elif not tugas["future"].done():
+                batalkan_tugas(tugas)
+                raise TimeoutError(f"tidak ada jawaban dalam {BATAS_WAKTU_GILIRAN} detik")
+            else:
+                chatbot_response = tugas["future"].result()
+                gemini["gagal_beruntun"] = 0
+
+                if not chatbot_response:
+                    chatbot_response = "Maaf, saya tidak bisa memberikan balasan."
+                elif tugas["tanpa_konteks"]:
+                    cache_semantik.simpan(init_cache_semantik(), tugas["prompt"], chatbot_response)
+                st.markdown(chatbot_response)
+
+                chat_session = st.session_state.chat_session
+                chat_session.history = list(chat_session.history) + [
+                    {"role": "user", "parts": [tugas["prompt"]]},
+                    {"role": "model", "parts": [chatbot_response]},
+                ]
+                # Teks lengkap baru disimpan ke riwayat setelah seluruh potongan diterima
+                st.session_state.messages.append({"role": "model", "parts": [chatbot_response]})
+                return
+
+        except Exception as e:
+            if isinstance(e, ERROR_KLIEN):
+                gemini["gagal_beruntun"] += 1
+            error_message = f"Maaf, terjadi kesalahan saat berkomunikasi dengan Gemini: {e}"
+            error_message += "\n\nKemungkinan penyebab:"
+            error_message += "\n - Masalah koneksi internet atau timeout."
+            error_message += "\n - API Key mungkin dibatasi, tidak valid, atau melebihi kuota."
+            error_message += "\n - Masalah internal di server Gemini."
+            st.error(error_message)
+
+    # Opsional: Hapus input pengguna terakhir dari riwayat jika gagal mendapatkan balasan
+    if st.session_state.messages[-1]["role"] == "user":
+        st.session_state.messages.pop()
+
 # ==============================================================================
 # FUNGSI UTAMA CHATBOT UNTUK STREAMLIT
 # ==============================================================================
@@ -45,52 +179,45 @@ def main():
         st.error("API Key Gemini belum diatur. Harap tambahkan `GEMINI_API_KEY` ke Streamlit Secrets Anda.")
         st.stop() # Hentikan eksekusi jika API Key tidak ada
 
+    # Klien dan model diambil dari cache proses; hanya sesi chat yang disimpan per pengguna
     try:
-        genai.configure(api_key=API_KEY)
-    except Exception as e:
-        st.error(f"Kesalahan saat mengkonfigurasi API Key: {e}")
-        st.error("Pastikan API Key Anda benar dan koneksi internet stabil.")
-        st.stop()
-
-    # Inisialisasi model
-    try:
-        model = genai.GenerativeModel(
-            MODEL_NAME,
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.4,
-                max_output_tokens=500
-            )
-        )
+        gemini = init_gemini()
     except Exception as e:
         st.error(f"Kesalahan saat inisialisasi model '{MODEL_NAME}': {e}")
-        st.error("Pastikan nama model benar dan tersedia untuk API Key Anda.")
+        st.error("Pastikan API Key Anda benar, nama model tersedia, dan koneksi internet stabil.")
         st.stop()
 
     # Inisialisasi riwayat chat di session_state jika belum ada
     if "messages" not in st.session_state:
         st.session_state.messages = INITIAL_CHATBOT_CONTEXT[:] # Salin konteks awal
 
-    # Inisialisasi sesi chat Gemini jika belum ada atau jika model berubah
-    if "chat_session" not in st.session_state or st.session_state.get("model_name") != MODEL_NAME:
-        st.session_state.chat_session = model.start_chat(history=st.session_state.messages)
-        st.session_state.model_name = MODEL_NAME
+    # Inisialisasi sesi chat Gemini jika belum ada atau jika model dibuat ulang (misal setelah tidak sehat)
+    if "chat_session" not in st.session_state or st.session_state.get("gemini") is not gemini:
+        st.session_state.chat_session = gemini["model"].start_chat(history=st.session_state.messages)
+        st.session_state.gemini = gemini
         # Hapus pesan pembuka awal dari riwayat tampilan agar tidak duplikat
         if len(st.session_state.messages) == 2 and st.session_state.messages[1]["role"] == "model":
             st.session_state.messages = [st.session_state.messages[0]]
             st.session_state.messages.append({"role": "model", "parts": [INITIAL_CHATBOT_CONTEXT[1]["parts"][0]]})
 
 
-    # Tampilkan riwayat chat
-    for message in st.session_state.messages:
-        if message["role"] == "user":
-            with st.chat_message("user"):
-                st.markdown(message["parts"][0])
-        elif message["role"] == "model":
-            with st.chat_message("assistant"):
-                st.markdown(message["parts"][0])
+    # Tampilkan riwayat chat (pesan lama dalam blok yang bisa dibuka)
+    tampilkan_riwayat(st.session_state.messages, LABEL_PERAN, kunci_isi="parts")
+
+    # Panggilan Gemini yang masih berjalan di latar belakang: dicatat jika sudah selesai,
+    # dibatalkan, atau melewati batas waktu; jika belum, dipantau tanpa menahan skrip
+    if "tugas_gemini" in st.session_state:
+        tugas = st.session_state.tugas_gemini
+        if tugas["dibatalkan"].is_set() or tugas["future"].done() or time.monotonic() > tugas["batas"]:
+            del st.session_state.tugas_gemini
+            selesaikan_tugas(tugas)
+        else:
+            pantau_tugas("Chatbot sedang berpikir...")
 
-    # Input pengguna
-    user_input = st.chat_input("Ketik gejala atau pertanyaan Anda di sini...")
+    # Input pengguna (dikunci selama masih ada panggilan yang berjalan)
+    user_input = st.chat_input(
+        "Ketik gejala atau pertanyaan Anda di sini...", disabled="tugas_gemini" in st.session_state
+    )
 
     if user_input:
         # Tambahkan input pengguna ke riwayat dan tampilkan
@@ -98,32 +225,78 @@ def main():
         with st.chat_message("user"):
             st.markdown(user_input)
 
-        # Kirim pesan ke model dan dapatkan balasan
-        with st.spinner("Chatbot sedang berpikir..."):
-            try:
-                # Menggunakan chat_session yang sudah ada
-                response = st.session_state.chat_session.send_message(user_input, request_options={"timeout": 60})
+        # Prompt yang jelas di luar topik kesehatan ditolak lokal, tanpa memanggil Gemini
+        ditolak = di_luar_topik(user_input)
 
-                if response and response.text:
-                    chatbot_response = response.text
-                else:
-                    chatbot_response = "Maaf, saya tidak bisa memberikan balasan."
+        # Cache semantik hanya untuk pertanyaan pembuka, karena jawabannya tidak bergantung
+        # pada percakapan sebelumnya
+        cache = init_cache_semantik()
+        tanpa_konteks = len(st.session_state.messages) == len(INITIAL_CHATBOT_CONTEXT) + 1
+        jawaban_cache, kemiripan = None, 0.0
+        if tanpa_konteks and not ditolak:
+            jawaban_cache, kemiripan = cache_semantik.cari(cache, user_input)
 
-                # Tambahkan balasan chatbot ke riwayat dan tampilkan
-                st.session_state.messages.append({"role": "model", "parts": [chatbot_response]})
-                with st.chat_message("assistant"):
-                    st.markdown(chatbot_response)
-
-            except Exception as e:
-                error_message = f"Maaf, terjadi kesalahan saat berkomunikasi dengan Gemini: {e}"
-                error_message += "\n\nKemungkinan penyebab:"
-                error_message += "\n - Masalah koneksi internet atau timeout."
-                error_message += "\n - API Key mungkin dibatasi, tidak valid, atau melebihi kuota."
-                error_message += "\n - Masalah internal di server Gemini."
-                st.error(error_message)
-                # Opsional: Hapus input pengguna terakhir dari riwayat jika gagal mendapatkan balasan
-                if st.session_state.messages[-1]["role"] == "user":
-                    st.session_state.messages.pop()
+        if ditolak:
+            with st.chat_message("assistant"):
+                st.markdown(PESAN_TOLAK)
+            st.session_state.messages.append({"role": "model", "parts": [PESAN_TOLAK]})
+        elif jawaban_cache is not None:
+            with st.chat_message("assistant"):
+                st.markdown(jawaban_cache)
+                st.caption(f"♻️ Jawaban dari pertanyaan serupa (kemiripan {kemiripan:.2f})")
+            st.session_state.messages.append({"role": "model", "parts": [jawaban_cache]})
+            # Catat juga di sesi chat agar pertanyaan lanjutan tetap punya konteks
+            chat_session = st.session_state.chat_session
+            chat_session.history = list(chat_session.history) + [
+                {"role": "user", "parts": [user_input]},
+                {"role": "model", "parts": [jawaban_cache]},
+            ]
+        else:
+            # Kirim pesan ke model di latar belakang; potongan balasan dikumpulkan di tugas
+            # dan ditampilkan oleh pemantau saat tiba. Riwayat sesi chat hanya dibaca di sini,
+            # jadi stream yang terputus atau dibatalkan tidak perlu di-rewind.
+            isi = list(st.session_state.chat_session.history) + [{"role": "user", "parts": [user_input]}]
+            model = gemini["model"]
+            # Bisa ada dua stream sekaligus (hedge): yang pertama menerima potongan menguasai
+            # tampilan, dan melepasnya lagi jika gagal sehingga percobaan ulang mulai dari awal
+            tampilan = {"lock": threading.Lock(), "pemilik": None, "teks": ""}
+
+            def panggil(timeout, berhenti):
+                potongan = []
+                try:
+                    response = model.generate_content(isi, stream=True, request_options={"timeout": timeout})
+                    for chunk in response:
+                        if berhenti.is_set():
+                            raise CancelledError() # Permintaan lain sudah menjawab lebih dulu
+                        potongan.append(chunk.text)
+                        with tampilan["lock"]:
+                            if tampilan["pemilik"] is None:
+                                tampilan["pemilik"] = potongan
+                            if tampilan["pemilik"] is potongan:
+                                tampilan["teks"] = "".join(potongan)
+                    return "".join(potongan)
+                except BaseException:
+                    with tampilan["lock"]:
+                        if tampilan["pemilik"] is potongan:
+                            tampilan["pemilik"], tampilan["teks"] = None, ""
+                    raise
+
+            # Sesi lain dengan percakapan yang sama persis (misal pertanyaan pembuka yang sama)
+            # ikut memakai panggilan ini, termasuk pratinjau stream-nya
+            kunci_panggilan = json.dumps(st.session_state.messages)
+            st.session_state.tugas_gemini = kirim_tugas(
+                panggil,
+                token=len(kunci_panggilan) // 4 + MAX_TOKENS,
+                kunci=kunci_panggilan,
+                bersama={"tampilan": tampilan},
+                gemini=gemini,
+                prompt=user_input,
+                tanpa_konteks=tanpa_konteks,
+            )
+            st.rerun()
+
+    tampilkan_statistik_cache()
+    tampilkan_statistik_gemini()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,361 @@
+"""Cache semantik untuk chatbot diagnosa.
+
+Prompt yang hampir sama ("saya demam dan pusing" / "aku pusing dan demam") memakai
+jawaban yang sudah ada. Setiap prompt diubah menjadi vektor hashing kata berbobot
+TF-IDF (jarang, dinormalisasi L2) dan dicocokkan dengan kemiripan kosinus melalui
+indeks terbalik: fitur disimpan terurut sehingga satu pencarian hanya membaca daftar
+posting fitur milik prompt, bukan seluruh isi cache.
+
+Kemiripan saja tidak cukup untuk pertanyaan medis: "boleh minum ibuprofen?" dan
+"saya hamil, boleh minum ibuprofen?" hampir sama kata-katanya tetapi jawabannya
+berbeda. Karena itu kata penentu (kelompok pasien, negasi, kondisi penyerta, dan
+angka) harus sama persis antara prompt dan entri cache, berapa pun skornya.
+
+Benchmark dengan data sintetis, dan validasi ambang dengan pasangan berlabel:
+
+    python cache_semantik.py --jumlah 100000
+    python cache_semantik.py --evaluasi contoh_prompt_mirip.jsonl
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+import zlib
+from collections import Counter, deque
+
+import numpy as np
+
+# ==============================================================================
+# VEKTORISASI
+# ==============================================================================
+
+DIMENSI_HASH = 1 << 20
+
+# Kata yang tidak mengubah maksud pertanyaan; "tidak" sengaja tidak dimasukkan
+KATA_UMUM = {
+    "dan", "atau", "yang", "saya", "aku", "gue", "apa", "apakah", "bagaimana", "gimana", "kenapa",
+    "mengapa", "untuk", "buat", "di", "ke", "dari", "ini", "itu", "ada", "juga", "sudah", "udah",
+    "sejak", "kalau", "kalo", "jika", "dengan", "sama", "serta", "ya", "dong", "sih", "nih", "kok",
+    "harus", "bisa", "boleh", "mau", "ingin", "tolong", "dok", "kak", "pak", "bu", "saja", "aja", "kah",
+    "the",
+}
+
+# Variasi penulisan negasi disamakan agar "gak boleh" dan "tidak boleh" dianggap sama
+NEGASI = {"tak": "tidak", "gak": "tidak", "ga": "tidak", "nggak": "tidak", "enggak": "tidak", "ndak": "tidak"}
+
+# Kata penentu: jika berbeda, jawabannya bisa berbeda walaupun sisa pertanyaannya sama.
+# Prompt dan entri cache harus punya himpunan kata penentu (ditambah angka) yang persis sama.
+KATA_WAJIB_SAMA = {
+    # Kelompok pasien
+    "hamil", "menyusui", "bayi", "balita", "anak", "remaja", "lansia", "manula",
+    # Negasi dan larangan
+    "tidak", "bukan", "jangan", "belum", "tanpa", "selain",
+    # Kondisi penyerta yang mengubah anjuran obat
+    "alergi", "diabetes", "hipertensi", "darah", "ginjal", "jantung", "lambung", "maag", "asma", "liver",
+}
+
+def token_prompt(teks):
+    """Kata-kata bermakna dari prompt: huruf kecil, tanpa kata umum, akhiran -nya/-lah/-kah dilepas."""
+    hasil = []
+    for kata in re.findall(r"[0-9a-z]+", teks.lower()):
+        if len(kata) > 5:
+            kata = re.sub(r"(nya|lah|kah)$", "", kata)
+        kata = NEGASI.get(kata, kata)
+        if kata not in KATA_UMUM:
+            hasil.append(kata)
+    return hasil
+
+def tanda_wajib(token):
+    """Sidik 64-bit dari kata penentu dan angka di prompt; 0 jika tidak ada."""
+    wajib = sorted({kata for kata in token if kata in KATA_WAJIB_SAMA or kata.isdigit()})
+    if not wajib:
+        return 0
+    return int.from_bytes(hashlib.blake2b(" ".join(wajib).encode(), digest_size=8).digest(), "little", signed=True)
+
+def vektorkan(teks):
+    """Fitur hashing prompt. Mengembalikan (fitur terurut int32, tf float32, tanda kata wajib).
+
+    tf memakai 1 + log(frekuensi); bobot IDF diterapkan terpisah karena bergantung
+    pada isi cache. crc32 dipakai (bukan hash() bawaan) agar fitur sama di setiap proses.
+    """
+    token = token_prompt(teks)
+    frekuensi = Counter(zlib.crc32(kata.encode()) % DIMENSI_HASH for kata in token)
+    fitur = np.array(sorted(frekuensi), dtype=np.int32)
+    tf = 1 + np.log(np.array([frekuensi[f] for f in fitur.tolist()], dtype=np.float32))
+    return fitur, tf.astype(np.float32), tanda_wajib(token)
+
+# ==============================================================================
+# INDEKS KEMIRIPAN KOSINUS
+# ==============================================================================
+
+KEBIJAKAN_EVIKSI = ("lru", "fifo")
+
+# Ekor dibatasi kecil agar pemindaian linear di setiap pencarian tetap murah
+MAKS_POSTING_EKOR = 4096
+
+def cache_baru(maks_entri=100_000, ambang=0.9, kebijakan="lru"):
+    """Buat cache kosong. `kebijakan` menentukan entri yang dibuang saat penuh: lru atau fifo."""
+    if kebijakan not in KEBIJAKAN_EVIKSI:
+        raise ValueError(f"Kebijakan eviksi harus salah satu dari {KEBIJAKAN_EVIKSI}, bukan {kebijakan!r}")
+    return {
+        "lock": threading.Lock(),
+        "maks_entri": maks_entri,
+        "ambang": ambang,
+        "kebijakan": kebijakan,
+        # Posting terurut per fitur (bagian utama indeks); `tf` disimpan agar bobot
+        # bisa dihitung ulang saat IDF berubah, `nilai` adalah bobot TF-IDF ternormalisasi
+        "fitur": np.empty(0, dtype=np.int32),
+        "baris": np.empty(0, dtype=np.int32),
+        "tf": np.empty(0, dtype=np.float32),
+        "nilai": np.empty(0, dtype=np.float32),
+        # Posting baru yang belum digabung ke bagian terurut
+        "ekor_fitur": np.empty(0, dtype=np.int32),
+        "ekor_baris": np.empty(0, dtype=np.int32),
+        "ekor_tf": np.empty(0, dtype=np.float32),
+        "ekor_nilai": np.empty(0, dtype=np.float32),
+        # Jumlah entri yang memuat setiap fitur (untuk IDF). Entri yang dibuang baru
+        # dikurangkan saat penggabungan berikutnya.
+        "df": np.zeros(DIMENSI_HASH, dtype=np.int32),
+        # Data per baris; baris yang dibuang ditandai tidak aktif sampai penggabungan berikutnya.
+        # Array `aktif`/`terakhir`/`tanda` punya kapasitas cadangan dan hanya [:len(jawaban)] yang dipakai.
+        "jawaban": [],
+        "aktif": np.zeros(0, dtype=bool),
+        "terakhir": np.zeros(0),
+        "tanda": np.zeros(0, dtype=np.int64),
+        "jumlah_aktif": 0,
+        "hit": 0, "miss": 0,
+        "latensi": deque(maxlen=1000),
+    }
+
+def _bobot(cache, fitur, tf):
+    """Bobot TF-IDF ternormalisasi L2 untuk fitur prompt, dengan IDF dari isi cache saat ini."""
+    idf = np.log((1 + cache["jumlah_aktif"]) / (1 + cache["df"][fitur])) + 1
+    bobot = tf * idf
+    return (bobot / np.linalg.norm(bobot)).astype(np.float32)
+
+def _gabung(cache):
+    """Gabungkan posting ekor ke bagian terurut, buang posting/baris yang tidak aktif,
+    dan hitung ulang semua bobot dengan IDF terbaru."""
+    aktif = cache["aktif"][:len(cache["jawaban"])]
+    baris_baru = np.cumsum(aktif) - 1 # Nomor baris setelah baris tidak aktif dibuang
+    jumlah_baris = int(aktif.sum())
+
+    fitur = np.concatenate([cache["fitur"], cache["ekor_fitur"]])
+    baris = np.concatenate([cache["baris"], cache["ekor_baris"]])
+    tf = np.concatenate([cache["tf"], cache["ekor_tf"]])
+    tetap = aktif[baris]
+    fitur, baris, tf = fitur[tetap], baris_baru[baris[tetap]].astype(np.int32), tf[tetap]
+
+    df = np.bincount(fitur, minlength=DIMENSI_HASH).astype(np.int32)
+    bobot = tf * (np.log((1 + jumlah_baris) / (1 + df[fitur])) + 1)
+    norma = np.sqrt(np.bincount(baris, weights=bobot * bobot, minlength=jumlah_baris))
+    nilai = (bobot / norma[baris]).astype(np.float32)
+    # Bagian terurut + ekor pendek: sort stabil (timsort) mendekati linear untuk data seperti ini
+    urutan = np.argsort(fitur, kind="stable")
+
+    cache["fitur"], cache["baris"], cache["tf"], cache["nilai"] = fitur[urutan], baris[urutan], tf[urutan], nilai[urutan]
+    cache["ekor_fitur"], cache["ekor_baris"] = fitur[:0], baris[:0]
+    cache["ekor_tf"], cache["ekor_nilai"] = tf[:0], nilai[:0]
+    cache["df"] = df
+    cache["jawaban"] = [j for j, a in zip(cache["jawaban"], aktif) if a]
+    cache["terakhir"] = cache["terakhir"][:len(aktif)][aktif]
+    cache["tanda"] = cache["tanda"][:len(aktif)][aktif]
+    cache["aktif"] = np.ones(len(cache["jawaban"]), dtype=bool)
+
+def _skor(cache, fitur, bobot):
+    """Kemiripan kosinus prompt terhadap baris aktif yang berbagi minimal satu fitur.
+
+    Biayanya sebanding panjang daftar posting fitur prompt, bukan jumlah baris cache.
+    Mengembalikan (baris_kandidat, skor).
+    """
+    awal = np.searchsorted(cache["fitur"], fitur, side="left")
+    akhir = np.searchsorted(cache["fitur"], fitur, side="right")
+    posisi = np.concatenate([np.arange(a, b) for a, b in zip(awal, akhir)])
+    baris = [cache["baris"][posisi]]
+    nilai = [np.repeat(bobot, akhir - awal) * cache["nilai"][posisi]]
+
+    cocok = np.isin(cache["ekor_fitur"], fitur)
+    if cocok.any():
+        baris.append(cache["ekor_baris"][cocok])
+        nilai.append(bobot[np.searchsorted(fitur, cache["ekor_fitur"][cocok])] * cache["ekor_nilai"][cocok])
+
+    kandidat, indeks = np.unique(np.concatenate(baris), return_inverse=True)
+    skor = np.bincount(indeks, weights=np.concatenate(nilai), minlength=len(kandidat))
+    aktif = cache["aktif"][kandidat]
+    return kandidat[aktif], skor[aktif]
+
+def cari(cache, teks, ambang=None):
+    """Cari jawaban untuk prompt yang mirip. Mengembalikan (jawaban atau None, skor_tertinggi).
+
+    Hanya entri dengan kata penentu yang sama persis (lihat KATA_WAJIB_SAMA) yang dipertimbangkan.
+    """
+    mulai = time.perf_counter()
+    ambang = cache["ambang"] if ambang is None else ambang
+    fitur, tf, tanda = vektorkan(teks)
+    with cache["lock"]:
+        jawaban, skor_terbaik = None, 0.0
+        if cache["jumlah_aktif"] and len(fitur):
+            kandidat, skor = _skor(cache, fitur, _bobot(cache, fitur, tf))
+            sama = cache["tanda"][kandidat] == tanda
+            kandidat, skor = kandidat[sama], skor[sama]
+            if len(kandidat):
+                i = int(np.argmax(skor))
+                skor_terbaik = float(skor[i])
+                if skor_terbaik >= ambang:
+                    jawaban = cache["jawaban"][kandidat[i]]
+                    cache["terakhir"][kandidat[i]] = time.monotonic()
+        cache["hit" if jawaban is not None else "miss"] += 1
+        cache["latensi"].append(time.perf_counter() - mulai)
+    return jawaban, skor_terbaik
+
+def simpan(cache, teks, jawaban):
+    """Tambahkan pasangan prompt-jawaban; entri lama dibuang sesuai kebijakan jika cache penuh."""
+    fitur, tf, tanda = vektorkan(teks)
+    if not len(fitur):
+        return
+    with cache["lock"]:
+        jumlah_baris = len(cache["jawaban"])
+        while cache["jumlah_aktif"] >= cache["maks_entri"]:
+            aktif = cache["aktif"][:jumlah_baris]
+            if cache["kebijakan"] == "lru":
+                dibuang = int(np.argmin(np.where(aktif, cache["terakhir"][:jumlah_baris], np.inf)))
+            else:
+                dibuang = int(np.argmax(aktif)) # Baris aktif tertua (nomor baris terkecil)
+            cache["aktif"][dibuang] = False
+            cache["jawaban"][dibuang] = None
+            cache["jumlah_aktif"] -= 1
+
+        baris = jumlah_baris
+        if baris == len(cache["aktif"]):
+            # Kapasitas digandakan agar penambahan tetap O(1) rata-rata
+            kapasitas = max(1024, 2 * baris)
+            cache["aktif"] = np.concatenate([cache["aktif"], np.zeros(kapasitas - baris, dtype=bool)])
+            cache["terakhir"] = np.concatenate([cache["terakhir"], np.zeros(kapasitas - baris)])
+            cache["tanda"] = np.concatenate([cache["tanda"], np.zeros(kapasitas - baris, dtype=np.int64)])
+        cache["jawaban"].append(jawaban)
+        cache["aktif"][baris] = True
+        cache["terakhir"][baris] = time.monotonic()
+        cache["tanda"][baris] = tanda
+        cache["jumlah_aktif"] += 1
+        cache["df"][fitur] += 1
+        cache["ekor_fitur"] = np.concatenate([cache["ekor_fitur"], fitur])
+        cache["ekor_baris"] = np.concatenate([cache["ekor_baris"], np.full(len(fitur), baris, dtype=np.int32)])
+        cache["ekor_tf"] = np.concatenate([cache["ekor_tf"], tf])
+        cache["ekor_nilai"] = np.concatenate([cache["ekor_nilai"], _bobot(cache, fitur, tf)])
+
+        # Ekor digabung jika sudah penuh, atau jika terlalu banyak baris tidak aktif
+        tidak_aktif = len(cache["jawaban"]) - cache["jumlah_aktif"]
+        if len(cache["ekor_fitur"]) > MAKS_POSTING_EKOR or tidak_aktif > max(1024, cache["jumlah_aktif"] // 4):
+            _gabung(cache)
+
+def statistik(cache):
+    """Jumlah entri, hit, miss, rasio hit, serta latensi pencarian (ms) dari 1000 pencarian terakhir."""
+    with cache["lock"]:
+        latensi = sorted(cache["latensi"])
+        total = cache["hit"] + cache["miss"]
+        return {
+            "entri": cache["jumlah_aktif"],
+            "hit": cache["hit"],
+            "miss": cache["miss"],
+            "rasio_hit": cache["hit"] / total if total else 0.0,
+            "latensi_rata_ms": 1000 * sum(latensi) / len(latensi) if latensi else 0.0,
+            "latensi_p50_ms": 1000 * latensi[len(latensi) // 2] if latensi else 0.0,
+            "latensi_p95_ms": 1000 * latensi[int(len(latensi) * 0.95)] if latensi else 0.0,
+        }
+
+# ==============================================================================
+# EVALUASI DAN BENCHMARK
+# ==============================================================================
+
+def evaluasi(path, ambang=0.9):
+    """Uji ambang pada pasangan berlabel (JSONL: {"tersimpan", "pertanyaan", "label": "sama"|"beda"}).
+
+    Semua prompt "tersimpan" dimasukkan ke satu cache, lalu setiap "pertanyaan" dicari.
+    Kelas positif adalah hit: hit ke entri pasangannya pada label "sama" dihitung benar,
+    hit apa pun pada label "beda" dihitung salah (jawaban yang keliru dipakai ulang).
+    """
+    with open(path, encoding="utf-8") as f:
+        pasangan = [json.loads(baris) for baris in f if baris.strip()]
+    cache = cache_baru(maks_entri=max(1, len(pasangan)), ambang=ambang)
+    for teks in dict.fromkeys(p["tersimpan"] for p in pasangan):
+        simpan(cache, teks, teks)
+
+    tp = fp = fn = tn = 0
+    salah = []
+    for p in pasangan:
+        jawaban, skor = cari(cache, p["pertanyaan"])
+        if p["label"] == "sama":
+            benar = jawaban == p["tersimpan"]
+            tp += benar
+            fn += not benar
+        else:
+            benar = jawaban is None
+            tn += benar
+            fp += not benar
+        if not benar:
+            salah.append((p["label"], skor, p["pertanyaan"]))
+    return {
+        "jumlah": len(pasangan),
+        "tp": tp, "fp": fp, "fn": fn, "tn": tn,
+        "presisi": tp / (tp + fp) if tp + fp else 0.0,
+        "recall": tp / (tp + fn) if tp + fn else 0.0,
+        "salah": salah,
+    }
+
+def cetak_evaluasi(path, ambang):
+    for a in sorted({0.7, 0.8, 0.85, 0.9, 0.95, ambang}):
+        hasil = evaluasi(path, a)
+        tanda = " <-" if a == ambang else ""
+        print(f"Ambang {a:.2f}: presisi {hasil['presisi']:.3f}, recall {hasil['recall']:.3f}, "
+              f"hit salah {hasil['fp']}/{hasil['fp'] + hasil['tn']}{tanda}")
+    for label, skor, prompt in evaluasi(path, ambang)["salah"]:
+        print(f"  salah [{label}] {skor:.3f} {prompt}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cache semantik diagnosa dengan prompt sintetis.")
+    parser.add_argument("--jumlah", type=int, default=100_000, help="jumlah prompt yang dimasukkan ke cache")
+    parser.add_argument("--cari", type=int, default=2_000, help="jumlah pencarian yang diukur")
+    parser.add_argument("--ambang", type=float, default=0.9)
+    parser.add_argument("--kebijakan", choices=KEBIJAKAN_EVIKSI, default="lru")
+    parser.add_argument("--evaluasi", metavar="BERKAS", help="uji ambang pada pasangan prompt berlabel, bukan benchmark")
+    args = parser.parse_args()
+
+    if args.evaluasi:
+        cetak_evaluasi(args.evaluasi, args.ambang)
+        return
+
+    rng = np.random.default_rng(0)
+    kosakata = [f"kata{i}" for i in range(20_000)]
+    def prompt_acak():
+        return " ".join(kosakata[i] for i in rng.integers(0, len(kosakata), size=rng.integers(3, 10)))
+
+    cache = cache_baru(maks_entri=args.jumlah, ambang=args.ambang, kebijakan=args.kebijakan)
+    prompt = [prompt_acak() for _ in range(args.jumlah)]
+    mulai = time.perf_counter()
+    for i, p in enumerate(prompt):
+        simpan(cache, p, f"jawaban {i}")
+    waktu_simpan = time.perf_counter() - mulai
+
+    # Separuh pencarian memakai prompt yang sudah ada dengan urutan kata diacak (harus hit)
+    for i in range(args.cari):
+        if i % 2:
+            kata = prompt[rng.integers(len(prompt))].split()
+            rng.shuffle(kata)
+            cari(cache, " ".join(kata))
+        else:
+            cari(cache, prompt_acak())
+
+    hasil = statistik(cache)
+    print(f"Entri cache   : {hasil['entri']:,}")
+    print(f"Simpan        : {1e6 * waktu_simpan / args.jumlah:.1f} µs per prompt")
+    print(
+        f"Pencarian     : rata-rata {hasil['latensi_rata_ms']:.3f} ms, p50 {hasil['latensi_p50_ms']:.3f} ms, "
+        f"p95 {hasil['latensi_p95_ms']:.3f} ms"
+    )
+    print(f"Rasio hit     : {hasil['rasio_hit']:.1%} (seharusnya ±50%)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Filter topik lokal untuk chatbot diagnosa.
+
+Prompt yang jelas di luar topik kesehatan ditolak langsung tanpa memanggil Gemini.
+Pencocokan kata kunci memakai automaton Aho-Corasick (semua pola dicari dalam satu
+kali lintasan teks), lalu setiap kata yang cocok diberi bobot: positif untuk
+gejala/obat, negatif untuk topik lain. Prompt hanya ditolak jika skornya jelas
+negatif; yang ragu-ragu tetap diteruskan ke model.
+
+Evaluasi dengan berkas berlabel (satu JSON per baris: {"prompt": ..., "label": "kesehatan"|"lain"}):
+
+    python filter_topik.py contoh_prompt_topik.jsonl
+"""
+
+import argparse
+import json
+import re
+import statistics
+import time
+from collections import deque
+
+# ==============================================================================
+# LEKSIKON DAN BOBOT
+# ==============================================================================
+
+# Pola diakhiri "*" cocok sebagai awalan kata (demam -> demamnya), selain itu harus kata utuh.
+# Bobot positif menandakan topik kesehatan, negatif menandakan topik lain.
+LEKSIKON = {
+    # Gejala dan keluhan
+    "gejala*": 2.0, "sakit*": 2.0, "nyeri*": 2.0, "demam*": 2.0, "batuk*": 2.0, "pilek*": 2.0,
+    "flu": 2.0, "pusing*": 2.0, "mual*": 2.0, "muntah*": 2.0, "diare*": 2.0, "mencret*": 2.0,
+    "sembelit*": 2.0, "sesak*": 2.0, "gatal*": 2.0, "ruam*": 2.0, "bengkak*": 2.0, "lemas*": 1.5,
+    "pegal*": 1.5, "kram*": 1.5, "memar*": 1.5, "luka*": 1.5, "lecet*": 1.5, "meriang*": 2.0,
+    "menggigil*": 2.0, "masuk angin": 2.0, "keringat dingin": 2.0, "migrain*": 2.0, "vertigo*": 2.0,
+    "insomnia*": 2.0, "susah tidur": 2.0, "sulit tidur": 2.0, "kejang*": 2.0, "pingsan*": 2.0,
+    "keseleo*": 2.0, "sariawan*": 2.0, "jerawat*": 1.5, "bisul*": 2.0, "ketombe*": 1.0,
+    "mimisan*": 2.0, "kembung*": 1.5, "begah*": 1.5, "perih*": 1.5, "panas dalam": 2.0,
+    "radang*": 2.0, "infeksi*": 2.0, "alergi*": 2.0, "keputihan*": 2.0, "haid*": 1.5,
+    "menstruasi*": 1.5, "hamil*": 1.0,
+    # Penyakit
+    "penyakit*": 2.5, "maag*": 2.5, "asam urat": 2.5, "kolesterol*": 2.5, "hipertensi*": 2.5,
+    "darah tinggi": 2.5, "darah rendah": 2.5, "tekanan darah": 2.5, "diabetes*": 2.5,
+    "gula darah": 2.5, "kencing manis": 2.5, "asma*": 2.5, "anemia*": 2.5, "tifus*": 2.5,
+    "tipes*": 2.5, "dbd": 2.5, "demam berdarah": 2.5, "malaria*": 2.5, "tbc": 2.5, "covid*": 2.5,
+    "cacar*": 2.5, "campak*": 2.5, "wasir*": 2.5, "ambeien*": 2.5, "gerd": 2.5, "stroke*": 2.5,
+    "jantung*": 1.5, "ginjal*": 1.5, "paru*": 1.5, "lambung*": 1.5, "tenggorokan*": 1.5,
+    # Bagian tubuh (lemah: butuh kata lain untuk yakin)
+    "kepala*": 0.5, "perut*": 0.5, "dada*": 0.5, "kulit*": 0.5, "mata*": 0.5, "telinga*": 0.5,
+    "gigi*": 0.5, "tenggorok*": 0.5, "punggung*": 0.5, "sendi*": 0.5, "otot*": 0.5,
+    # Obat dan layanan kesehatan
+    "obat*": 3.0, "obat generik": 3.0, "dosis*": 3.0, "resep dokter": 3.0, "resep obat": 3.0,
+    "dokter*": 2.5, "apotek*": 2.5, "klinik*": 2.0, "puskesmas*": 2.5, "rumah sakit": 2.0,
+    "tablet*": 1.5, "kapsul*": 1.5, "salep*": 2.0, "vitamin*": 1.5, "suplemen*": 1.5,
+    "antibiotik*": 3.0, "antasida*": 3.0, "paracetamol*": 3.0, "parasetamol*": 3.0,
+    "ibuprofen*": 3.0, "amoksisilin*": 3.0, "amoxicillin*": 3.0, "cetirizine*": 3.0,
+    "loratadin*": 3.0, "oralit*": 3.0, "omeprazol*": 3.0, "ranitidin*": 3.0, "antihistamin*": 3.0,
+    "medis*": 2.0, "kesehatan": 2.0, "sehat*": 1.0, "diagnosa*": 2.0, "diagnosis*": 2.0,
+    # Topik lain
+    "presiden*": -2.0, "politik*": -2.0, "pemilu*": -2.0, "partai*": -2.0, "sepak bola": -2.0,
+    "pertandingan*": -2.0, "film*": -2.0, "drama*": -1.5, "lagu*": -2.0, "musik*": -2.0,
+    "penyanyi*": -2.0, "artis*": -1.5, "game*": -2.0, "coding*": -2.0, "python": -2.0,
+    "javascript": -2.0, "program komputer": -2.0, "matematika*": -2.0, "fisika*": -2.0,
+    "tugas sekolah": -2.0, "pekerjaan rumah": -2.0, "cuaca*": -2.0, "saham*": -2.0,
+    "investasi*": -2.0, "bitcoin*": -2.0, "kripto*": -2.0, "harga emas": -2.0, "zodiak*": -2.0,
+    "ramalan*": -2.0, "horoskop*": -2.0, "resep*": -1.0, "masak*": -2.0, "kue*": -1.0,
+    "kuliner*": -2.0, "wisata*": -2.0, "liburan*": -1.5, "hotel*": -2.0, "tiket*": -2.0,
+    "pesawat*": -1.5, "mobil*": -1.5, "motor*": -1.5, "laptop*": -2.0, "ponsel*": -2.0,
+    "hp": -1.5, "puisi*": -2.0, "pantun*": -2.0, "dongeng*": -2.0, "terjemahkan*": -2.0,
+    "translate*": -2.0, "ibukota*": -2.0, "ibu kota": -2.0, "sejarah*": -2.0, "pahlawan*": -2.0,
+    "pacar*": -2.0, "jodoh*": -2.0, "gombal*": -2.0, "lelucon*": -2.0, "jokes": -2.0,
+}
+
+# Skor di bawah atau sama dengan ambang ini dianggap jelas di luar topik
+AMBANG_TOLAK = -2.0
+
+PESAN_TOLAK = (
+    "Maaf, saya hanya dapat membantu pertanyaan seputar gejala penyakit dan obat generik. "
+    "Silakan ceritakan gejala yang Anda rasakan."
+)
+
+# ==============================================================================
+# AUTOMATON AHO-CORASICK
+# ==============================================================================
+
+def normalisasi(teks):
+    """Huruf kecil, selain huruf/angka menjadi spasi, diapit spasi agar batas kata ikut dicocokkan."""
+    return " " + " ".join(re.sub(r"[^0-9a-z]+", " ", teks.lower()).split()) + " "
+
+def pola_ke_teks(pola):
+    """Ubah pola leksikon menjadi string yang dicari: spasi di depan, dan di belakang jika kata utuh."""
+    return " " + pola[:-1] if pola.endswith("*") else " " + pola + " "
+
+def bangun_automaton(leksikon):
+    """Bangun automaton Aho-Corasick dari leksikon.
+
+    Mengembalikan (transisi, keluaran): transisi[s] adalah dict huruf -> state
+    (sudah termasuk lompatan gagal, jadi pencarian tidak perlu mundur), dan
+    keluaran[s] adalah daftar pola yang selesai di state s.
+    """
+    transisi, gagal, keluaran = [{}], [0], [[]]
+    for pola in leksikon:
+        state = 0
+        for huruf in pola_ke_teks(pola):
+            if huruf not in transisi[state]:
+                transisi.append({})
+                gagal.append(0)
+                keluaran.append([])
+                transisi[state][huruf] = len(transisi) - 1
+            state = transisi[state][huruf]
+        keluaran[state].append(pola)
+
+    # BFS per kedalaman: tautan gagal setiap state menunjuk akhiran terpanjangnya yang juga
+    # awalan suatu pola. State yang lebih dangkal sudah dilengkapi saat dipakai di sini.
+    antrean = deque(transisi[0].values())
+    while antrean:
+        state = antrean.popleft()
+        for huruf, anak in list(transisi[state].items()):
+            antrean.append(anak)
+            if state:
+                gagal[anak] = transisi[gagal[state]].get(huruf, transisi[0].get(huruf, 0))
+                keluaran[anak] = keluaran[anak] + keluaran[gagal[anak]]
+        # Lengkapi transisi dengan milik state gagal (transisi yang tidak ada kembali ke akar)
+        if state:
+            for huruf, tujuan in transisi[gagal[state]].items():
+                transisi[state].setdefault(huruf, tujuan)
+    return transisi, keluaran
+
+AUTOMATON = bangun_automaton(LEKSIKON)
+
+def cari_pola(teks, automaton=AUTOMATON):
+    """Semua pola leksikon yang muncul di teks, dalam satu kali lintasan."""
+    transisi, keluaran = automaton
+    state, cocok = 0, set()
+    for huruf in normalisasi(teks):
+        state = transisi[state].get(huruf, transisi[0].get(huruf, 0))
+        if keluaran[state]:
+            cocok.update(keluaran[state])
+    return cocok
+
+# ==============================================================================
+# SKOR DAN KEPUTUSAN
+# ==============================================================================
+
+def skor_topik(teks, automaton=AUTOMATON, leksikon=LEKSIKON):
+    """Jumlah bobot pola yang cocok (setiap pola dihitung sekali). Mengembalikan (skor, pola_cocok)."""
+    cocok = cari_pola(teks, automaton)
+    return sum(leksikon[pola] for pola in cocok), cocok
+
+def di_luar_topik(teks, ambang=AMBANG_TOLAK):
+    """True jika prompt jelas di luar topik kesehatan dan boleh ditolak tanpa memanggil model."""
+    return skor_topik(teks)[0] <= ambang
+
+# ==============================================================================
+# EVALUASI BATCH
+# ==============================================================================
+
+def evaluasi(path, ambang=AMBANG_TOLAK):
+    """Jalankan filter pada berkas JSONL berlabel; kelas positif adalah "lain" (prompt yang ditolak)."""
+    tp = fp = fn = tn = 0
+    latensi, salah = [], []
+    with open(path, encoding="utf-8") as f:
+        for baris in f:
+            if not baris.strip():
+                continue
+            data = json.loads(baris)
+            mulai = time.perf_counter_ns()
+            ditolak = di_luar_topik(data["prompt"], ambang)
+            latensi.append((time.perf_counter_ns() - mulai) / 1000)
+
+            benar_lain = data["label"] == "lain"
+            tp += ditolak and benar_lain
+            fp += ditolak and not benar_lain
+            fn += not ditolak and benar_lain
+            tn += not ditolak and not benar_lain
+            if ditolak != benar_lain:
+                salah.append((data["label"], data["prompt"]))
+
+    presisi = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    latensi.sort()
+    return {
+        "jumlah": len(latensi),
+        "tp": tp, "fp": fp, "fn": fn, "tn": tn,
+        "presisi": presisi,
+        "recall": recall,
+        "latensi_rata_us": statistics.fmean(latensi) if latensi else 0.0,
+        "latensi_p50_us": latensi[len(latensi) // 2] if latensi else 0.0,
+        "latensi_p95_us": latensi[min(len(latensi) - 1, int(len(latensi) * 0.95))] if latensi else 0.0,
+        "latensi_maks_us": latensi[-1] if latensi else 0.0,
+        "salah": salah,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluasi filter topik diagnosa pada berkas prompt berlabel.")
+    parser.add_argument("berkas", help="berkas JSONL: {\"prompt\": ..., \"label\": \"kesehatan\"|\"lain\"}")
+    parser.add_argument("--ambang", type=float, default=AMBANG_TOLAK, help="skor maksimal untuk menolak prompt")
+    args = parser.parse_args()
+
+    hasil = evaluasi(args.berkas, args.ambang)
+    print(f"Jumlah prompt : {hasil['jumlah']}")
+    print(f"Ditolak benar : {hasil['tp']}   Ditolak salah  : {hasil['fp']}")
+    print(f"Diteruskan    : {hasil['tn']} kesehatan, {hasil['fn']} topik lain")
+    print(f"Presisi tolak : {hasil['presisi']:.3f}")
+    print(f"Recall tolak  : {hasil['recall']:.3f}")
+    print(
+        f"Latensi (µs)  : rata-rata {hasil['latensi_rata_us']:.1f}, p50 {hasil['latensi_p50_us']:.1f}, "
+        f"p95 {hasil['latensi_p95_us']:.1f}, maks {hasil['latensi_maks_us']:.1f}"
+    )
+    for label, prompt in hasil["salah"]:
+        print(f"  salah [{label}] {prompt}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Uji pencarian cache semantik (cache_semantik.py): pytest diagnosa/test_cache_semantik.py"""
+
+import os
+
+import numpy as np
+import pytest
+
+import cache_semantik
+from cache_semantik import cache_baru, cari, evaluasi, simpan, statistik, vektorkan
+
+PATH_CONTOH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "contoh_prompt_mirip.jsonl")
+
+TERSIMPAN = [
+    "Obat apa untuk demam dan pusing?",
+    "Boleh minum ibuprofen untuk sakit kepala?",
+    "Berapa dosis paracetamol 500 mg untuk dewasa?",
+    "Kenapa perut saya kembung setelah makan?",
+    "Obat batuk berdahak yang aman untuk anak",
+    "Apakah sakit maag boleh minum kopi?",
+]
+
+
+@pytest.fixture
+def cache():
+    cache = cache_baru(maks_entri=100)
+    for teks in TERSIMPAN:
+        simpan(cache, teks, teks)
+    return cache
+
+
+@pytest.mark.parametrize("pertanyaan, tersimpan", [
+    ("obat apa untuk demam dan pusing", "Obat apa untuk demam dan pusing?"),
+    ("Obat untuk pusing dan demam apa ya?", "Obat apa untuk demam dan pusing?"),
+    ("boleh gak minum ibuprofen untuk sakit kepala", None),
+    ("Boleh minum ibuprofen buat sakit kepala dong", "Boleh minum ibuprofen untuk sakit kepala?"),
+    ("kenapa perutku kembung setelah makan", None),
+    ("Kenapa perut saya kembung setelah makan", "Kenapa perut saya kembung setelah makan?"),
+])
+def test_parafrase_memakai_jawaban_tersimpan(cache, pertanyaan, tersimpan):
+    jawaban, _ = cari(cache, pertanyaan)
+    if tersimpan is None:
+        # Negasi ("gak" -> "tidak") dan kata baru membuat pertanyaan berbeda: tidak boleh hit
+        assert jawaban is None
+    else:
+        assert jawaban == tersimpan
+
+
+@pytest.mark.parametrize("pertanyaan, kembaran", [
+    # Hampir sama kata-katanya dengan entri `kembaran`, tetapi kata penentunya berbeda
+    ("Saya hamil, boleh minum ibuprofen untuk sakit kepala?", 1),
+    ("Tidak boleh minum ibuprofen untuk sakit kepala?", 1),
+    ("Anak boleh minum ibuprofen untuk sakit kepala?", 1),
+    ("Boleh minum ibuprofen untuk sakit kepala kalau punya maag?", 1),
+    ("Berapa dosis paracetamol 250 mg untuk dewasa?", 2),
+    ("Berapa dosis paracetamol 500 mg untuk anak?", 2),
+    ("Obat batuk berdahak yang aman untuk bayi", 4),
+    ("Obat batuk berdahak yang aman untuk ibu menyusui anak", 4),
+    ("Apakah sakit maag tidak boleh minum kopi?", 5),
+])
+def test_kata_penentu_berbeda_tidak_hit(cache, pertanyaan, kembaran):
+    assert cari(cache, pertanyaan)[0] is None
+    # Berapa pun ambangnya, entri kembarannya tidak pernah jadi kandidat
+    assert cari(cache, pertanyaan, ambang=0.0)[0] != TERSIMPAN[kembaran]
+
+
+def test_kata_penentu_sama_tetap_bisa_hit(cache):
+    simpan(cache, "Saya hamil, boleh minum ibuprofen untuk sakit kepala?", "hamil")
+    assert cari(cache, "boleh minum ibuprofen untuk sakit kepala? saya hamil")[0] == "hamil"
+    assert cari(cache, "Boleh minum ibuprofen untuk sakit kepala?")[0] == TERSIMPAN[1]
+
+
+def test_ambang_menentukan_hit(cache):
+    pertanyaan = "obat untuk demam tinggi dan pusing"
+    jawaban, skor = cari(cache, pertanyaan, ambang=1.01)
+    assert jawaban is None and 0 < skor < 1
+    assert cari(cache, pertanyaan, ambang=skor)[0] == TERSIMPAN[0]
+
+
+def test_prompt_tanpa_kata_bermakna(cache):
+    assert cari(cache, "apa ya?") == (None, 0.0)
+    assert cari(cache_baru(), "demam") == (None, 0.0)
+
+
+def kosinus_naif(tersimpan, pertanyaan):
+    """Kosinus TF-IDF dihitung langsung dari semua prompt tersimpan, tanpa indeks."""
+    vektor = [vektorkan(teks) for teks in tersimpan]
+    df = {}
+    for fitur, _, _ in vektor:
+        for f in fitur.tolist():
+            df[f] = df.get(f, 0) + 1
+
+    def bobot(fitur, tf):
+        b = {f: t * (np.log((1 + len(tersimpan)) / (1 + df.get(f, 0))) + 1) for f, t in zip(fitur.tolist(), tf)}
+        norma = np.sqrt(sum(v * v for v in b.values()))
+        return {f: v / norma for f, v in b.items()}
+
+    q = bobot(*vektorkan(pertanyaan)[:2])
+    return [sum(q.get(f, 0.0) * v for f, v in bobot(fitur, tf).items()) for fitur, tf, _ in vektor]
+
+
+@pytest.mark.parametrize("pertanyaan", [
+    "obat untuk demam tinggi dan pusing",
+    "minum kopi saat sakit kepala",
+    "dosis obat batuk untuk dewasa",
+])
+def test_skor_sama_dengan_kosinus_naif_setelah_digabung(cache, pertanyaan):
+    cache_semantik._gabung(cache)
+    skor = kosinus_naif(TERSIMPAN, pertanyaan)
+    tanda = vektorkan(pertanyaan)[2]
+    kandidat = [i for i, teks in enumerate(TERSIMPAN) if vektorkan(teks)[2] == tanda and skor[i] > 0]
+    _, skor_cache = cari(cache, pertanyaan, ambang=1.01)
+    assert skor_cache == pytest.approx(max((skor[i] for i in kandidat), default=0.0), abs=1e-5)
+
+
+@pytest.mark.parametrize("kebijakan, dibuang", [("lru", 1), ("fifo", 0)])
+def test_eviksi(kebijakan, dibuang):
+    cache = cache_baru(maks_entri=2, kebijakan=kebijakan)
+    simpan(cache, TERSIMPAN[0], 0)
+    simpan(cache, TERSIMPAN[1], 1)
+    assert cari(cache, TERSIMPAN[0])[0] == 0 # Entri 0 baru dipakai
+    simpan(cache, TERSIMPAN[2], 2)
+    tersisa = {i for i in range(3) if cari(cache, TERSIMPAN[i])[0] == i}
+    assert tersisa == {0, 1, 2} - {dibuang}
+    assert statistik(cache)["entri"] == 2
+
+
+def test_kebijakan_tidak_dikenal():
+    with pytest.raises(ValueError):
+        cache_baru(kebijakan="acak")
+
+
+def test_banyak_entri_dan_penggabungan_tetap_konsisten():
+    # Cukup banyak posting agar ekor digabung dan baris yang dibuang dipadatkan beberapa kali
+    cache = cache_baru(maks_entri=500)
+    for i in range(2000):
+        simpan(cache, f"gejala nomor{i} pusing lemas kode{i % 700}", i)
+    assert statistik(cache)["entri"] == 500
+    for i in range(1500, 2000, 37):
+        assert cari(cache, f"gejala nomor{i} pusing lemas kode{i % 700}")[0] == i
+    assert cari(cache, "gejala nomor3 pusing lemas kode3")[0] is None
+
+
+def test_ambang_bawaan_tanpa_hit_salah_pada_pasangan_berlabel():
+    hasil = evaluasi(PATH_CONTOH, cache_baru()["ambang"])
+    assert hasil["fp"] == 0, hasil["salah"]
+    assert hasil["recall"] >= 0.9
@@ -0,0 +1,95 @@
+"""Uji automaton dan keputusan filter topik (filter_topik.py): pytest diagnosa/test_filter_topik.py"""
+
+import json
+import os
+import random
+
+import pytest
+
+from filter_topik import (
+    LEKSIKON, bangun_automaton, cari_pola, di_luar_topik, evaluasi, normalisasi, pola_ke_teks, skor_topik
+)
+
+PATH_CONTOH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "contoh_prompt_topik.jsonl")
+
+
+def cari_pola_naif(teks, leksikon=LEKSIKON):
+    """Pencocokan langsung per pola (tanpa automaton) sebagai pembanding."""
+    teks = normalisasi(teks)
+    return {pola for pola in leksikon if pola_ke_teks(pola) in teks}
+
+
+def contoh_prompt():
+    with open(PATH_CONTOH, encoding="utf-8") as f:
+        return [json.loads(baris)["prompt"] for baris in f if baris.strip()]
+
+
+def test_automaton_sama_dengan_pencarian_naif_pada_contoh():
+    for prompt in contoh_prompt():
+        assert cari_pola(prompt) == cari_pola_naif(prompt), prompt
+
+
+def test_automaton_sama_dengan_pencarian_naif_pada_teks_acak():
+    # Teks acak dari potongan pola (awalan, akhiran, gabungan) memaksa banyak lompatan gagal
+    rng = random.Random(0)
+    potongan = [p.rstrip("*") for p in LEKSIKON]
+    potongan += [p[:rng.randint(1, len(p))] for p in potongan] + ["an", "nya", "x", "1"]
+    for _ in range(2000):
+        teks = rng.choice([" ", ""]).join(rng.choices(potongan, k=rng.randint(1, 8)))
+        assert cari_pola(teks) == cari_pola_naif(teks), teks
+
+
+def test_pola_tumpang_tindih():
+    # "demam berdarah" dan "demam*" sama-sama cocok; "darah tinggi" di tengah pola lain juga
+    leksikon = {"demam*": 1.0, "demam berdarah": 1.0, "berdarah": 1.0, "darah tinggi": 1.0}
+    automaton = bangun_automaton(leksikon)
+    assert cari_pola("demam berdarah tinggi", automaton) == {"demam*", "demam berdarah", "berdarah"}
+    assert cari_pola("berdarah tinggi", automaton) == {"berdarah"}
+    assert cari_pola("darah tinggi", automaton) == {"darah tinggi"}
+
+
+@pytest.mark.parametrize("teks, pola, cocok", [
+    ("Demamnya naik turun", "demam*", True), # awalan kata
+    ("saya kena flu", "flu", True),
+    ("influenza", "flu", False), # kata utuh tidak cocok di tengah kata
+    ("fluktuasi harga", "flu", False),
+    ("tensi DARAH-TINGGI!", "darah tinggi", True), # tanda baca jadi spasi
+    ("hp saya rusak", "hp", True),
+    ("php", "hp", False),
+])
+def test_batas_kata(teks, pola, cocok):
+    assert (pola in cari_pola(teks)) == cocok
+
+
+def test_setiap_pola_dihitung_sekali():
+    skor, cocok = skor_topik("demam demam demam")
+    assert cocok == {"demam*"} and skor == LEKSIKON["demam*"]
+
+
+@pytest.mark.parametrize("prompt", [
+    "Siapa presiden pertama Indonesia?",
+    "Rekomendasi film drama korea terbaru",
+    "Buatkan puisi tentang pacar",
+])
+def test_jelas_di_luar_topik_ditolak(prompt):
+    assert di_luar_topik(prompt)
+
+
+@pytest.mark.parametrize("prompt", [
+    "Saya demam tinggi sejak kemarin, obat apa yang cocok?",
+    # Menyebut topik lain tetapi tetap soal kesehatan: tidak boleh ditolak
+    "Kepala pusing setelah main game semalaman",
+    "Resep obat untuk maag apa ya?",
+    "Sakit perut setelah makan kue",
+    # Tanpa kata kunci sama sekali: ragu-ragu, diteruskan ke model
+    "Halo, apa kabar?",
+    "",
+])
+def test_kesehatan_atau_ragu_diteruskan(prompt):
+    assert not di_luar_topik(prompt)
+
+
+def test_tidak_ada_prompt_kesehatan_yang_ditolak_pada_contoh():
+    hasil = evaluasi(PATH_CONTOH)
+    assert hasil["fp"] == 0, hasil["salah"]
+    assert hasil["recall"] >= 0.8
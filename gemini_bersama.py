@@ -0,0 +1,525 @@
+"""Eksekusi panggilan Gemini yang dipakai bersama oleh aplikasi chatbot (AhliKuliner, diagnosa, Zodiak).
+
+Berisi pembatas kuota, pool thread latar belakang dengan retry dan batas waktu, hedging
+opsional, penggabungan panggilan identik (single-flight), serta tampilan status tugas
+dan statistik di sidebar. Setiap aplikasi hanya menyiapkan fungsi `panggil(timeout, berhenti)`
+lalu menyerahkannya ke `kirim_tugas`:
+
+    import sys, os
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from gemini_bersama import kirim_tugas, pantau_tugas, tampilkan_statistik_gemini
+
+Semua pengaturan dibaca dari variabel lingkungan (GEMINI_BATAS_RPM, GEMINI_BATAS_TPM,
+GEMINI_KUOTA_PATH, GEMINI_HEDGING) agar sama di ketiga aplikasi.
+"""
+
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import CancelledError, ThreadPoolExecutor, as_completed, wait
+
+import streamlit as st
+from google.api_core import exceptions as google_exceptions
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+
+# ==============================================================================
+# PEMBATAS KUOTA GEMINI (DIBAGI SEMUA APLIKASI DI SATU MESIN)
+# ==============================================================================
+
+# Token bucket untuk permintaan/menit dan token/menit, agar satu kelas yang membuka aplikasi
+# bersamaan tidak langsung menghabiskan kuota API. Permintaan yang belum kebagian kuota
+# menunggu dalam antrean FIFO; jika perkiraan tunggunya melewati batas waktu giliran,
+# pengguna langsung diminta mencoba lagi nanti alih-alih menunggu lalu gagal.
+#
+# Ketiga chatbot memakai satu API key, jadi isi ember dan antreannya disimpan di berkas
+# GEMINI_KUOTA_PATH yang dikunci dengan flock: semua proses Streamlit di mesin yang sama
+# berbagi 15 RPM yang sama, bukan 15 RPM per aplikasi. Aplikasi di mesin berbeda tidak
+# berbagi berkas ini; untuk itu GEMINI_BATAS_RPM di setiap mesin harus dibagi manual.
+# Tanpa fcntl (Windows) ember hanya dibagi di dalam satu proses.
+BATAS_RPM = int(os.getenv("GEMINI_BATAS_RPM", "15"))
+BATAS_TPM = int(os.getenv("GEMINI_BATAS_TPM", "1000000"))
+PATH_KUOTA = os.getenv("GEMINI_KUOTA_PATH", os.path.join(tempfile.gettempdir(), "gemini_kuota.json"))
+TIKET_KEDALUWARSA = 10 # Detik; tiket antrean yang tidak diperbarui (proses mati) dibuang
+
+def kuota_awal():
+    return {
+        "permintaan": float(BATAS_RPM),
+        "token": float(BATAS_TPM),
+        "waktu": time.time(), # Waktu dinding, karena dibandingkan antar proses
+        "antrean": [], # [tiket, terakhir_diperbarui] yang menunggu, urut kedatangan
+        "dilayani": 0,
+        "total_tunggu": 0.0,
+    }
+
+@st.cache_resource # Satu kondisi untuk seluruh proses; isi ember ada di berkas bersama
+def init_pembatas():
+    return {"kondisi": threading.Condition(), "lokal": kuota_awal()}
+
+def isi_ulang_kuota(kuota):
+    """Tambah isi kedua ember sesuai waktu yang berlalu dan buang tiket yang kedaluwarsa."""
+    sekarang = time.time()
+    berlalu = max(0.0, sekarang - kuota["waktu"])
+    kuota["waktu"] = sekarang
+    kuota["permintaan"] = min(BATAS_RPM, kuota["permintaan"] + berlalu * BATAS_RPM / 60)
+    kuota["token"] = min(BATAS_TPM, kuota["token"] + berlalu * BATAS_TPM / 60)
+    kuota["antrean"] = [t for t in kuota["antrean"] if sekarang - t[1] < TIKET_KEDALUWARSA]
+
+@contextmanager
+def kunci_kuota(pembatas):
+    """Baca, isi ulang, dan (setelah blok selesai) tulis kembali ember kuota bersama.
+
+    Dipanggil saat kondisi proses dikunci. flock pada berkas .lock menjaga agar hanya satu
+    proses yang mengubah ember pada satu waktu; berkas ditulis ulang secara atomik.
+    """
+    if fcntl is None:
+        isi_ulang_kuota(pembatas["lokal"])
+        yield pembatas["lokal"]
+        return
+    with open(PATH_KUOTA + ".lock", "a") as kunci:
+        fcntl.flock(kunci, fcntl.LOCK_EX)
+        try:
+            try:
+                with open(PATH_KUOTA, encoding="utf-8") as f:
+                    kuota = json.load(f)
+            except (OSError, ValueError):
+                kuota = kuota_awal()
+            isi_ulang_kuota(kuota)
+            try:
+                yield kuota
+            finally:
+                sementara = f"{PATH_KUOTA}.{os.getpid()}.tmp"
+                with open(sementara, "w", encoding="utf-8") as f:
+                    json.dump(kuota, f)
+                os.replace(sementara, PATH_KUOTA)
+        finally:
+            fcntl.flock(kunci, fcntl.LOCK_UN)
+
+def detik_sampai_cukup(kuota, token):
+    """Berapa detik lagi kuota cukup untuk satu permintaan sebesar `token`."""
+    kurang_permintaan = max(0.0, 1 - kuota["permintaan"]) * 60 / BATAS_RPM
+    kurang_token = max(0.0, token - kuota["token"]) * 60 / BATAS_TPM
+    return max(kurang_permintaan, kurang_token)
+
+def ambil_kuota(panggilan):
+    """Tunggu giliran (FIFO) sampai kuota cukup untuk satu permintaan dari `panggilan`.
+
+    Hanya kepala antrean yang boleh mengambil kuota, sehingga permintaan besar tidak
+    terus disalip permintaan kecil. Posisi dan perkiraan tunggu ditulis ke `panggilan`
+    untuk ditampilkan. Setiap pemeriksaan memperbarui tiket di antrean bersama.
+    """
+    pembatas = init_pembatas()
+    token = min(panggilan["token"], BATAS_TPM)
+    mulai = time.monotonic()
+    tiket = uuid.uuid4().hex
+    dilayani = False
+    with pembatas["kondisi"]:
+        try:
+            while True:
+                with kunci_kuota(pembatas) as kuota:
+                    antrean = kuota["antrean"]
+                    posisi = next((i for i, (t, _) in enumerate(antrean) if t == tiket), None)
+                    if posisi is None:
+                        antrean.append([tiket, time.time()])
+                        posisi = len(antrean) - 1
+                    else:
+                        antrean[posisi][1] = time.time()
+                    tunggu = detik_sampai_cukup(kuota, token)
+                    if posisi == 0 and tunggu == 0:
+                        antrean.pop(0)
+                        kuota["permintaan"] -= 1
+                        kuota["token"] -= token
+                        kuota["dilayani"] += 1
+                        kuota["total_tunggu"] += time.monotonic() - mulai
+                        dilayani = True
+                        return
+                if panggilan["dibatalkan"].is_set():
+                    raise CancelledError()
+                # Setiap permintaan di depan butuh kira-kira satu jatah permintaan lagi
+                perkiraan = tunggu + posisi * 60 / BATAS_RPM
+                if time.monotonic() + perkiraan > panggilan["batas"]:
+                    raise RuntimeError(
+                        f"Gemini sedang ramai dipakai (antrean ke-{posisi + 1}, perkiraan tunggu "
+                        f"{perkiraan:.0f} detik). Silakan coba lagi sebentar lagi."
+                    )
+                panggilan["antrean"], panggilan["perkiraan_tunggu"] = posisi + 1, perkiraan
+                # Dibangunkan saat kepala antrean di proses ini berganti; timeout untuk memeriksa
+                # pembatalan dan perubahan dari proses lain
+                pembatas["kondisi"].wait(min(tunggu, INTERVAL_PANTAU) if posisi == 0 else INTERVAL_PANTAU)
+        finally:
+            panggilan["antrean"] = 0
+            if not dilayani:
+                with kunci_kuota(pembatas) as kuota:
+                    kuota["antrean"] = [t for t in kuota["antrean"] if t[0] != tiket]
+            pembatas["kondisi"].notify_all()
+
+def coba_ambil_kuota(token):
+    """Ambil kuota tanpa menunggu dan tanpa menyalip antrean (dipakai untuk hedge)."""
+    pembatas = init_pembatas()
+    token = min(token, BATAS_TPM)
+    with pembatas["kondisi"], kunci_kuota(pembatas) as kuota:
+        if kuota["antrean"] or detik_sampai_cukup(kuota, token) > 0:
+            return False
+        kuota["permintaan"] -= 1
+        kuota["token"] -= token
+        return True
+
+def kuota_habis():
+    """Server menolak karena kuota (429): kosongkan ember agar antrean menunggu isi ulang."""
+    pembatas = init_pembatas()
+    with pembatas["kondisi"], kunci_kuota(pembatas) as kuota:
+        kuota["permintaan"] = min(kuota["permintaan"], 0.0)
+
+# ==============================================================================
+# EKSEKUSI PANGGILAN GEMINI DI LATAR BELAKANG
+# ==============================================================================
+
+# Panggilan Gemini dijalankan di pool thread terbatas (dibagi semua sesi), bukan di
+# thread skrip Streamlit, sehingga jumlah thread yang tertahan menunggu API tidak
+# pernah melebihi MAKS_PEKERJA_GEMINI; permintaan berikutnya menunggu di antrean.
+MAKS_PEKERJA_GEMINI = 8
+BATAS_WAKTU_GILIRAN = 90 # Detik; anggaran total satu giliran (antrean + semua percobaan)
+TIMEOUT_PER_PERCOBAAN = 60
+MAKS_PERCOBAAN = 4
+JEDA_DASAR = 1.0 # Detik; jeda retry ke-n diacak antara 0 dan min(JEDA_MAKS, JEDA_DASAR * 2^(n-1))
+JEDA_MAKS = 8.0
+INTERVAL_PANTAU = 0.5 # Detik; seberapa sering tampilan memeriksa hasil panggilan
+
+# Hedging (opsional): jika percobaan belum menjawab setelah p95 latensi yang teramati,
+# kirim satu permintaan identik lagi dan pakai yang lebih dulu selesai. Jumlah hedge
+# dibatasi BUDGET_HEDGE dari seluruh panggilan agar beban tambahan ke API tetap kecil.
+#
+# Permintaan yang kalah TIDAK bisa dibatalkan: future.cancel() tidak menghentikan HTTP yang
+# sudah terkirim, dan panggilan non-stream tidak memeriksa `berhenti`. Yang kalah tetap
+# berjalan sampai selesai atau timeout, memakai token API, dan menahan satu thread pool
+# hedge. Karena itu setiap hedge mengambil jatah dari pembatas kuota (coba_ambil_kuota)
+# seperti permintaan biasa, dan hedge baru tidak dikirim selama pool hedge penuh.
+HEDGING_AKTIF = os.getenv("GEMINI_HEDGING", "0") == "1"
+BUDGET_HEDGE = 0.05
+MIN_SAMPEL_LATENSI = 20 # Hedge baru dipakai setelah p95 cukup bisa dipercaya
+JUMLAH_SAMPEL_LATENSI = 500
+
+# Error yang layak dicoba ulang: server sibuk/down, kuota per menit, atau jaringan putus
+ERROR_SEMENTARA = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.InternalServerError,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    ConnectionError,
+    TimeoutError,
+)
+
+@st.cache_resource # Satu pool untuk seluruh proses
+def init_pool_gemini():
+    return ThreadPoolExecutor(max_workers=MAKS_PEKERJA_GEMINI, thread_name_prefix="gemini")
+
+@st.cache_resource # Permintaan yang di-hedge berjalan di sini; pekerja pool utama menunggu hasilnya
+def init_pool_hedge():
+    return ThreadPoolExecutor(max_workers=2 * MAKS_PEKERJA_GEMINI, thread_name_prefix="gemini-hedge")
+
+# Panggilan yang sedang berjalan per kunci permintaan (single-flight). Cukup per proses:
+# kunci berisi seluruh isi permintaan termasuk konteks awal persona, sehingga permintaan
+# dari aplikasi yang berbeda tidak pernah identik.
+@st.cache_resource
+def init_panggilan_bersama():
+    return {"lock": threading.Lock(), "data": {}}
+
+@st.cache_resource # Latensi permintaan yang berhasil, dibagi semua sesi
+def init_statistik_latensi():
+    return {
+        "lock": threading.Lock(),
+        "sampel": deque(maxlen=JUMLAH_SAMPEL_LATENSI),
+        "panggilan": 0,
+        "hedge": 0,
+        "hedge_menang": 0,
+        "berjalan": 0, # Permintaan di pool hedge yang belum selesai, termasuk yang kalah
+    }
+
+def p95_latensi():
+    """p95 latensi dari sampel terakhir, atau None jika sampel belum cukup."""
+    statistik = init_statistik_latensi()
+    with statistik["lock"]:
+        if len(statistik["sampel"]) < MIN_SAMPEL_LATENSI:
+            return None
+        urut = sorted(statistik["sampel"])
+    return urut[int(0.95 * (len(urut) - 1))]
+
+def ambil_jatah_hedge(token):
+    """True (dan catat) jika hedge berikutnya masih dalam BUDGET_HEDGE, pool hedge punya thread
+    kosong, dan kuota API tersedia (hedge dihitung sebagai satu permintaan penuh)."""
+    statistik = init_statistik_latensi()
+    with statistik["lock"]:
+        if statistik["hedge"] + 1 > BUDGET_HEDGE * statistik["panggilan"]:
+            return False
+        # Hedge yang antre di belakang permintaan kalah yang masih berjalan tidak ada gunanya
+        if statistik["berjalan"] >= 2 * MAKS_PEKERJA_GEMINI or not coba_ambil_kuota(token):
+            return False
+        statistik["hedge"] += 1
+        return True
+
+def panggil_terukur(panggil, timeout, berhenti):
+    """Satu permintaan ke Gemini; latensinya dicatat jika permintaan selesai normal."""
+    mulai = time.monotonic()
+    hasil = panggil(timeout, berhenti)
+    statistik = init_statistik_latensi()
+    with statistik["lock"]:
+        statistik["sampel"].append(time.monotonic() - mulai)
+    return hasil
+
+def panggil_dengan_hedge(panggil, timeout, panggilan):
+    """Satu percobaan: `panggil(timeout, berhenti)`, ditambah hedge jika lebih lambat dari p95.
+
+    `berhenti` adalah Event milik setiap permintaan yang diset saat permintaan lain sudah
+    menang, agar permintaan yang kalah (misal stream) bisa berhenti lebih awal. Permintaan
+    non-stream yang kalah tetap berjalan di latar belakang sampai timeout-nya.
+    """
+    if not panggilan["hedge"]:
+        # Misal panggilan yang bisa dilayani cache: tidak di-hedge dan tidak ikut statistik
+        return panggil(timeout, threading.Event())
+    statistik = init_statistik_latensi()
+    with statistik["lock"]:
+        statistik["panggilan"] += 1
+    ambang = p95_latensi() if HEDGING_AKTIF else None
+    if ambang is None or ambang >= timeout:
+        return panggil_terukur(panggil, timeout, threading.Event())
+
+    batas = time.monotonic() + timeout
+    pool = init_pool_hedge()
+    permintaan = {}
+
+    def selesai_berjalan(_):
+        with statistik["lock"]:
+            statistik["berjalan"] -= 1
+
+    def kirim():
+        berhenti = threading.Event()
+        with statistik["lock"]:
+            statistik["berjalan"] += 1
+        future = pool.submit(panggil_terukur, panggil, batas - time.monotonic(), berhenti)
+        future.add_done_callback(selesai_berjalan)
+        permintaan[future] = berhenti
+
+    kirim()
+    pertama = next(iter(permintaan))
+    selesai, _ = wait(permintaan, timeout=ambang)
+    if not selesai and ambil_jatah_hedge(panggilan["token"]):
+        kirim()
+    try:
+        error = None
+        for future in as_completed(permintaan, timeout=max(0, batas - time.monotonic())):
+            try:
+                hasil = future.result()
+            except Exception as e:
+                error = e # Tunggu permintaan lain yang mungkin masih berhasil
+                continue
+            if future is not pertama:
+                with statistik["lock"]:
+                    statistik["hedge_menang"] += 1
+            return hasil
+        raise error
+    finally:
+        # Yang masih antre dibatalkan; yang sedang berjalan diberi tahu untuk berhenti
+        # (hanya stream yang menanggapinya, lihat catatan di HEDGING_AKTIF)
+        for future, berhenti in permintaan.items():
+            berhenti.set()
+            future.cancel()
+
+def jalankan_dengan_retry(panggil, panggilan):
+    """Dijalankan di pool: coba `panggil(timeout, berhenti)` dan ulangi error sementara dengan jeda acak.
+
+    Setiap percobaan menunggu kuota lebih dulu. Timeout setiap percobaan dipotong ke sisa
+    anggaran giliran, sehingga thread pool selalu lepas paling lambat saat batas waktu habis.
+    """
+    for percobaan in range(1, MAKS_PERCOBAAN + 1):
+        panggilan["percobaan"] = percobaan
+        ambil_kuota(panggilan)
+        if panggilan["dibatalkan"].is_set():
+            raise CancelledError()
+        sisa = panggilan["batas"] - time.monotonic()
+        if sisa <= 0:
+            raise TimeoutError(f"batas waktu {BATAS_WAKTU_GILIRAN} detik terlampaui")
+        try:
+            return panggil_dengan_hedge(panggil, min(TIMEOUT_PER_PERCOBAAN, sisa), panggilan)
+        except ERROR_SEMENTARA as e:
+            if isinstance(e, google_exceptions.TooManyRequests):
+                kuota_habis()
+            jeda = random.uniform(0, min(JEDA_MAKS, JEDA_DASAR * 2 ** (percobaan - 1)))
+            if percobaan == MAKS_PERCOBAAN or time.monotonic() + jeda >= panggilan["batas"]:
+                raise
+            # Menunggu event agar pembatalan langsung menghentikan jeda
+            if panggilan["dibatalkan"].wait(jeda):
+                raise CancelledError()
+
+def lepas_panggilan(kunci, panggilan):
+    """Hapus panggilan yang sudah selesai dari daftar single-flight."""
+    bersama = init_panggilan_bersama()
+    with bersama["lock"]:
+        if bersama["data"].get(kunci) is panggilan:
+            del bersama["data"][kunci]
+
+def kirim_tugas(panggil, token, kunci=None, hedge=True, bersama=None, **data):
+    """Kirim panggilan ke pool; kembalikan dict tugas yang disimpan di session_state.
+
+    `token` adalah perkiraan token satu permintaan (untuk pembatas kuota). Jika panggilan
+    dengan `kunci` yang sama masih berjalan, tidak ada permintaan baru: tugas ini ikut
+    menunggu hasil panggilan itu. `bersama` berisi data tambahan milik panggilan (misal
+    pratinjau stream) yang ikut dibagi ke semua tugas yang menunggunya.
+    """
+    sekarang = time.monotonic()
+    daftar = init_panggilan_bersama()
+    with daftar["lock"]:
+        panggilan = daftar["data"].get(kunci) if kunci is not None else None
+        baru = panggilan is None or panggilan["dibatalkan"].is_set()
+        if baru:
+            panggilan = {
+                "dibatalkan": threading.Event(),
+                "batas": sekarang + BATAS_WAKTU_GILIRAN,
+                "percobaan": 0,
+                "antrean": 0,
+                "perkiraan_tunggu": 0.0,
+                "token": token,
+                "hedge": hedge,
+                "pelanggan": 0,
+                **(bersama or {}),
+            }
+            panggilan["future"] = init_pool_gemini().submit(jalankan_dengan_retry, panggil, panggilan)
+            if kunci is not None:
+                daftar["data"][kunci] = panggilan
+        panggilan["pelanggan"] += 1
+    if baru and kunci is not None:
+        panggilan["future"].add_done_callback(lambda _: lepas_panggilan(kunci, panggilan))
+
+    return {
+        "dibatalkan": threading.Event(),
+        "mulai": sekarang,
+        "batas": sekarang + BATAS_WAKTU_GILIRAN,
+        "panggilan": panggilan,
+        "future": panggilan["future"],
+        **data,
+    }
+
+def batalkan_tugas(tugas):
+    """Batalkan tugas sesi ini; panggilan bersama baru dihentikan jika tidak ada lagi yang menunggu.
+
+    Panggilan yang masih antre tidak pernah jalan, yang sedang jalan hasilnya dibuang.
+    """
+    if tugas["dibatalkan"].is_set():
+        return
+    tugas["dibatalkan"].set()
+    panggilan = tugas["panggilan"]
+    with init_panggilan_bersama()["lock"]:
+        panggilan["pelanggan"] -= 1
+        if panggilan["pelanggan"] > 0:
+            return
+    panggilan["dibatalkan"].set()
+    panggilan["future"].cancel()
+
+def status_tugas(tugas):
+    """Keterangan singkat untuk tugas yang sedang berjalan."""
+    panggilan = tugas["panggilan"]
+    keterangan = f"{time.monotonic() - tugas['mulai']:.0f} detik"
+    if panggilan["percobaan"] == 0:
+        keterangan += " · menunggu pekerja"
+    elif panggilan["antrean"]:
+        keterangan += f" · antrean kuota ke-{panggilan['antrean']}, ±{panggilan['perkiraan_tunggu']:.0f} detik lagi"
+    elif panggilan["percobaan"] > 1:
+        keterangan += f" · percobaan ke-{panggilan['percobaan']}"
+    if panggilan["pelanggan"] > 1:
+        keterangan += f" · jawaban dibagi dengan {panggilan['pelanggan'] - 1} pengguna lain"
+    return keterangan
+
+def tampilkan_statistik_gemini():
+    """Ringkasan kuota, antrean, latensi, dan pemakaian hedge Gemini di sidebar."""
+    pembatas = init_pembatas()
+    with pembatas["kondisi"], kunci_kuota(pembatas) as kuota:
+        sisa_kuota, antre = int(kuota["permintaan"]), len(kuota["antrean"])
+        rata_tunggu = kuota["total_tunggu"] / kuota["dilayani"] if kuota["dilayani"] else 0.0
+    st.sidebar.caption(
+        f"🚦 Kuota Gemini: {max(sisa_kuota, 0)}/{BATAS_RPM} permintaan per menit · "
+        f"{antre} antre · rata-rata tunggu {rata_tunggu:.1f} detik"
+    )
+
+    statistik = init_statistik_latensi()
+    p95 = p95_latensi()
+    if p95 is None:
+        return
+    keterangan = f"⏱️ p95 latensi Gemini: {p95:.1f} detik"
+    if HEDGING_AKTIF:
+        keterangan += (
+            f" · hedge {statistik['hedge']}/{statistik['panggilan']} panggilan"
+            f" ({statistik['hedge_menang']} lebih cepat)"
+        )
+    st.sidebar.caption(keterangan)
+
+@st.fragment(run_every=INTERVAL_PANTAU)
+def pantau_tugas(pesan_tunggu):
+    """Tampilkan status tugas yang berjalan; rerun penuh saat selesai agar hasilnya dicatat.
+
+    Jika panggilan membawa `tampilan` (lewat `bersama` di kirim_tugas), teks di dalamnya
+    ditampilkan menggantikan `pesan_tunggu`.
+    """
+    tugas = st.session_state.get("tugas_gemini")
+    if tugas is None:
+        return
+    if tugas["future"].done() or time.monotonic() > tugas["batas"]:
+        st.rerun()
+    with st.chat_message("assistant"):
+        pratinjau = tugas["panggilan"].get("tampilan", {}).get("teks")
+        if pratinjau:
+            # Potongan balasan stream yang sudah diterima ditampilkan sambil menunggu sisanya
+            st.markdown(pratinjau)
+        else:
+            st.markdown(f"⏳ {pesan_tunggu}")
+        st.caption(status_tugas(tugas))
+        if st.button("Batalkan", key="batalkan_gemini"):
+            batalkan_tugas(tugas)
+            st.rerun()
+
+# ==============================================================================
+# RIWAYAT CHAT BERHALAMAN
+# ==============================================================================
+
+# Hanya sekitar PESAN_LANGSUNG pesan terakhir yang dirender sebagai bubble chat. Pesan yang lebih
+# lama dikelompokkan per UKURAN_BLOK_RIWAYAT pesan dan baru dirender jika bloknya dibuka,
+# sehingga biaya rerun tidak bertambah seiring panjang percakapan.
+PESAN_LANGSUNG = 20
+UKURAN_BLOK_RIWAYAT = 20
+
+def isi_pesan(message, kunci_isi):
+    """Teks satu pesan; format Gemini menyimpannya sebagai daftar `parts`."""
+    isi = message[kunci_isi]
+    return isi[0] if isinstance(isi, list) else isi
+
+def markdown_blok(messages, awal, label_peran, kunci_peran="role", kunci_isi="content"):
+    """Markdown gabungan satu blok riwayat lama, disimpan per sesi (pesan lama tidak berubah)."""
+    cache = st.session_state.setdefault("markdown_blok_riwayat", {})
+    if awal not in cache:
+        cache[awal] = "\n\n---\n\n".join(
+            f"{label_peran[m[kunci_peran]]}\n\n{isi_pesan(m, kunci_isi)}"
+            for m in messages[awal:awal + UKURAN_BLOK_RIWAYAT]
+        )
+    return cache[awal]
+
+def tampilkan_riwayat(messages, label_peran, kunci_peran="role", kunci_isi="content"):
+    """Render blok lama sebagai toggle (isinya dirender hanya saat dibuka), sisanya sebagai bubble chat.
+
+    `label_peran` memetakan nilai `kunci_peran` ke label di blok lama; selain "user" (misal
+    "model" di format Gemini) ditampilkan sebagai bubble "assistant".
+    """
+    batas_blok = max(0, len(messages) - PESAN_LANGSUNG) // UKURAN_BLOK_RIWAYAT * UKURAN_BLOK_RIWAYAT
+    for awal in range(0, batas_blok, UKURAN_BLOK_RIWAYAT):
+        if st.toggle(f"📜 Pesan {awal + 1}–{awal + UKURAN_BLOK_RIWAYAT}", key=f"blok_riwayat_{awal}"):
+            with st.container(border=True):
+                st.markdown(markdown_blok(messages, awal, label_peran, kunci_peran, kunci_isi))
+    for message in messages[batas_blok:]:
+        with st.chat_message("user" if message[kunci_peran] == "user" else "assistant"):
+            st.markdown(isi_pesan(message, kunci_isi))
@@ -0,0 +1,170 @@
+"""Server tiruan Gemini API (REST v1beta) untuk menguji chatbot tanpa kuota dan tanpa internet.
+
+Menjawab generateContent, streamGenerateContent, dan countTokens dengan teks buatan
+dan menyuntikkan latensi: sebagian besar permintaan mengikuti distribusi log-normal
+di sekitar --median, dan sebagian kecil (--peluang-ekor) sengaja lambat (--ekor)
+untuk meniru ekor p99 yang panjang. --peluang-gagal membalas 503 agar retry teruji.
+
+Jalankan server lalu arahkan aplikasi ke sana lewat variabel lingkungan:
+
+    python gemini_tiruan/server.py --port 8765 --median 0.8 --peluang-ekor 0.05 --ekor 8
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8765 GEMINI_HEDGING=1 streamlit run diagnosa/app.py
+
+Statistik permintaan (jumlah, rata-rata latensi yang disuntikkan) tersedia di GET /statistik.
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+POLA_PATH = re.compile(r"^/v1(?:beta)?/models/(?P<model>[^:/]+):(?P<metode>\w+)")
+FINISH_STOP = 1 # FinishReason.STOP (klien REST meminta enum sebagai angka)
+
+def teks_terakhir(isi):
+    """Teks bagian terakhir dari pesan user terakhir di body permintaan."""
+    for pesan in reversed(isi.get("contents", [])):
+        if pesan.get("role", "user") == "user":
+            for bagian in reversed(pesan.get("parts", [])):
+                if "text" in bagian:
+                    return bagian["text"]
+    return ""
+
+def hitung_token(teks):
+    """Perkiraan kasar yang sama dengan aplikasi: sekitar 4 karakter per token."""
+    return max(1, math.ceil(len(teks) / 4))
+
+def buat_jawaban(isi):
+    """Jawaban deterministik untuk prompt, supaya hasil uji bisa dibandingkan antar-run."""
+    prompt = teks_terakhir(isi)
+    return f"Jawaban tiruan untuk: {prompt}\n\n1. Poin pertama.\n2. Poin kedua.\n3. Poin ketiga."
+
+def respons_generate(teks, token_prompt, selesai=True):
+    respons = {
+        "candidates": [{"content": {"role": "model", "parts": [{"text": teks}]}, "index": 0}],
+        "usageMetadata": {
+            "promptTokenCount": token_prompt,
+            "candidatesTokenCount": hitung_token(teks),
+            "totalTokenCount": token_prompt + hitung_token(teks),
+        },
+    }
+    if selesai:
+        respons["candidates"][0]["finishReason"] = FINISH_STOP
+    return respons
+
+class PenanganGemini(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.opsi.verbose:
+            super().log_message(format, *args)
+
+    def kirim_json(self, status, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def latensi(self):
+        """Latensi yang disuntikkan untuk satu permintaan (detik)."""
+        opsi = self.server.opsi
+        if random.random() < opsi.peluang_ekor:
+            return opsi.ekor * random.uniform(0.8, 1.2)
+        return random.lognormvariate(math.log(opsi.median), opsi.sebaran)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/statistik":
+            with self.server.lock:
+                self.kirim_json(200, dict(self.server.statistik))
+        else:
+            self.kirim_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+
+    def do_POST(self):
+        cocok = POLA_PATH.match(self.path)
+        panjang = int(self.headers.get("Content-Length", 0))
+        isi = json.loads(self.rfile.read(panjang) or b"{}")
+        if cocok is None:
+            self.kirim_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+            return
+
+        metode = cocok["metode"]
+        token_prompt = hitung_token(json.dumps(isi.get("contents", [])))
+        if metode == "countTokens":
+            self.kirim_json(200, {"totalTokens": token_prompt})
+            return
+        if metode not in ("generateContent", "streamGenerateContent"):
+            self.kirim_json(400, {"error": {"code": 400, "message": f"Metode {metode} tidak didukung", "status": "INVALID_ARGUMENT"}})
+            return
+
+        tunda = self.latensi()
+        with self.server.lock:
+            statistik = self.server.statistik
+            statistik["permintaan"] += 1
+            statistik["total_latensi"] += tunda
+        if random.random() < self.server.opsi.peluang_gagal:
+            time.sleep(tunda / 4)
+            with self.server.lock:
+                self.server.statistik["gagal"] += 1
+            self.kirim_json(503, {"error": {"code": 503, "message": "Server tiruan sedang sibuk", "status": "UNAVAILABLE"}})
+            return
+
+        jawaban = buat_jawaban(isi)
+        if metode == "generateContent":
+            time.sleep(tunda)
+            self.kirim_json(200, respons_generate(jawaban, token_prompt))
+            return
+
+        # Stream: array JSON yang dikirim per potongan; latensi dibagi antara potongan pertama
+        # (waktu berpikir) dan potongan berikutnya
+        kata = jawaban.split(" ")
+        potongan = [" ".join(kata[i:i + 4]) + (" " if i + 4 < len(kata) else "") for i in range(0, len(kata), 4)]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        time.sleep(tunda / 2)
+        for i, teks in enumerate(potongan):
+            if i:
+                time.sleep(tunda / 2 / len(potongan))
+            data = ("[" if i == 0 else ",\r\n") + json.dumps(respons_generate(teks, token_prompt, i == len(potongan) - 1))
+            self.tulis_chunk(data.encode("utf-8"))
+        self.tulis_chunk(b"]")
+        self.tulis_chunk(b"")
+
+    def tulis_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description="Server tiruan Gemini API dengan latensi yang bisa diatur.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--median", type=float, default=0.8, help="median latensi normal (detik)")
+    parser.add_argument("--sebaran", type=float, default=0.3, help="sigma log-normal latensi normal")
+    parser.add_argument("--peluang-ekor", type=float, default=0.05, help="peluang permintaan sangat lambat")
+    parser.add_argument("--ekor", type=float, default=8.0, help="latensi permintaan lambat (detik)")
+    parser.add_argument("--peluang-gagal", type=float, default=0.0, help="peluang membalas 503")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true", help="cetak log setiap permintaan")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    server = ThreadingHTTPServer((args.host, args.port), PenanganGemini)
+    server.daemon_threads = True
+    server.opsi = args
+    server.lock = threading.Lock()
+    server.statistik = {"permintaan": 0, "gagal": 0, "total_latensi": 0.0}
+    print(f"Server tiruan Gemini berjalan di http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
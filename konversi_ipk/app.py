@@ -1,45 +1,341 @@
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
 import streamlit as st
 
-def tentukan_nilai(nilai):
-    """Fungsi untuk menentukan dan mengembalikan predikat nilai."""
-    
-    # Cek nilai tidak valid (di luar rentang 0-100)
-    if nilai > 100 or nilai < 0:
-        return "Nilai Anda **tidak valid** (di luar rentang 0-100)"
-    # Cek Nilai A (85-100)
-    elif nilai >= 85: 
-        return "Nilai Anda **A**"
-    # Cek Nilai B (70-84.99...)
-    elif nilai >= 70:
-        return "Nilai Anda **B**"
-    # Cek Nilai C (55-69.99...)
-    elif nilai >= 55:
-        return "Nilai Anda **C**"
-    # Cek Nilai D (40-54.99...)
-    elif nilai >= 40:
-        return "Nilai Anda **D**"
-    # Sisanya adalah Nilai E (0-39.99...)
+# Skala penilaian, pencarian ambang, dan sketsa kuantil (tanpa Streamlit, bisa diuji terpisah)
+from penilaian import (
+    KURVA_BAWAAN, SKALA_BAWAAN, SKALA_PENILAIAN, SKALA_TERKOMPILASI, indeks_ambang, indeks_predikat,
+    sketsa_baru, sketsa_gabung, sketsa_tambah, skala_kurva, tentukan_nilai,
+)
+
+# Jumlah baris yang diproses per potongan (chunk) pada mode massal
+UKURAN_CHUNK = 100_000
+
+# Berkas hasil unduhan ditulis ke berkas sementara; di atas ukuran ini (byte) isinya pindah ke disk
+UKURAN_SPOOL = 32 * 1024 * 1024
+
+# ==============================================================================
+# PEMBACAAN BERKAS & PEMROSESAN MASSAL
+# ==============================================================================
+
+def daftar_kolom(berkas):
+    """Fungsi untuk membaca nama kolom saja tanpa memuat isi berkas."""
+    berkas.seek(0)
+    if berkas.name.lower().endswith(".parquet"):
+        return pq.ParquetFile(berkas).schema_arrow.names
+    return list(pd.read_csv(berkas, nrows=0).columns)
+
+def tebak_kolom(kolom, kandidat):
+    """Fungsi untuk memilih indeks kolom yang namanya cocok dengan salah satu kandidat."""
+    kolom_kecil = [k.lower() for k in kolom]
+    for nama in kandidat:
+        if nama in kolom_kecil:
+            return kolom_kecil.index(nama)
+    return 0
+
+def baca_per_chunk(berkas, kolom=None):
+    """Generator yang membaca berkas CSV/Parquet potongan demi potongan."""
+    berkas.seek(0)
+    if berkas.name.lower().endswith(".parquet"):
+        for batch in pq.ParquetFile(berkas).iter_batches(batch_size=UKURAN_CHUNK, columns=kolom):
+            yield batch.to_pandas()
     else:
-        return "Nilai Anda **E**"
+        yield from pd.read_csv(berkas, chunksize=UKURAN_CHUNK, usecols=kolom)
+
+def beri_predikat(berkas, kolom_nilai, huruf, cari_indeks, keluaran=None, saat_chunk=None):
+    """Fungsi untuk memberi predikat seluruh baris per chunk dan menghitung rekap per huruf.
+
+    `cari_indeks(nilai)` memetakan array nilai ke indeks di `huruf`. Jika `keluaran`
+    diberikan, setiap chunk beserta kolom `predikat` langsung ditulis ke sana sebagai CSV;
+    tanpa `keluaran` hanya kolom nilai yang dibaca. `saat_chunk(rekap)` dipanggil setelah
+    setiap chunk untuk menampilkan distribusi sementara. Mengembalikan rekap jumlah per huruf.
+    """
+    jumlah = np.zeros(len(huruf), dtype=np.int64)
+    kolom = None if keluaran is not None else [kolom_nilai]
+
+    for nomor, chunk in enumerate(baca_per_chunk(berkas, kolom=kolom)):
+        nilai = pd.to_numeric(chunk[kolom_nilai], errors="coerce").to_numpy(dtype=float)
+        indeks = cari_indeks(nilai)
+        jumlah += np.bincount(indeks, minlength=len(huruf))
+        if keluaran is not None:
+            chunk["predikat"] = huruf[indeks]
+            chunk.to_csv(keluaran, index=False, header=(nomor == 0), encoding="utf-8")
+        if saat_chunk is not None:
+            saat_chunk(pd.Series(jumlah, index=huruf, name="Jumlah"))
+
+    return pd.Series(jumlah, index=huruf, name="Jumlah")
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def nilai_massal(id_berkas, _berkas, kolom_nilai, nama_skala=SKALA_BAWAAN):
+    """Fungsi untuk merekap predikat seluruh baris berkas.
+
+    Mengembalikan rekap jumlah per predikat dan jumlah baris; hasil per baris tidak
+    disimpan di cache (lihat unduhan_massal). `id_berkas` menjadi kunci cache agar
+    rerun tidak memproses ulang berkas yang sama.
+    """
+    huruf = SKALA_TERKOMPILASI[nama_skala]["huruf"]
+    rekap = beri_predikat(_berkas, kolom_nilai, huruf, lambda nilai: indeks_predikat(nilai, nama_skala))
+    return rekap, int(rekap.sum())
+
+def unduhan_massal(berkas, kolom_nilai, nama_skala):
+    """Isi unduhan mode massal, dibuat per chunk ke berkas sementara baru saat tombol unduh ditekan."""
+    huruf = SKALA_TERKOMPILASI[nama_skala]["huruf"]
+    keluaran = tempfile.SpooledTemporaryFile(max_size=UKURAN_SPOOL)
+    beri_predikat(berkas, kolom_nilai, huruf, lambda nilai: indeks_predikat(nilai, nama_skala), keluaran)
+    keluaran.seek(0)
+    return keluaran
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def hitung_ipk(id_berkas, _berkas, kolom_mahasiswa, kolom_sks, kolom_nilai, nama_skala=SKALA_BAWAAN):
+    """Fungsi untuk menghitung IPK setiap mahasiswa dari berkas transkrip.
+
+    IPK = sum(SKS x bobot) / sum(SKS), dihitung dengan groupby per chunk lalu
+    digabung sekali di akhir. Baris dengan nilai atau SKS tidak valid dilewati.
+    Mengembalikan tabel IPK dan jumlah baris yang dilewati.
+    """
+    bobot_skala = SKALA_TERKOMPILASI[nama_skala]["bobot"]
+    parsial = []
+    dilewati = 0
+
+    for chunk in baca_per_chunk(_berkas, kolom=[kolom_mahasiswa, kolom_sks, kolom_nilai]):
+        sks = pd.to_numeric(chunk[kolom_sks], errors="coerce").to_numpy(dtype=float)
+        nilai = pd.to_numeric(chunk[kolom_nilai], errors="coerce").to_numpy(dtype=float)
+        bobot = bobot_skala[indeks_predikat(nilai, nama_skala)]
+
+        valid = ~np.isnan(bobot) & (sks > 0)
+        dilewati += int((~valid).sum())
+
+        ringkas = pd.DataFrame({
+            "mahasiswa": chunk[kolom_mahasiswa].to_numpy()[valid],
+            "total_sks": sks[valid],
+            "total_mutu": sks[valid] * bobot[valid],
+            "jumlah_mk": np.ones(int(valid.sum()), dtype=np.int64),
+        })
+        parsial.append(ringkas.groupby("mahasiswa", sort=False).sum())
+
+    if not parsial:
+        return pd.DataFrame(columns=["jumlah_mk", "total_sks", "total_mutu", "ipk"]), dilewati
+
+    hasil = pd.concat(parsial).groupby(level=0).sum()
+    hasil["ipk"] = (hasil["total_mutu"] / hasil["total_sks"]).round(2)
+    return hasil[["jumlah_mk", "total_sks", "total_mutu", "ipk"]], dilewati
+
+# ==============================================================================
+# PENILAIAN RELATIF (KURVA) DENGAN SKETSA KUANTIL
+# ==============================================================================
+
+def bangun_sketsa(berkas, kolom_nilai, seed=0):
+    """Lintasan pertama: membangun sketsa dari seluruh nilai valid, satu sketsa per chunk lalu digabung."""
+    rng = np.random.default_rng(seed)
+    sketsa = sketsa_baru()
+    for chunk in baca_per_chunk(berkas, kolom=[kolom_nilai]):
+        nilai = pd.to_numeric(chunk[kolom_nilai], errors="coerce").to_numpy(dtype=float)
+        nilai = nilai[(nilai >= 0) & (nilai <= 100)]
+        sketsa = sketsa_gabung(sketsa, sketsa_tambah(sketsa_baru(), nilai, rng), rng)
+    return sketsa
+
+def nilai_kurva(berkas, kolom_nilai, skala, saat_chunk=None):
+    """Lintasan kedua: memberi huruf kurva pada setiap baris, ditulis per chunk ke berkas sementara.
+
+    `saat_chunk(rekap)` dipanggil setelah setiap chunk untuk menampilkan distribusi sementara.
+    Mengembalikan berkas hasil CSV (SpooledTemporaryFile) dan rekap jumlah per huruf.
+    """
+    keluaran = tempfile.SpooledTemporaryFile(max_size=UKURAN_SPOOL)
+    rekap = beri_predikat(
+        berkas, kolom_nilai, skala["huruf"], lambda nilai: indeks_ambang(nilai, skala), keluaran, saat_chunk
+    )
+    return keluaran, rekap
+
+def isi_berkas(berkas_hasil):
+    """Isi berkas hasil dari awal; dibaca baru saat tombol unduh ditekan."""
+    berkas_hasil.seek(0)
+    return berkas_hasil.read()
+
+# ==============================================================================
+# ANTARMUKA STREAMLIT
+# ==============================================================================
 
 # Judul Aplikasi
 st.title("Aplikasi Penentuan Predikat Nilai")
 
-# Input Pengguna menggunakan Textbox
-nilai_str = st.text_input("Masukkan nilai Anda (contoh: 85.5):", value="50.0")
-
-# Tombol untuk menjalankan fungsi
-if st.button("Tentukan Predikat"):
-    try:
-        # Konversi input string (dari textbox) ke float
-        nilai_input = float(nilai_str)
-        
-        # Panggil fungsi penentuan nilai
-        hasil = tentukan_nilai(nilai_input)
-        
-        # Tampilkan hasil
-        st.markdown(f"**Hasil:** {hasil}")
-        
-    except ValueError:
-        # Tangani jika input bukan angka
-        st.error("Input yang Anda masukkan **bukan angka**; Mohon masukkan nilai numerik yang valid;")
+nama_skala = st.selectbox("Skala penilaian:", list(SKALA_PENILAIAN.keys()))
+with st.expander("Lihat tabel skala"):
+    skala_terpilih = SKALA_PENILAIAN[nama_skala]
+    st.table(pd.DataFrame({
+        "Huruf": skala_terpilih["huruf"],
+        "Nilai minimum": [0] + list(skala_terpilih["batas"]),
+        "Bobot": skala_terpilih["bobot"],
+    }).iloc[::-1])
+
+tab_satuan, tab_massal, tab_ipk, tab_kurva = st.tabs(
+    ["Satu Nilai", "Massal (CSV/Parquet)", "IPK dari Transkrip", "Kurva (Relatif)"]
+)
+
+with tab_satuan:
+    # Input Pengguna menggunakan Textbox
+    nilai_str = st.text_input("Masukkan nilai Anda (contoh: 85.5):", value="50.0")
+
+    # Tombol untuk menjalankan fungsi
+    if st.button("Tentukan Predikat"):
+        try:
+            # Konversi input string (dari textbox) ke float
+            nilai_input = float(nilai_str)
+
+            # Panggil fungsi penentuan nilai
+            hasil = tentukan_nilai(nilai_input, nama_skala)
+
+            # Tampilkan hasil
+            st.markdown(f"**Hasil:** {hasil}")
+
+        except ValueError:
+            # Tangani jika input bukan angka
+            st.error("Input yang Anda masukkan **bukan angka**; Mohon masukkan nilai numerik yang valid;")
+
+with tab_massal:
+    st.write("Unggah berkas nilai satu angkatan; setiap baris akan diberi kolom `predikat`.")
+    berkas = st.file_uploader("Berkas nilai", type=["csv", "parquet"], key="berkas_massal")
+
+    if berkas is not None:
+        try:
+            kolom = daftar_kolom(berkas)
+        except Exception as e:
+            st.error(f"Berkas tidak dapat dibaca: {e}")
+            st.stop()
+
+        kolom_nilai = st.selectbox("Kolom yang berisi nilai:", kolom, index=tebak_kolom(kolom, ["nilai"]))
+
+        pilihan = (berkas.file_id, kolom_nilai, nama_skala)
+        if st.button("Proses Semua Nilai"):
+            st.session_state.pilihan_massal = pilihan
+
+        # Hasil tetap ditampilkan setelah rerun selama berkas, kolom, dan skala tidak berubah
+        if st.session_state.get("pilihan_massal") == pilihan:
+            with st.spinner("Memproses nilai..."):
+                try:
+                    rekap, total = nilai_massal(berkas.file_id, berkas, kolom_nilai, nama_skala)
+                except Exception as e:
+                    st.error(f"Gagal memproses berkas: {e}")
+                    st.stop()
+
+            st.success(f"**{total:,}** baris selesai diberi predikat.")
+            st.bar_chart(rekap)
+            st.download_button(
+                "⬇️ Unduh Hasil (CSV)",
+                data=lambda: unduhan_massal(berkas, kolom_nilai, nama_skala),
+                file_name=berkas.name.rsplit(".", 1)[0] + "_predikat.csv",
+                mime="text/csv",
+            )
+
+with tab_ipk:
+    st.write("Unggah transkrip berisi baris (mahasiswa, mata kuliah, SKS, nilai) untuk menghitung IPK setiap mahasiswa.")
+    transkrip = st.file_uploader("Berkas transkrip", type=["csv", "parquet"], key="berkas_transkrip")
+
+    if transkrip is not None:
+        try:
+            kolom = daftar_kolom(transkrip)
+        except Exception as e:
+            st.error(f"Berkas tidak dapat dibaca: {e}")
+            st.stop()
+
+        col1, col2, col3 = st.columns(3)
+        kolom_mahasiswa = col1.selectbox("Kolom mahasiswa:", kolom, index=tebak_kolom(kolom, ["nim", "mahasiswa", "nama"]))
+        kolom_sks = col2.selectbox("Kolom SKS:", kolom, index=tebak_kolom(kolom, ["sks", "kredit"]))
+        kolom_nilai_mk = col3.selectbox("Kolom nilai:", kolom, index=tebak_kolom(kolom, ["nilai", "skor"]))
+
+        pilihan = (transkrip.file_id, kolom_mahasiswa, kolom_sks, kolom_nilai_mk, nama_skala)
+        if st.button("Hitung IPK"):
+            st.session_state.pilihan_ipk = pilihan
+
+        if st.session_state.get("pilihan_ipk") == pilihan:
+            with st.spinner("Menghitung IPK..."):
+                try:
+                    tabel_ipk, dilewati = hitung_ipk(
+                        transkrip.file_id, transkrip, kolom_mahasiswa, kolom_sks, kolom_nilai_mk, nama_skala
+                    )
+                except Exception as e:
+                    st.error(f"Gagal menghitung IPK: {e}")
+                    st.stop()
+
+            st.success(f"IPK **{len(tabel_ipk):,}** mahasiswa berhasil dihitung.")
+            if dilewati:
+                st.warning(f"{dilewati:,} baris dilewati karena nilai atau SKS tidak valid.")
+            if len(tabel_ipk):
+                st.metric("Rata-rata IPK", f"{tabel_ipk['ipk'].mean():.2f}")
+            st.dataframe(tabel_ipk.head(1000))
+            st.download_button(
+                "⬇️ Unduh IPK (CSV)",
+                data=tabel_ipk.to_csv().encode("utf-8"),
+                file_name=transkrip.name.rsplit(".", 1)[0] + "_ipk.csv",
+                mime="text/csv",
+            )
+
+with tab_kurva:
+    st.write(
+        "Penilaian relatif: huruf ditentukan oleh peringkat dalam kelas, bukan batas tetap. "
+        "Berkas dibaca dua kali per chunk dan hasilnya ditulis ke berkas sementara, sehingga memori "
+        "tetap kecil walau berkas sangat besar."
+    )
+    berkas_kurva = st.file_uploader("Berkas nilai kelas", type=["csv", "parquet"], key="berkas_kurva")
+
+    st.caption("Persentase mahasiswa per huruf (dari huruf terbaik):")
+    kolom_persen = st.columns(len(KURVA_BAWAAN))
+    persentase = {
+        huruf: kolom_persen[i].number_input(f"{huruf} (%)", min_value=0.0, max_value=100.0, value=porsi, step=1.0)
+        for i, (huruf, porsi) in enumerate(KURVA_BAWAAN.items())
+    }
+    if abs(sum(persentase.values()) - 100) > 1e-9:
+        st.warning(f"Jumlah persentase {sum(persentase.values()):.1f}%, harus 100%.")
+
+    if berkas_kurva is not None:
+        try:
+            kolom = daftar_kolom(berkas_kurva)
+        except Exception as e:
+            st.error(f"Berkas tidak dapat dibaca: {e}")
+            st.stop()
+
+        kolom_nilai_kurva = st.selectbox(
+            "Kolom yang berisi nilai:", kolom, index=tebak_kolom(kolom, ["nilai"]), key="kolom_kurva"
+        )
+        pilihan = (berkas_kurva.file_id, kolom_nilai_kurva, tuple(persentase.values()))
+
+        if st.button("Nilai dengan Kurva", disabled=abs(sum(persentase.values()) - 100) > 1e-9):
+            try:
+                with st.spinner("Lintasan 1: membangun sketsa kuantil..."):
+                    sketsa = bangun_sketsa(berkas_kurva, kolom_nilai_kurva)
+                if sketsa["n"] == 0:
+                    st.error("Tidak ada nilai valid (0-100) di kolom yang dipilih.")
+                    st.stop()
+                skala = skala_kurva(sketsa, persentase)
+
+                st.caption("Lintasan 2: distribusi huruf sementara")
+                grafik_sementara = st.empty()
+                berkas_hasil, rekap = nilai_kurva(
+                    berkas_kurva, kolom_nilai_kurva, skala, saat_chunk=grafik_sementara.bar_chart
+                )
+                grafik_sementara.empty()
+            except Exception as e:
+                st.error(f"Gagal memproses berkas: {e}")
+                st.stop()
+            # Simpan berkas hasil agar rerun (misal saat tombol unduh ditekan) tidak memproses ulang;
+            # berkas sementara hasil sebelumnya langsung dihapus
+            if "hasil_kurva" in st.session_state:
+                st.session_state.hasil_kurva[2].close()
+            st.session_state.hasil_kurva = (pilihan, skala, berkas_hasil, rekap)
+
+        if st.session_state.get("hasil_kurva", (None,))[0] == pilihan:
+            _, skala, berkas_hasil, rekap = st.session_state.hasil_kurva
+            st.success(f"**{int(rekap.sum()):,}** baris selesai diberi huruf kurva.")
+            st.table(pd.DataFrame({
+                "Huruf": skala["huruf"][:-1],
+                "Nilai minimum": np.concatenate([[0.0], skala["batas"]]).round(2),
+            }).iloc[::-1])
+            st.bar_chart(rekap)
+            st.download_button(
+                "⬇️ Unduh Hasil (CSV)",
+                data=lambda: isi_berkas(berkas_hasil),
+                file_name=berkas_kurva.name.rsplit(".", 1)[0] + "_kurva.csv",
+                mime="text/csv",
+            )
@@ -0,0 +1,172 @@
+"""Penilaian untuk aplikasi konversi IPK: skala huruf per fakultas dan penilaian kurva.
+
+Nilai diberi huruf dengan satu pencarian ambang (np.searchsorted) per array. Penilaian
+kurva memakai sketsa kuantil gaya KLL sehingga ambang persentil berkas besar bisa
+diperkirakan per potongan dengan memori O(k).
+"""
+
+import numpy as np
+
+# ==============================================================================
+# SKALA PENILAIAN
+# ==============================================================================
+
+# Daftar skala penilaian per fakultas. "batas" adalah batas bawah tiap huruf
+# (terurut naik) untuk huruf[1:], huruf[0] berlaku di bawah batas terendah.
+# Tambahkan skala baru cukup dengan menambah entri di sini.
+SKALA_PENILAIAN = {
+    "Standar (A-E)": {
+        "batas": [40, 55, 70, 85],
+        "huruf": ["E", "D", "C", "B", "A"],
+        "bobot": [0.0, 1.0, 2.0, 3.0, 4.0],
+    },
+    "Setengah Poin (A/AB/B/BC...)": {
+        "batas": [40, 55, 60, 66, 73, 80],
+        "huruf": ["E", "D", "C", "BC", "B", "AB", "A"],
+        "bobot": [0.0, 1.0, 2.0, 2.5, 3.0, 3.5, 4.0],
+    },
+    "Plus/Minus (A, A-, B+...)": {
+        "batas": [40, 55, 60, 65, 70, 75, 80, 85],
+        "huruf": ["E", "D", "C", "C+", "B-", "B", "B+", "A-", "A"],
+        "bobot": [0.0, 1.0, 2.0, 2.3, 2.7, 3.0, 3.3, 3.7, 4.0],
+    },
+}
+SKALA_BAWAAN = "Standar (A-E)"
+
+def kompilasi_skala(definisi):
+    """Fungsi untuk mengubah definisi skala menjadi array ambang, huruf, dan bobot.
+
+    Satu entri tambahan di akhir array huruf/bobot dipakai untuk nilai tidak valid.
+    """
+    batas = np.asarray(definisi["batas"], dtype=float)
+    if len(definisi["huruf"]) != len(batas) + 1 or len(definisi["bobot"]) != len(batas) + 1:
+        raise ValueError("Jumlah huruf dan bobot harus satu lebih banyak dari jumlah batas.")
+    if np.any(np.diff(batas) <= 0):
+        raise ValueError("Batas nilai harus terurut naik.")
+    return {
+        "batas": batas,
+        "huruf": np.array(list(definisi["huruf"]) + ["Tidak Valid"]),
+        "bobot": np.array(list(definisi["bobot"]) + [np.nan], dtype=float),
+    }
+
+# Setiap skala dikompilasi sekali saat aplikasi dimuat
+SKALA_TERKOMPILASI = {nama: kompilasi_skala(definisi) for nama, definisi in SKALA_PENILAIAN.items()}
+
+# ==============================================================================
+# FUNGSI PENILAIAN
+# ==============================================================================
+
+def tentukan_nilai(nilai, nama_skala=SKALA_BAWAAN):
+    """Fungsi untuk menentukan dan mengembalikan predikat nilai."""
+
+    # Cek nilai tidak valid (di luar rentang 0-100)
+    if not 0 <= nilai <= 100:
+        return "Nilai Anda **tidak valid** (di luar rentang 0-100)"
+
+    skala = SKALA_TERKOMPILASI[nama_skala]
+    huruf = skala["huruf"][np.searchsorted(skala["batas"], nilai, side="right")]
+    return f"Nilai Anda **{huruf}**"
+
+def indeks_ambang(nilai, skala):
+    """Fungsi untuk menentukan indeks huruf seluruh nilai sekaligus (satu pencarian ambang).
+
+    `skala` adalah skala terkompilasi (lihat kompilasi_skala) atau skala kurva.
+    """
+    nilai = np.asarray(nilai, dtype=float)
+    indeks = np.searchsorted(skala["batas"], nilai, side="right")
+    # NaN (bukan angka) dan nilai di luar rentang 0-100 dianggap tidak valid
+    indeks[~((nilai >= 0) & (nilai <= 100))] = len(skala["huruf"]) - 1
+    return indeks
+
+def indeks_predikat(nilai, nama_skala=SKALA_BAWAAN):
+    """Fungsi untuk menentukan indeks predikat seluruh nilai menurut skala bernama."""
+    return indeks_ambang(nilai, SKALA_TERKOMPILASI[nama_skala])
+
+def tentukan_predikat_array(nilai, nama_skala=SKALA_BAWAAN):
+    """Versi vektor dari tentukan_nilai; mengembalikan array predikat."""
+    return SKALA_TERKOMPILASI[nama_skala]["huruf"][indeks_predikat(nilai, nama_skala)]
+
+# ==============================================================================
+# SKETSA KUANTIL (KLL) UNTUK PENILAIAN KURVA
+# ==============================================================================
+
+# Persentase mahasiswa per huruf pada penilaian kurva, dari huruf terbaik.
+# Huruf dan bobot mengikuti skala standar.
+KURVA_BAWAAN = {"A": 15.0, "B": 25.0, "C": 30.0, "D": 20.0, "E": 10.0}
+
+# Parameter k sketsa KLL: galat peringkat sekitar 1.7/k dengan memori O(k)
+KAPASITAS_SKETSA = 200
+
+def sketsa_baru(k=KAPASITAS_SKETSA):
+    """Fungsi untuk membuat sketsa kuantil (gaya KLL) kosong.
+
+    Sketsa berupa tumpukan level; item pada level h mewakili 2^h nilai asli.
+    """
+    return {"k": k, "n": 0, "level": [np.empty(0)]}
+
+def _kapasitas_level(sketsa, h):
+    """Kapasitas level h; level teratas berkapasitas k dan mengecil 2/3 per level ke bawah."""
+    tinggi = len(sketsa["level"])
+    return max(2, int(np.ceil(sketsa["k"] * (2 / 3) ** (tinggi - 1 - h))))
+
+def _padatkan(sketsa, rng):
+    """Fungsi untuk memadatkan level yang penuh: separuh item naik ke level berikutnya."""
+    h = 0
+    while h < len(sketsa["level"]):
+        level = sketsa["level"][h]
+        if len(level) > _kapasitas_level(sketsa, h):
+            if h + 1 == len(sketsa["level"]):
+                sketsa["level"].append(np.empty(0))
+            level = np.sort(level)
+            # Jika jumlah item ganjil, satu item tetap tinggal di level ini
+            tinggal = level[:len(level) % 2]
+            naik = level[len(tinggal):][rng.integers(2)::2]
+            sketsa["level"][h] = tinggal
+            sketsa["level"][h + 1] = np.concatenate([sketsa["level"][h + 1], naik])
+        h += 1
+    return sketsa
+
+def sketsa_tambah(sketsa, nilai, rng):
+    """Fungsi untuk menambahkan array nilai ke sketsa."""
+    nilai = np.asarray(nilai, dtype=float)
+    sketsa["level"][0] = np.concatenate([sketsa["level"][0], nilai])
+    sketsa["n"] += len(nilai)
+    return _padatkan(sketsa, rng)
+
+def sketsa_gabung(a, b, rng):
+    """Fungsi untuk menggabungkan dua sketsa (misal dari dua potongan berkas) menjadi satu."""
+    gabungan = sketsa_baru(max(a["k"], b["k"]))
+    tinggi = max(len(a["level"]), len(b["level"]))
+    gabungan["level"] = [
+        np.concatenate([s["level"][h] for s in (a, b) if h < len(s["level"])]) for h in range(tinggi)
+    ]
+    gabungan["n"] = a["n"] + b["n"]
+    return _padatkan(gabungan, rng)
+
+def sketsa_kuantil(sketsa, q):
+    """Fungsi untuk memperkirakan kuantil q (0-1, boleh berupa array) dari sketsa."""
+    item = np.concatenate(sketsa["level"])
+    bobot = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(sketsa["level"])])
+    urutan = np.argsort(item)
+    kumulatif = np.cumsum(bobot[urutan])
+    posisi = np.searchsorted(kumulatif, np.asarray(q) * kumulatif[-1], side="left")
+    return item[urutan][np.minimum(posisi, len(item) - 1)]
+
+def skala_kurva(sketsa, persentase):
+    """Fungsi untuk membuat skala dari persentase per huruf dan kuantil sketsa.
+
+    `persentase` berurutan dari huruf terbaik; ambang tiap huruf adalah kuantil
+    kumulatif dari bawah (misal E 10%, D 30%, C 60%, B 85%).
+    """
+    huruf = list(persentase.keys())[::-1]
+    porsi = np.array(list(persentase.values())[::-1], dtype=float)
+    q = np.cumsum(porsi)[:-1] / porsi.sum()
+    # Ambang dipaksa tidak turun agar searchsorted tetap valid ketika banyak nilai kembar
+    batas = np.maximum.accumulate(sketsa_kuantil(sketsa, q))
+    standar = SKALA_PENILAIAN[SKALA_BAWAAN]
+    bobot_huruf = dict(zip(standar["huruf"], standar["bobot"]))
+    return {
+        "batas": batas,
+        "huruf": np.array(huruf + ["Tidak Valid"]),
+        "bobot": np.array([bobot_huruf.get(h, np.nan) for h in huruf] + [np.nan]),
+    }
@@ -0,0 +1,143 @@
+"""Uji skala huruf dan sketsa kuantil (penilaian.py): pytest konversi_ipk/test_penilaian.py"""
+
+import numpy as np
+import pytest
+
+from penilaian import (
+    KAPASITAS_SKETSA, KURVA_BAWAAN, SKALA_PENILAIAN, SKALA_TERKOMPILASI, indeks_ambang, kompilasi_skala,
+    sketsa_baru, sketsa_gabung, sketsa_kuantil, sketsa_tambah, skala_kurva, tentukan_nilai,
+    tentukan_predikat_array,
+)
+
+
+@pytest.mark.parametrize("nama_skala", list(SKALA_PENILAIAN))
+def test_skala_terkompilasi(nama_skala):
+    definisi, skala = SKALA_PENILAIAN[nama_skala], SKALA_TERKOMPILASI[nama_skala]
+    # Satu huruf/bobot lebih banyak dari batas, ditambah satu entri "Tidak Valid"
+    assert len(skala["huruf"]) == len(skala["bobot"]) == len(skala["batas"]) + 2
+    assert skala["huruf"].tolist() == definisi["huruf"] + ["Tidak Valid"]
+    assert np.isnan(skala["bobot"][-1])
+    assert np.all(np.diff(skala["batas"]) > 0)
+    assert np.all(np.diff(skala["bobot"][:-1]) > 0)
+
+
+@pytest.mark.parametrize("definisi", [
+    {"batas": [40, 55], "huruf": ["E", "D"], "bobot": [0, 1]},
+    {"batas": [55, 40], "huruf": ["E", "D", "C"], "bobot": [0, 1, 2]},
+    {"batas": [40, 40], "huruf": ["E", "D", "C"], "bobot": [0, 1, 2]},
+])
+def test_skala_tidak_valid_ditolak(definisi):
+    with pytest.raises(ValueError):
+        kompilasi_skala(definisi)
+
+
+def huruf_naif(nilai, definisi):
+    """Huruf dengan perulangan biasa atas batas bawah (pembanding searchsorted)."""
+    if not 0 <= nilai <= 100:
+        return "Tidak Valid"
+    huruf = definisi["huruf"][0]
+    for batas, h in zip(definisi["batas"], definisi["huruf"][1:]):
+        if nilai >= batas:
+            huruf = h
+    return huruf
+
+
+@pytest.mark.parametrize("nama_skala", list(SKALA_PENILAIAN))
+def test_searchsorted_sama_dengan_perulangan(nama_skala):
+    definisi = SKALA_PENILAIAN[nama_skala]
+    # Semua batas, tepat di sekitarnya, ujung rentang, dan nilai acak
+    nilai = np.concatenate([
+        np.array(definisi["batas"], dtype=float)[:, None] + [-1e-9, 0, 1e-9],
+        [[-0.1, 0, 100, 100.1, 150]],
+        np.random.default_rng(0).uniform(-10, 110, (1000, 1)),
+    ], axis=None)
+    hasil = tentukan_predikat_array(nilai, nama_skala)
+    assert hasil.tolist() == [huruf_naif(x, definisi) for x in nilai]
+
+
+@pytest.mark.parametrize("nilai, huruf", [(85, "A"), (84.99, "B"), (70, "B"), (40, "D"), (39.9, "E"), (0, "E")])
+def test_tentukan_nilai_satuan(nilai, huruf):
+    assert tentukan_nilai(nilai) == f"Nilai Anda **{huruf}**"
+
+
+@pytest.mark.parametrize("nilai", [-1, 100.5])
+def test_tentukan_nilai_di_luar_rentang(nilai):
+    assert "tidak valid" in tentukan_nilai(nilai)
+
+
+def test_nan_tidak_valid():
+    skala = SKALA_TERKOMPILASI["Standar (A-E)"]
+    indeks = indeks_ambang([np.nan, 50], skala)
+    assert skala["huruf"][indeks].tolist() == ["Tidak Valid", "D"]
+    assert np.isnan(skala["bobot"][indeks[0]])
+
+
+def galat_peringkat(sketsa, data, q):
+    """Selisih peringkat (0-1) antara kuantil sketsa dan kuantil eksak data."""
+    urut = np.sort(data)
+    perkiraan = sketsa_kuantil(sketsa, q)
+    return np.abs(np.searchsorted(urut, perkiraan, side="left") / len(urut) - q)
+
+
+@pytest.mark.parametrize("sebaran", ["seragam", "normal", "kembar"])
+def test_sketsa_kuantil_dalam_batas_galat(sebaran):
+    rng = np.random.default_rng(1)
+    data = {
+        "seragam": lambda: rng.uniform(0, 100, 200_000),
+        "normal": lambda: np.clip(rng.normal(65, 12, 200_000), 0, 100),
+        "kembar": lambda: rng.integers(0, 101, 200_000).astype(float),
+    }[sebaran]()
+    sketsa = sketsa_tambah(sketsa_baru(), data, rng)
+    q = np.linspace(0.05, 0.95, 19)
+    batas = 4 / KAPASITAS_SKETSA
+    if sebaran == "kembar":
+        # Nilai bulat: kuantil dibandingkan dengan rentang peringkat nilai yang kembar
+        urut = np.sort(data)
+        perkiraan = sketsa_kuantil(sketsa, q)
+        bawah = np.searchsorted(urut, perkiraan, side="left") / len(urut)
+        atas = np.searchsorted(urut, perkiraan, side="right") / len(urut)
+        assert np.all((bawah - batas <= q) & (q <= atas + batas))
+    else:
+        assert galat_peringkat(sketsa, data, q).max() < batas
+    assert sketsa["n"] == len(data)
+    # Memori tetap kecil dibanding jumlah data
+    assert sum(len(level) for level in sketsa["level"]) < 10 * KAPASITAS_SKETSA
+
+
+def test_sketsa_gabungan_per_potongan():
+    rng = np.random.default_rng(2)
+    data = rng.uniform(0, 100, 300_000)
+    sketsa = sketsa_baru()
+    for potongan in np.array_split(data, 37):
+        sketsa = sketsa_gabung(sketsa, sketsa_tambah(sketsa_baru(), potongan, rng), rng)
+    assert sketsa["n"] == len(data)
+    q = np.linspace(0.05, 0.95, 19)
+    assert galat_peringkat(sketsa, data, q).max() < 4 / KAPASITAS_SKETSA
+
+
+def test_sketsa_kecil_eksak():
+    rng = np.random.default_rng(3)
+    sketsa = sketsa_tambah(sketsa_baru(), np.arange(1, 101, dtype=float), rng)
+    # Belum ada pemadatan: kuantil sama dengan data asli
+    assert sketsa_kuantil(sketsa, 0.5) == 50
+    assert sketsa_kuantil(sketsa, 1.0) == 100
+
+
+def test_skala_kurva_mengikuti_persentase():
+    rng = np.random.default_rng(4)
+    data = rng.uniform(0, 100, 100_000)
+    skala = skala_kurva(sketsa_tambah(sketsa_baru(), data, rng), KURVA_BAWAAN)
+    assert skala["huruf"].tolist() == ["E", "D", "C", "B", "A", "Tidak Valid"]
+    assert np.all(np.diff(skala["batas"]) >= 0)
+    porsi = np.bincount(indeks_ambang(data, skala), minlength=len(skala["huruf"])) / len(data)
+    harapan = np.array([KURVA_BAWAAN[h] for h in "EDCBA"]) / 100
+    assert np.abs(porsi[:5] - harapan).max() < 0.02
+    assert skala["bobot"][:5].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+def test_skala_kurva_nilai_kembar_tetap_terurut():
+    rng = np.random.default_rng(5)
+    # Separuh mahasiswa mendapat nilai yang sama: ambang tidak boleh turun
+    data = np.concatenate([np.full(5_000, 70.0), rng.uniform(0, 100, 5_000)])
+    skala = skala_kurva(sketsa_tambah(sketsa_baru(), data, rng), KURVA_BAWAAN)
+    assert np.all(np.diff(skala["batas"]) >= 0)
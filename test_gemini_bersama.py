@@ -0,0 +1,310 @@
+"""Uji eksekusi panggilan Gemini bersama (gemini_bersama.py): pytest test_gemini_bersama.py"""
+
+import threading
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+import gemini_bersama
+from gemini_bersama import (
+    ambil_kuota, batalkan_tugas, coba_ambil_kuota, init_panggilan_bersama, init_pembatas, init_pool_gemini,
+    init_pool_hedge, init_statistik_latensi, jalankan_dengan_retry, kirim_tugas, kunci_kuota, panggil_dengan_hedge,
+)
+
+
+@pytest.fixture(autouse=True)
+def gemini_terpisah(monkeypatch, tmp_path):
+    # Setiap uji memakai ember kuota, pool, dan statistik sendiri
+    monkeypatch.setattr(gemini_bersama, "PATH_KUOTA", str(tmp_path / "kuota.json"))
+    monkeypatch.setattr(gemini_bersama, "INTERVAL_PANTAU", 0.01)
+    for init in (init_pembatas, init_pool_gemini, init_pool_hedge, init_panggilan_bersama, init_statistik_latensi):
+        init.clear()
+
+
+def panggilan_baru(token=1, detik=10.0, hedge=False):
+    """Data panggilan seperti yang dibuat kirim_tugas, dengan batas `detik` dari sekarang."""
+    return {
+        "dibatalkan": threading.Event(),
+        "batas": time.monotonic() + detik,
+        "percobaan": 0,
+        "antrean": 0,
+        "perkiraan_tunggu": 0.0,
+        "token": token,
+        "hedge": hedge,
+        "pelanggan": 0,
+    }
+
+
+def kosongkan_kuota(**isi):
+    """Atur isi ember bersama, misal permintaan=0 agar permintaan berikutnya harus menunggu."""
+    with kunci_kuota(init_pembatas()) as kuota:
+        kuota.update(isi)
+
+
+def antrean_bersama():
+    with kunci_kuota(init_pembatas()) as kuota:
+        return [tiket for tiket, _ in kuota["antrean"]]
+
+
+def test_ditolak_jika_tunggu_melewati_batas_giliran(monkeypatch):
+    monkeypatch.setattr(gemini_bersama, "BATAS_RPM", 60) # Satu permintaan per detik
+    kosongkan_kuota(permintaan=0.0)
+    mulai = time.monotonic()
+    with pytest.raises(RuntimeError, match="ramai"):
+        ambil_kuota(panggilan_baru(detik=0.3))
+    # Langsung ditolak alih-alih menunggu lalu gagal, dan tiketnya tidak tertinggal di antrean
+    assert time.monotonic() - mulai < 0.2
+    assert antrean_bersama() == []
+
+
+def test_batas_giliran_habis_tidak_memanggil_gemini():
+    dipanggil = []
+    with pytest.raises(TimeoutError):
+        jalankan_dengan_retry(lambda timeout, berhenti: dipanggil.append(timeout), panggilan_baru(detik=-1))
+    assert dipanggil == []
+
+
+def test_timeout_percobaan_dipotong_ke_sisa_giliran():
+    timeout = []
+    jalankan_dengan_retry(lambda t, berhenti: timeout.append(t), panggilan_baru(detik=5))
+    assert 0 < timeout[0] <= 5 < gemini_bersama.TIMEOUT_PER_PERCOBAAN
+
+
+def test_retry_berhenti_di_batas_giliran(monkeypatch):
+    # Jeda retry berikutnya melewati batas giliran: error terakhir diteruskan tanpa menunggu
+    monkeypatch.setattr(gemini_bersama.random, "uniform", lambda a, b: b)
+    monkeypatch.setattr(gemini_bersama, "JEDA_DASAR", 5.0)
+    dipanggil = []
+
+    def panggil(timeout, berhenti):
+        dipanggil.append(timeout)
+        raise google_exceptions.ServiceUnavailable("sibuk")
+
+    mulai = time.monotonic()
+    with pytest.raises(google_exceptions.ServiceUnavailable):
+        jalankan_dengan_retry(panggil, panggilan_baru(detik=1))
+    assert len(dipanggil) == 1
+    assert time.monotonic() - mulai < 0.5
+
+
+def test_pembatalan_saat_antre_kuota(monkeypatch):
+    monkeypatch.setattr(gemini_bersama, "BATAS_RPM", 60)
+    kosongkan_kuota(permintaan=0.0)
+    panggilan, hasil = panggilan_baru(), []
+
+    def ambil():
+        try:
+            ambil_kuota(panggilan)
+        except CancelledError:
+            hasil.append("dibatalkan")
+
+    thread = threading.Thread(target=ambil)
+    thread.start()
+    while not antrean_bersama():
+        time.sleep(0.01)
+    assert panggilan["antrean"] == 1
+    panggilan["dibatalkan"].set()
+    thread.join(timeout=1)
+    assert hasil == ["dibatalkan"]
+    assert antrean_bersama() == []
+
+
+def test_pembatalan_menghentikan_jeda_retry(monkeypatch):
+    monkeypatch.setattr(gemini_bersama.random, "uniform", lambda a, b: b)
+    monkeypatch.setattr(gemini_bersama, "JEDA_DASAR", 5.0)
+    dipanggil = threading.Event()
+
+    def panggil(timeout, berhenti):
+        dipanggil.set()
+        raise google_exceptions.ServiceUnavailable("sibuk")
+
+    tugas = kirim_tugas(panggil, token=1)
+    assert dipanggil.wait(1)
+    mulai = time.monotonic()
+    batalkan_tugas(tugas)
+    with pytest.raises(CancelledError):
+        tugas["future"].result(timeout=1)
+    assert time.monotonic() - mulai < 0.5
+    assert tugas["panggilan"]["percobaan"] == 1
+
+
+def test_antrean_kuota_fifo(monkeypatch):
+    # 10 token/detik: permintaan besar di depan tidak disalip permintaan kecil di belakangnya
+    monkeypatch.setattr(gemini_bersama, "BATAS_TPM", 600)
+    monkeypatch.setattr(gemini_bersama, "BATAS_RPM", 6000)
+    kosongkan_kuota(token=0.0)
+    urutan, thread = [], []
+    for nama, token in [("besar", 3), ("kecil", 1), ("kecil lagi", 1)]:
+        panggilan = panggilan_baru(token=token)
+
+        def ambil(nama=nama, panggilan=panggilan):
+            ambil_kuota(panggilan)
+            urutan.append((nama, time.monotonic()))
+
+        thread.append(threading.Thread(target=ambil))
+        thread[-1].start()
+        while not panggilan["antrean"]: # Pastikan sudah masuk antrean sebelum yang berikutnya datang
+            time.sleep(0.005)
+    mulai = time.monotonic()
+    for t in thread:
+        t.join(timeout=3)
+
+    assert [nama for nama, _ in urutan] == ["besar", "kecil", "kecil lagi"]
+    # Masing-masing menunggu ember terisi untuk token miliknya sendiri
+    assert urutan[-1][1] - mulai >= 0.3
+    with kunci_kuota(init_pembatas()) as kuota:
+        assert kuota["dilayani"] == 3 and kuota["antrean"] == []
+
+
+def test_antrean_dibagi_lewat_berkas(monkeypatch):
+    # Tiket dari proses lain di berkas bersama tetap didahulukan sampai kedaluwarsa
+    monkeypatch.setattr(gemini_bersama, "TIKET_KEDALUWARSA", 0.3)
+    kosongkan_kuota(antrean=[["proses-lain", time.time()]])
+    panggilan, posisi = panggilan_baru(), []
+
+    thread = threading.Thread(target=ambil_kuota, args=(panggilan,))
+    mulai = time.monotonic()
+    thread.start()
+    while thread.is_alive():
+        posisi.append(panggilan["antrean"])
+        time.sleep(0.01)
+    assert time.monotonic() - mulai >= 0.25
+    assert 2 in posisi
+    assert antrean_bersama() == []
+
+
+def test_coba_ambil_kuota_tidak_menyalip():
+    assert coba_ambil_kuota(1)
+    kosongkan_kuota(antrean=[["menunggu", time.time()]])
+    assert not coba_ambil_kuota(1)
+    kosongkan_kuota(antrean=[], permintaan=0.0)
+    assert not coba_ambil_kuota(1)
+
+
+def test_panggilan_identik_berbagi_future():
+    lepas, jumlah_panggil = threading.Event(), []
+
+    def panggil(timeout, berhenti):
+        jumlah_panggil.append(1)
+        lepas.wait(2)
+        return "jawaban"
+
+    pertama = kirim_tugas(panggil, token=1, kunci="sama")
+    kedua = kirim_tugas(panggil, token=1, kunci="sama")
+    lain = kirim_tugas(panggil, token=1, kunci="beda")
+    assert kedua["future"] is pertama["future"] is not lain["future"]
+    assert pertama["panggilan"]["pelanggan"] == 2
+
+    # Satu pengguna membatalkan: panggilan tetap berjalan untuk pengguna lainnya
+    batalkan_tugas(pertama)
+    assert not kedua["panggilan"]["dibatalkan"].is_set()
+    lepas.set()
+    assert kedua["future"].result(timeout=2) == lain["future"].result(timeout=2) == "jawaban"
+    assert len(jumlah_panggil) == 2
+
+    # Panggilan yang sudah selesai dilepas: permintaan berikutnya memanggil Gemini lagi
+    ketiga = kirim_tugas(panggil, token=1, kunci="sama")
+    assert ketiga["future"] is not pertama["future"]
+    assert ketiga["future"].result(timeout=2) == "jawaban"
+    assert len(jumlah_panggil) == 3
+
+
+def test_semua_pelanggan_batal_menghentikan_panggilan():
+    mulai_panggil = threading.Event()
+
+    def panggil(timeout, berhenti):
+        mulai_panggil.set()
+        time.sleep(0.1)
+        return "jawaban"
+
+    tugas = [kirim_tugas(panggil, token=1, kunci="sama") for _ in range(2)]
+    assert mulai_panggil.wait(1)
+    for t in tugas:
+        batalkan_tugas(t)
+    assert tugas[0]["panggilan"]["dibatalkan"].is_set()
+    # Panggilan berikutnya dengan kunci yang sama tidak ikut memakai panggilan yang dibatalkan
+    baru = kirim_tugas(panggil, token=1, kunci="sama")
+    assert baru["future"] is not tugas[0]["future"]
+    assert baru["future"].result(timeout=2) == "jawaban"
+
+
+def panggil_lambat_lalu_cepat(lama, waktu_panggil):
+    """Permintaan pertama baru menjawab setelah `lama` detik (kecuali disuruh berhenti); hedge langsung menjawab."""
+    mulai = time.monotonic()
+
+    def panggil(timeout, berhenti):
+        waktu_panggil.append(time.monotonic() - mulai)
+        if len(waktu_panggil) == 1:
+            berhenti.wait(lama)
+            return "lambat"
+        return "cepat"
+
+    return panggil
+
+
+def tunggu_tidak_berjalan(statistik, detik=2):
+    batas = time.monotonic() + detik
+    while statistik["berjalan"] and time.monotonic() < batas:
+        time.sleep(0.01)
+    return statistik["berjalan"]
+
+
+def test_hedge_setelah_p95_dan_yang_lebih_cepat_menang(monkeypatch):
+    monkeypatch.setattr(gemini_bersama, "HEDGING_AKTIF", True)
+    statistik = init_statistik_latensi()
+    statistik["sampel"].extend([0.01] * 18 + [0.1, 5.0]) # p95 = 0.1 detik
+    statistik["panggilan"] = 19 # Panggilan ke-20: hedge pertama masuk budget 5%
+
+    waktu_panggil = []
+    hasil = panggil_dengan_hedge(panggil_lambat_lalu_cepat(2, waktu_panggil), 5, panggilan_baru(hedge=True))
+
+    assert hasil == "cepat"
+    assert len(waktu_panggil) == 2
+    assert waktu_panggil[1] >= 0.1 # Hedge baru dikirim setelah p95
+    assert statistik["hedge"] == statistik["hedge_menang"] == 1
+    # Yang kalah diberi tahu untuk berhenti dan tidak lagi dihitung berjalan
+    assert tunggu_tidak_berjalan(statistik) == 0
+
+
+def test_tanpa_hedge_jika_lebih_cepat_dari_p95(monkeypatch):
+    monkeypatch.setattr(gemini_bersama, "HEDGING_AKTIF", True)
+    statistik = init_statistik_latensi()
+    statistik["sampel"].extend([0.5] * 20)
+    statistik["panggilan"] = 100
+    waktu_panggil = []
+    hasil = panggil_dengan_hedge(panggil_lambat_lalu_cepat(0.05, waktu_panggil), 5, panggilan_baru(hedge=True))
+    assert hasil == "lambat"
+    assert len(waktu_panggil) == 1
+    assert statistik["hedge"] == 0
+    assert tunggu_tidak_berjalan(statistik) == 0
+
+
+def test_budget_hedge(monkeypatch):
+    monkeypatch.setattr(gemini_bersama, "HEDGING_AKTIF", True)
+    monkeypatch.setattr(gemini_bersama, "p95_latensi", lambda: 0.01)
+    statistik = init_statistik_latensi()
+
+    # Setiap permintaan pertama lebih lambat dari p95, tetapi hedge paling banyak 5% panggilan
+    jumlah_hedge = 0
+    for _ in range(60):
+        waktu_panggil = []
+        panggil_dengan_hedge(panggil_lambat_lalu_cepat(0.03, waktu_panggil), 5, panggilan_baru(hedge=True))
+        jumlah_hedge += len(waktu_panggil) - 1
+
+    assert jumlah_hedge == statistik["hedge"] == int(gemini_bersama.BUDGET_HEDGE * 60)
+    assert statistik["panggilan"] == 60
+    assert tunggu_tidak_berjalan(statistik) == 0
+
+
+def test_hedge_tanpa_kuota_tidak_dikirim(monkeypatch):
+    monkeypatch.setattr(gemini_bersama, "HEDGING_AKTIF", True)
+    monkeypatch.setattr(gemini_bersama, "p95_latensi", lambda: 0.01)
+    statistik = init_statistik_latensi()
+    statistik["panggilan"] = 100
+    kosongkan_kuota(permintaan=0.0)
+    waktu_panggil = []
+    hasil = panggil_dengan_hedge(panggil_lambat_lalu_cepat(0.05, waktu_panggil), 5, panggilan_baru(hedge=True))
+    assert hasil == "lambat"
+    assert len(waktu_panggil) == 1 and statistik["hedge"] == 0
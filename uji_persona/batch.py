@@ -0,0 +1,282 @@
+"""Uji regresi persona chatbot: jalankan berkas prompt JSONL tanpa Streamlit.
+
+Persona (INITIAL_CHATBOT_CONTEXT, MODEL_NAME, MAX_TOKENS) dibaca langsung dari kode
+aplikasi dengan `ast`, tanpa mengimpor (dan menjalankan) aplikasinya. Setiap baris
+masukan berisi {"prompt": ...} dan boleh punya "id" serta kolom lain (misal "label")
+yang ikut disalin ke hasil. Tanpa "id", id diambil dari hash prompt sehingga tetap sama
+walaupun baris berkas masukan ditambah, dihapus, atau diurutkan ulang. Setiap prompt dikirim sebagai pertanyaan pertama setelah
+konteks awal persona, paling banyak --konkurensi sekaligus.
+
+Hasil ditulis per baris (JSONL) begitu selesai, lengkap dengan latensi dan jumlah token.
+Jika proses terhenti, jalankan ulang perintah yang sama: prompt yang sudah berhasil
+dilewati, dan yang gagal dicoba lagi. Di akhir run berkas hasil ditulis ulang dengan satu
+baris per id (status terakhirnya), jadi baris gagal yang sudah berhasil di-retry hilang.
+
+    python uji_persona/batch.py diagnosa diagnosa/contoh_prompt_topik.jsonl hasil_diagnosa.jsonl
+
+Tanpa internet dan kuota, arahkan ke server tiruan:
+
+    python gemini_tiruan/server.py --port 8765 &
+    python uji_persona/batch.py kuliner prompt.jsonl hasil.jsonl --endpoint http://127.0.0.1:8765
+"""
+
+import argparse
+import ast
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PERSONA = {
+    "kuliner": os.path.join(ROOT, "AhliKuliner", "app.py"),
+    "diagnosa": os.path.join(ROOT, "diagnosa", "app.py"),
+    "zodiak": os.path.join(ROOT, "Zodiak", "app.py"),
+}
+
+# Dipakai jika aplikasi tidak mendefinisikannya sebagai konstanta
+PENGATURAN_BAWAAN = {"MODEL_NAME": "gemini-1.5-flash", "TEMPERATURE": 0.4, "MAX_TOKENS": 500}
+
+MAKS_PERCOBAAN = 4
+JEDA_DASAR = 1.0 # Detik; jeda retry ke-n diacak antara 0 dan min(JEDA_MAKS, JEDA_DASAR * 2^(n-1))
+JEDA_MAKS = 8.0
+
+# Error yang layak dicoba ulang: server sibuk/down, kuota per menit, atau jaringan putus
+ERROR_SEMENTARA = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.InternalServerError,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    ConnectionError,
+    TimeoutError,
+)
+
+# ==============================================================================
+# PERSONA
+# ==============================================================================
+
+def baca_persona(path):
+    """Ambil konstanta persona dari kode aplikasi tanpa menjalankannya."""
+    with open(path, encoding="utf-8") as f:
+        pohon = ast.parse(f.read(), filename=path)
+
+    nilai = dict(PENGATURAN_BAWAAN)
+    for node in pohon.body:
+        if not isinstance(node, ast.Assign) or len(node.targets) != 1 or not isinstance(node.targets[0], ast.Name):
+            continue
+        nama = node.targets[0].id
+        if nama in ("INITIAL_CHATBOT_CONTEXT", *PENGATURAN_BAWAAN):
+            nilai[nama] = ast.literal_eval(node.value)
+
+    if "INITIAL_CHATBOT_CONTEXT" not in nilai:
+        raise ValueError(f"INITIAL_CHATBOT_CONTEXT tidak ditemukan di {path}")
+    return nilai
+
+# ==============================================================================
+# BERKAS MASUKAN DAN HASIL
+# ==============================================================================
+
+def id_prompt(prompt):
+    """Id stabil dari isi prompt (bukan nomor baris, yang bergeser jika berkas diedit)."""
+    return hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:12]
+
+def baca_prompt(path):
+    """Daftar record masukan; "id" diisi hash prompt jika tidak ada."""
+    records = []
+    asal = {}
+    with open(path, encoding="utf-8") as f:
+        for nomor, baris in enumerate(f, start=1):
+            if not baris.strip():
+                continue
+            data = json.loads(baris)
+            data.setdefault("id", id_prompt(data["prompt"]))
+            if data["id"] in asal:
+                raise ValueError(
+                    f"Id {data['id']!r} di baris {nomor} sudah dipakai di baris {asal[data['id']]} "
+                    "(prompt kembar tanpa \"id\"?); beri \"id\" yang berbeda."
+                )
+            asal[data["id"]] = nomor
+            records.append(data)
+    return records
+
+def baca_hasil(path):
+    """Baris hasil per id; jika satu id muncul beberapa kali (retry), baris terakhir yang dipakai."""
+    hasil = {}
+    if not os.path.exists(path):
+        return hasil
+    with open(path, encoding="utf-8") as f:
+        for baris in f:
+            try:
+                data = json.loads(baris)
+            except json.JSONDecodeError:
+                continue # Baris terakhir bisa terpotong saat proses dihentikan
+            hasil.pop(data["id"], None) # Urutan mengikuti kemunculan terakhir
+            hasil[data["id"]] = data
+    return hasil
+
+def id_selesai(path):
+    """Id yang sudah berhasil di berkas hasil (untuk melanjutkan run yang terhenti)."""
+    return {id_ for id_, data in baca_hasil(path).items() if data.get("error") is None}
+
+def rapikan_hasil(path):
+    """Tulis ulang berkas hasil dengan satu baris (status terakhir) per id."""
+    hasil = baca_hasil(path)
+    sementara = path + ".tmp"
+    with open(sementara, "w", encoding="utf-8") as f:
+        for data in hasil.values():
+            f.write(json.dumps(data, ensure_ascii=False) + "\n")
+    os.replace(sementara, path)
+    return hasil
+
+def persentil(data, p):
+    urut = sorted(data)
+    return urut[int(p * (len(urut) - 1))] if urut else 0.0
+
+# ==============================================================================
+# EKSEKUSI
+# ==============================================================================
+
+def buat_generate(persona, endpoint, timeout):
+    """Fungsi async `generate(isi)` untuk persona ini.
+
+    API async genai hanya berjalan di transport gRPC; endpoint REST (misal server tiruan)
+    dipanggil dengan API sinkron di thread terpisah agar tetap bisa dijalankan bersamaan.
+    """
+    api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY") or ("tiruan" if endpoint else None)
+    if not api_key:
+        sys.exit("API Key belum diatur. Set GEMINI_API_KEY, atau gunakan --endpoint ke server tiruan.")
+    if endpoint:
+        genai.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": endpoint})
+    else:
+        genai.configure(api_key=api_key)
+
+    model = genai.GenerativeModel(
+        persona["MODEL_NAME"],
+        generation_config=genai.types.GenerationConfig(
+            temperature=persona["TEMPERATURE"],
+            max_output_tokens=persona["MAX_TOKENS"]
+        )
+    )
+    request_options = {"timeout": timeout}
+
+    if endpoint:
+        async def generate(isi):
+            return await asyncio.to_thread(model.generate_content, isi, request_options=request_options)
+    else:
+        async def generate(isi):
+            return await model.generate_content_async(isi, request_options=request_options)
+    return generate
+
+async def jalankan_satu(record, persona, generate, semafor):
+    """Kirim satu prompt (dengan retry untuk error sementara); kembalikan record hasil."""
+    isi = list(persona["INITIAL_CHATBOT_CONTEXT"]) + [{"role": "user", "parts": [record["prompt"]]}]
+    async with semafor:
+        for percobaan in range(1, MAKS_PERCOBAAN + 1):
+            mulai = time.perf_counter()
+            try:
+                response = await generate(isi)
+                latensi = time.perf_counter() - mulai
+                usage = response.usage_metadata
+                return {
+                    **record,
+                    "jawaban": response.text,
+                    "latensi_detik": round(latensi, 3),
+                    "token_prompt": usage.prompt_token_count,
+                    "token_jawaban": usage.candidates_token_count,
+                    "token_total": usage.total_token_count,
+                    "percobaan": percobaan,
+                    "error": None,
+                }
+            except ERROR_SEMENTARA as e:
+                error = e
+                if percobaan < MAKS_PERCOBAAN:
+                    await asyncio.sleep(random.uniform(0, min(JEDA_MAKS, JEDA_DASAR * 2 ** (percobaan - 1))))
+            except Exception as e:
+                error = e
+                break
+    return {
+        **record,
+        "latensi_detik": round(time.perf_counter() - mulai, 3),
+        "percobaan": percobaan,
+        "error": f"{type(error).__name__}: {error}",
+    }
+
+async def jalankan_batch(records, persona, generate, path_hasil, konkurensi):
+    semafor = asyncio.Semaphore(konkurensi)
+    tugas = [asyncio.create_task(jalankan_satu(r, persona, generate, semafor)) for r in records]
+    ringkasan = {"berhasil": 0, "gagal": 0, "latensi": [], "token": 0}
+
+    # Mode tambah: hasil run sebelumnya tetap ada; setiap baris langsung di-flush
+    with open(path_hasil, "a+", encoding="utf-8") as f:
+        # Baris terakhir yang terpotong saat run sebelumnya dihentikan ditutup dulu
+        if f.tell() > 0:
+            f.seek(f.tell() - 1)
+            if f.read(1) != "\n":
+                f.write("\n")
+        for selesai in asyncio.as_completed(tugas):
+            hasil = await selesai
+            f.write(json.dumps(hasil, ensure_ascii=False) + "\n")
+            f.flush()
+            if hasil["error"] is None:
+                ringkasan["berhasil"] += 1
+                ringkasan["latensi"].append(hasil["latensi_detik"])
+                ringkasan["token"] += hasil["token_total"] or 0
+            else:
+                ringkasan["gagal"] += 1
+                print(f"Gagal [{hasil['id']}]: {hasil['error']}", file=sys.stderr)
+            jumlah = ringkasan["berhasil"] + ringkasan["gagal"]
+            print(f"\r{jumlah}/{len(records)} selesai", end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+    return ringkasan
+
+def main():
+    parser = argparse.ArgumentParser(description="Jalankan berkas prompt JSONL melalui persona chatbot.")
+    parser.add_argument("persona", choices=PERSONA)
+    parser.add_argument("masukan", help="berkas JSONL berisi {\"prompt\": ...} per baris")
+    parser.add_argument("hasil", help="berkas JSONL hasil (ditambahkan; run yang terhenti dilanjutkan)")
+    parser.add_argument("--konkurensi", type=int, default=4, help="jumlah permintaan yang berjalan bersamaan")
+    parser.add_argument("--timeout", type=float, default=60, help="timeout per permintaan (detik)")
+    parser.add_argument("--endpoint", default=os.getenv("GEMINI_API_ENDPOINT"), help="misal http://127.0.0.1:8765")
+    parser.add_argument("--model", help="ganti MODEL_NAME dari aplikasi")
+    args = parser.parse_args()
+
+    persona = baca_persona(PERSONA[args.persona])
+    if args.model:
+        persona["MODEL_NAME"] = args.model
+
+    try:
+        records = baca_prompt(args.masukan)
+    except ValueError as e:
+        sys.exit(str(e))
+    selesai = id_selesai(args.hasil)
+    sisa = [r for r in records if r["id"] not in selesai]
+    print(f"{len(records)} prompt, {len(records) - len(sisa)} sudah selesai, {len(sisa)} dijalankan "
+          f"(persona {args.persona}, model {persona['MODEL_NAME']})", file=sys.stderr)
+    if not sisa:
+        return
+
+    generate = buat_generate(persona, args.endpoint, args.timeout)
+    mulai = time.perf_counter()
+    try:
+        ringkasan = asyncio.run(jalankan_batch(sisa, persona, generate, args.hasil, args.konkurensi))
+    except KeyboardInterrupt:
+        sys.exit("\nDihentikan. Jalankan perintah yang sama untuk melanjutkan.")
+    durasi = time.perf_counter() - mulai
+    semua = rapikan_hasil(args.hasil)
+
+    print(f"Berhasil: {ringkasan['berhasil']}  Gagal: {ringkasan['gagal']}  Waktu: {durasi:.1f} detik")
+    masih_gagal = sum(data.get("error") is not None for data in semua.values())
+    print(f"Berkas hasil: {len(semua)} id, {masih_gagal} masih gagal")
+    if ringkasan["latensi"]:
+        print(f"Latensi p50: {persentil(ringkasan['latensi'], 0.5):.2f} detik  "
+              f"p95: {persentil(ringkasan['latensi'], 0.95):.2f} detik  Total token: {ringkasan['token']}")
+
+if __name__ == "__main__":
+    main()